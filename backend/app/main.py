@@ -1,20 +1,87 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from contextlib import asynccontextmanager
 from app.routers import weather, analyze, virtual_try_on, qrcode
+from app.services.catalog import get_catalog
+from app.services.derivatives import derivative_service
+from app.services.vector_index import get_vector_index
+from app.services.deepfashion import deepfashion_service
+from app.services.idempotency import IdempotencyMiddleware
+from app.services.openweather import openweather_client
+from app.services.qr_generator import qr_engine, require_signing_key
+from app.services.rate_limiter import (
+    RateLimitMiddleware, RateLimitPolicy, close_rate_limiter, get_rate_limiter
+)
+from app.utils.http import tryon_session
+from app.utils.redis_client import close_redis
 from app.utils.config import get_settings
 from app.utils.logger import get_logger
 from app.utils.exceptions import APIError
+from app.utils.metrics import MetricsMiddleware, render_metrics
+from app.utils.resilience import DeadlineMiddleware
+from app.utils.startup import readiness
+from app.utils.uploads import UploadLimitMiddleware, multipart_limit
+import asyncio
 import time
 import uvicorn
 
 settings = get_settings()
 logger = get_logger(__name__)
 
+# Ağır kaynaklar; model bir kez, katalog ve stil indeksleri ilk istekten önce kurulur
+WARMUP_STEPS = (
+    ("model", deepfashion_service.start),
+    ("catalog", lambda: asyncio.to_thread(get_catalog)),
+    ("vector_index", lambda: asyncio.to_thread(get_vector_index)),
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Eksik gizli anahtarla hiçbir şey başlatılmadan açılış durdurulur
+    require_signing_key()
+    # Uzun ömürlü upstream istemcileri
+    await openweather_client.start()
+    await tryon_session.start()
+    await virtual_try_on.job_queue.start()
+    # Limiter ayarları açılışta doğrulanır (desteklenmeyen kombinasyonlar loglanır)
+    get_rate_limiter()
+    warmup = readiness.start(WARMUP_STEPS)
+    if settings.STARTUP_MODE != "lazy":
+        await warmup
+    yield
+    await readiness.stop()
+    await deepfashion_service.stop()
+    await virtual_try_on.job_queue.stop()
+    await close_rate_limiter()
+    await openweather_client.close()
+    await tryon_session.close()
+    await close_redis()
+    qr_engine.close()
+    derivative_service.close()
+
 app = FastAPI(
     title="Moda Aynası API",
     description="Yapay zeka destekli kişisel moda asistanı API'si",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if settings.FAST_RESPONSES else JSONResponse
+)
+
+# Tekrarlanan pahalı istekler tek işleme iner; rate limit'in içinde kalır ki
+# limit aşan istemcilerin gövdesi hiç okunmasın
+app.add_middleware(IdempotencyMiddleware, prefixes=("/analyze", "/virtual-try-on"))
+
+# Rota bazlı rate limit; CORS'un içinde kalır ki 429 yanıtları da CORS başlıklarını alsın
+app.add_middleware(
+    RateLimitMiddleware,
+    policies={
+        "/virtual-try-on": RateLimitPolicy(cost=10),
+        "/analyze": RateLimitPolicy(cost=2),
+        "/qrcode": RateLimitPolicy(cost=1),
+        "/qrcode/batch": RateLimitPolicy(cost=10),
+        "/qrcode/resolve": RateLimitPolicy(cost=1, methods=("GET",)),
+    }
 )
 
 # CORS ayarları
@@ -24,21 +91,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST"],  # Sadece gerekli metodlar
     allow_headers=["*"],
+    expose_headers=[
+        "Server-Timing", "Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "Idempotent-Replayed"
+    ],
 )
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    logger.info(
-        f"Method: {request.method} "
-        f"Path: {request.url.path} "
-        f"Status: {response.status_code} "
-        f"Time: {process_time:.2f}s"
-    )
-    return response
+# Büyük yüklemeleri gövde ayrıştırılmadan reddet
+app.add_middleware(
+    UploadLimitMiddleware,
+    limits={
+        "/analyze/upload": multipart_limit(1, settings.UPLOAD_MAX_BYTES),
+        "/virtual-try-on/upload": multipart_limit(2, settings.UPLOAD_MAX_BYTES),
+    }
+)
+
+# İsteğin süre sınırı upstream çağrılarına aktarılır (X-Request-Timeout)
+app.add_middleware(DeadlineMiddleware)
+
+# Rota bazlı gecikme ve istek metrikleri; en dışta kalır ki 413/429 yanıtları da ölçülsün
+app.add_middleware(MetricsMiddleware, exclude=("/metrics",))
 
 # Global exception handler
 @app.exception_handler(APIError)
@@ -56,7 +127,22 @@ app.include_router(qrcode.router, prefix="/qrcode", tags=["qrcode"])
 
 @app.get("/health")
 async def health_check():
+    """Canlılık yoklaması; süreç cevap verebildiği sürece 200 döner"""
     return {"status": "healthy", "timestamp": time.time()}
 
+@app.get("/ready")
+async def readiness_check():
+    """Hazırlık yoklaması; model, katalog ve indeksler yüklenene kadar 503 döner"""
+    return JSONResponse(status_code=200 if readiness.ready else 503, content=readiness.report())
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrikleri (çok süreçli modda tüm worker'ların toplamı)"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+# Geliştirme sunucusu; üretimde `python -m app.serve`
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8001, reload=True)
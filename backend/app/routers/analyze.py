@@ -1,39 +1,115 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas import AnalyzeRequest, AnalyzeResponse, ProductData
+import asyncio
+from typing import Any, Dict, Optional, Union
+from fastapi import APIRouter, HTTPException, File, Form, Response, UploadFile
+from app.schemas import AnalyzeRequest, AnalyzeResponse, ProductData, WeatherData
 from app.services import deepfashion
+from app.utils.config import get_settings
+from app.utils.exceptions import APIError
 from app.utils.logger import get_logger
+from app.utils.resilience import deadline
+from app.utils.responses import model_response
+from app.utils.timing import StageTimer
+from app.utils.uploads import read_upload
 from app.routers.weather import get_weather
 
 router = APIRouter()
 logger = get_logger(__name__)
+settings = get_settings()
 
 @router.post("", response_model=AnalyzeResponse)
-async def analyze_image(request: AnalyzeRequest):
+async def analyze_image(request: AnalyzeRequest, response: Response):
     """Kıyafet fotoğrafını analiz eder ve öneriler sunar"""
+    filters = request.model_dump(exclude={"image", "location"})
+    return model_response(await _analyze(request.image, request.location, filters, response), response)
+
+@router.post("/upload", response_model=AnalyzeResponse)
+async def analyze_upload(
+    response: Response,
+    image: UploadFile = File(...),
+    location: Optional[str] = Form(None),
+    size: Optional[str] = Form(None),
+    color: Optional[str] = Form(None),
+    category: Optional[str] = Form(None),
+    min_price: Optional[float] = Form(None),
+    max_price: Optional[float] = Form(None)
+):
+    """Multipart olarak yüklenen kıyafet fotoğrafını analiz eder (base64 gerektirmez)"""
+    image_bytes = await read_upload(image, settings.UPLOAD_MAX_BYTES)
+    filters = {
+        "size": size,
+        "color": color,
+        "category": category,
+        "min_price": min_price,
+        "max_price": max_price
+    }
+    return model_response(await _analyze(image_bytes, location, filters, response), response)
+
+async def _analyze(
+    image: Union[str, bytes],
+    location: Optional[str],
+    filters: Dict[str, Any],
+    response: Response
+) -> AnalyzeResponse:
+    timer = StageTimer()
+    # Hava durumu fotoğraftan bağımsızdır; model çalışırken arka planda alınır
+    weather_task = None
+    if location:
+        # Süre sınırı task'a bağlamıyla geçer; upstream çağrıları da onu aşmaz
+        with deadline(settings.ANALYZE_WEATHER_TIMEOUT):
+            weather_task = asyncio.create_task(
+                timer.run("weather", get_weather(location), settings.ANALYZE_WEATHER_TIMEOUT)
+            )
     try:
         # Fotoğrafı analiz et
-        style = deepfashion.analyze_style(request.image)
+        style, embedding = await timer.run(
+            "style", deepfashion.analyze(image), settings.ANALYZE_STYLE_TIMEOUT
+        )
         
-        # Önerileri al
-        recommendations = deepfashion.get_recommendations(style)
+        # Önerileri al (gömme varsa görsel benzerliğe göre)
+        with timer.measure("recommend"):
+            recommendations = await deepfashion.recommend(style, embedding=embedding, **filters)
         
-        # Hava durumu bilgisini al (opsiyonel)
-        weather_data = None
-        if request.location:
-            try:
-                weather_data = await get_weather(request.location)
-            except Exception as e:
-                logger.warning(f"Hava durumu alınamadı: {str(e)}")
+        # Hava durumu bilgisi (opsiyonel, süre sınırını aşarsa None)
+        weather_data = await _weather_or_none(weather_task)
         
+        if settings.SERVER_TIMING_ENABLED:
+            response.headers["Server-Timing"] = timer.header()
         return AnalyzeResponse(
             style=style,
             recommendations=recommendations,
             weather_data=weather_data
         )
         
+    except APIError:
+        raise
+    except asyncio.TimeoutError:
+        logger.error(f"Stil analizi {settings.ANALYZE_STYLE_TIMEOUT} sn içinde bitmedi")
+        raise HTTPException(
+            status_code=504,
+            detail="Fotoğraf analizi zaman aşımına uğradı"
+        )
     except Exception as e:
         logger.error(f"Fotoğraf analizi hatası: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail="Fotoğraf analizi sırasında bir hata oluştu"
         )
+    finally:
+        if weather_task is not None and not weather_task.done():
+            weather_task.cancel()
+
+async def _weather_or_none(task: Optional[asyncio.Task]) -> Optional[WeatherData]:
+    if task is None:
+        return None
+    try:
+        return await task
+    except asyncio.TimeoutError:
+        logger.warning(f"Hava durumu {settings.ANALYZE_WEATHER_TIMEOUT} sn içinde alınamadı")
+    except Exception as e:
+        logger.warning(f"Hava durumu alınamadı: {str(e)}")
+    return None
+
+@router.get("/model/stats")
+async def get_model_stats():
+    """Stil modelinin batch sayaçlarını ve batch başına gecikmesini döndürür"""
+    return deepfashion.deepfashion_service.stats()
@@ -1,21 +1,67 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas import QRCodeRequest, QRCodeResponse
+from fastapi import APIRouter, HTTPException, Query
+from app.schemas import (
+    QRCodeRequest, QRCodeResponse, QRCodeBatchRequest, QRCodeBatchResponse, QRCodeBatchItem,
+    QRCodeResolveResponse
+)
 from app.services import qr_generator
+from app.utils.config import get_settings
+from app.utils.exceptions import APIError, ValidationError
 from app.utils.logger import get_logger
 
 router = APIRouter()
 logger = get_logger(__name__)
+settings = get_settings()
+
+def _response(output, fmt: str) -> dict:
+    return {"matrix": output} if fmt == "matrix" else {"qr_token": output}
 
 @router.post("", response_model=QRCodeResponse)
 async def generate_qr(request: QRCodeRequest):
     """Ürün bilgilerine göre QR kod oluşturur"""
     try:
-        qr_token = qr_generator.generate_qr_token(
+        output = qr_generator.generate_qr_token(
             product_id=request.product_id,
             size=request.size,
-            color=request.color
+            color=request.color,
+            fmt=request.format
         )
-        return QRCodeResponse(qr_token=qr_token)
+        return QRCodeResponse(**_response(output, request.format))
+    except APIError:
+        raise
     except Exception as e:
         logger.error(f"QR kod oluşturma hatası: {str(e)}")
         raise HTTPException(status_code=500, detail="QR kod oluşturulamadı")
+
+@router.post("/batch", response_model=QRCodeBatchResponse)
+async def generate_qr_batch(request: QRCodeBatchRequest):
+    """Ürün listesi için QR kodları tek istekte, süreç havuzunda oluşturur"""
+    if len(request.items) > settings.QR_BATCH_MAX_ITEMS:
+        raise ValidationError(f"Tek istekte en fazla {settings.QR_BATCH_MAX_ITEMS} QR kod oluşturulabilir")
+    try:
+        payloads = [
+            qr_generator.build_payload(item.product_id, item.size, item.color)
+            for item in request.items
+        ]
+        outputs = await qr_generator.qr_engine.render_many(payloads, request.format)
+        return QRCodeBatchResponse(codes=[
+            QRCodeBatchItem(**item.model_dump(), **_response(output, request.format))
+            for item, output in zip(request.items, outputs)
+        ])
+    except APIError:
+        raise
+    except Exception as e:
+        logger.error(f"Toplu QR kod oluşturma hatası: {str(e)}")
+        raise HTTPException(status_code=500, detail="QR kodlar oluşturulamadı")
+
+@router.get("/resolve", response_model=QRCodeResolveResponse)
+async def resolve_qr(token: str = Query(..., max_length=512)):
+    """Taranan QR kodun imzasını doğrular ve ürün bilgisini döndürür"""
+    payload, product = await qr_generator.resolve_payload(token)
+    if product is None:
+        raise APIError(status_code=404, detail=f"Ürün bulunamadı: {payload.product_id}")
+    return QRCodeResolveResponse(product=product, size=payload.size, color=payload.color)
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """QR önbelleğinin isabet/ıskalama sayaçlarını döndürür"""
+    return qr_generator.qr_engine.stats()
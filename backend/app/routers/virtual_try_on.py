@@ -1,24 +1,79 @@
-from fastapi import APIRouter, HTTPException
-from app.schemas import VirtualTryOnRequest, VirtualTryOnResponse
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Optional, Union
+from fastapi import APIRouter, HTTPException, File, Query, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from app.schemas import VirtualTryOnRequest, VirtualTryOnResponse, TryOnJobStatus
+from app.services.derivatives import derivative_service
 from app.services.kolors import KolorsService
+from app.services.preprocessing import decode_image_bytes
+from app.services.tryon_cache import tryon_result_cache
+from app.services.tryon_jobs import TryOnJobQueue, format_sse
+from app.utils.config import get_settings
 from app.utils.logger import get_logger
+from app.utils.responses import model_response
+from app.utils.uploads import read_upload, sniff_image_type, wants_image
 
 router = APIRouter()
 logger = get_logger(__name__)
+settings = get_settings()
 kolors_service = KolorsService()
+job_queue = TryOnJobQueue(kolors_service.try_on)
 
 @router.post("", response_model=VirtualTryOnResponse)
 async def virtual_try_on(request: VirtualTryOnRequest):
     """Kullanıcı ve ürün fotoğraflarını kullanarak sanal deneme yapar"""
+    result = await _try_on(request.user_image, request.product_image, request.inline)
+    return model_response(result, raw_fields=("result_image",))
+
+@router.post(
+    "/upload",
+    response_model=VirtualTryOnResponse,
+    responses={200: {"content": {"image/png": {}}}}
+)
+async def virtual_try_on_upload(
+    request: Request,
+    user_image: UploadFile = File(...),
+    product_image: UploadFile = File(...)
+):
+    """
+    Multipart olarak yüklenen fotoğraflarla sanal deneme yapar.
+
+    `Accept: image/*` gönderilirse sonuç base64 JSON yerine doğrudan
+    görüntü baytları olarak döner.
+    """
+    user_bytes = await read_upload(user_image, settings.UPLOAD_MAX_BYTES)
+    product_bytes = await read_upload(product_image, settings.UPLOAD_MAX_BYTES)
+    result = await _try_on(user_bytes, product_bytes)
+
+    if result.success and wants_image(request):
+        data = decode_image_bytes(result.result_image)
+        return Response(content=data, media_type=sniff_image_type(data) or "image/png")
+    return model_response(result, raw_fields=("result_image",))
+
+async def _try_on(
+    user_image: Union[str, bytes],
+    product_image: Union[str, bytes],
+    inline: bool = True
+) -> VirtualTryOnResponse:
     try:
         result_image = await kolors_service.try_on(
-            user_image=request.user_image,
-            product_image=request.product_image
+            user_image=user_image,
+            product_image=product_image
         )
         
+        # Sonuç bir kez saklanır; istemciler ekranlarına uygun türevi ister
+        result_id = None
+        try:
+            result_id = await derivative_service.save(result_image)
+        except Exception as e:
+            logger.warning(f"Sanal deneme sonucu saklanamadı: {str(e)}")
+        
         return VirtualTryOnResponse(
-            result_image=result_image,
-            success=True
+            result_image=result_image if inline or result_id is None else "",
+            success=True,
+            result_id=result_id,
+            result_url=f"/virtual-try-on/results/{result_id}" if result_id else None
         )
         
     except Exception as e:
@@ -28,3 +83,107 @@ async def virtual_try_on(request: VirtualTryOnRequest):
             success=False,
             message=str(e)
         )
+
+@router.post("/jobs", response_model=TryOnJobStatus, status_code=202)
+async def submit_virtual_try_on(request: VirtualTryOnRequest):
+    """Sanal deneme işini kuyruğa ekler ve iş kimliğini hemen döndürür"""
+    job_id = await job_queue.submit(
+        user_image=request.user_image,
+        product_image=request.product_image
+    )
+    return TryOnJobStatus(job_id=job_id, status="pending")
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Sanal deneme sonuç önbelleğinin isabet/ıskalama sayaçlarını döndürür"""
+    return {**tryon_result_cache.stats(), "derivatives": derivative_service.stats()}
+
+@router.get(
+    "/results/{result_id}",
+    response_class=Response,
+    responses={200: {"content": {"image/webp": {}, "image/jpeg": {}}}, 304: {}}
+)
+async def get_try_on_result(
+    request: Request,
+    result_id: str,
+    width: int = Query(640),
+    format: Optional[str] = Query(None)
+):
+    """
+    Sanal deneme sonucunu istenen genişlik ve formatta döndürür.
+
+    `format` verilmezse `Accept` başlığına göre WebP ya da JPEG seçilir.
+    `If-None-Match` / `If-Modified-Since` eşleşirse görsel okunmadan 304 döner.
+    """
+    fmt = format or ("webp" if "image/webp" in request.headers.get("accept", "") else "jpeg")
+    etag = derivative_service.etag(result_id, width, fmt)
+    headers = {
+        "ETag": etag,
+        # Türev içerik adresli olduğundan hiç değişmez
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Accept"
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = _etag_candidates(if_none_match)
+        # "*" yalnızca sonuç varsa eşleşir; bilinmeyen kimlik 404 almalı
+        if etag in candidates or (
+            "*" in candidates and await derivative_service.last_modified(result_id) is not None
+        ):
+            return Response(status_code=304, headers=headers)
+    elif "if-modified-since" in request.headers:
+        last_modified = await derivative_service.last_modified(result_id)
+        if _not_modified_since(request.headers["if-modified-since"], last_modified):
+            return Response(status_code=304, headers=headers)
+
+    derivative = await derivative_service.get(result_id, width, fmt)
+    if derivative.last_modified is not None:
+        headers["Last-Modified"] = formatdate(derivative.last_modified, usegmt=True)
+    return Response(content=derivative.data, media_type=derivative.media_type, headers=headers)
+
+def _etag_candidates(header: str) -> List[str]:
+    # Zayıf karşılaştırma (RFC 9110 13.1.2): W/ öneki yok sayılır
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+def _not_modified_since(header: str, last_modified: Optional[float]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP tarihleri saniye hassasiyetindedir
+    return int(last_modified) <= since <= time.time()
+
+@router.get("/{job_id}", response_model=TryOnJobStatus)
+async def get_virtual_try_on_job(job_id: str):
+    """Sanal deneme işinin durumunu ve varsa sonucunu döndürür"""
+    job = await job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"İş bulunamadı: {job_id}")
+
+    status = TryOnJobStatus(
+        job_id=job_id,
+        status=job["status"],
+        result_image=job.get("result_image") or None,
+        message=job.get("message") or None
+    )
+    return model_response(status, raw_fields=("result_image",))
+
+@router.get("/{job_id}/stream")
+async def stream_virtual_try_on_job(job_id: str):
+    """Sanal deneme işinin durum değişikliklerini Server-Sent Events olarak akıtır"""
+    job = await job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"İş bulunamadı: {job_id}")
+
+    async def events():
+        async for update in job_queue.store.watch(job_id):
+            yield format_sse(update)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
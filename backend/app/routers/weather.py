@@ -1,35 +1,32 @@
+import asyncio
+import aiohttp
 from fastapi import APIRouter, HTTPException
-import requests
-from app.utils.config import get_settings
 from app.schemas import WeatherData
+from app.services.openweather import openweather_client
 from app.utils.logger import get_logger
+from app.utils.responses import model_response
 
 router = APIRouter()
-settings = get_settings()
 logger = get_logger(__name__)
 
 @router.get("", response_model=WeatherData)
-async def get_weather(location: str):
+async def read_weather(location: str):
     """Belirtilen konum için hava durumu bilgisini getirir"""
+    return model_response(await get_weather(location))
+
+async def get_weather(location: str) -> WeatherData:
+    """Konumun hava durumunu getirir; /analyze tarafından da kullanılır"""
     try:
         # Önce konum bilgisini koordinatlara çevirelim
-        geocoding_url = f"http://api.openweathermap.org/geo/1.0/direct?q={location}&limit=1&appid={settings.OPENWEATHER_API_KEY}"
-        geo_response = requests.get(geocoding_url)
-        geo_response.raise_for_status()
-        
-        geo_data = geo_response.json()
-        if not geo_data:
+        coords = await openweather_client.geocode(location)
+        if coords is None:
             raise HTTPException(status_code=404, detail=f"Konum bulunamadı: {location}")
-        
-        lat, lon = geo_data[0]["lat"], geo_data[0]["lon"]
-        
+
+        lat, lon = coords
+
         # Şimdi hava durumu bilgisini alalım
-        weather_url = f"http://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&units=metric&appid={settings.OPENWEATHER_API_KEY}"
-        weather_response = requests.get(weather_url)
-        weather_response.raise_for_status()
-        
-        data = weather_response.json()
-        
+        data = await openweather_client.current_weather(lat, lon)
+
         return WeatherData(
             temperature=data["main"]["temp"],
             description=data["weather"][0]["description"],
@@ -37,10 +34,17 @@ async def get_weather(location: str):
             wind_speed=data["wind"]["speed"],
             icon=data["weather"][0]["icon"]
         )
-        
-    except requests.RequestException as e:
+
+    except HTTPException:
+        raise
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         logger.error(f"OpenWeather API hatası: {str(e)}")
         raise HTTPException(status_code=500, detail="Hava durumu verisi alınamadı")
     except Exception as e:
         logger.error(f"Beklenmeyen hata: {str(e)}")
         raise HTTPException(status_code=500, detail="Sistem hatası")
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Konum ve hava durumu önbelleklerinin isabet/ıskalama sayaçlarını döndürür"""
+    return openweather_client.cache_stats()
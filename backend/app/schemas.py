@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 # Hava durumu verileri
 class WeatherData(BaseModel):
@@ -25,6 +25,12 @@ class ProductData(BaseModel):
 class AnalyzeRequest(BaseModel):
     image: str  # base64 encoded image
     location: Optional[str] = None
+    # Öneri filtreleri
+    size: Optional[str] = None
+    color: Optional[str] = None
+    category: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
 
 # Fotoğraf analizi yanıtı
 class AnalyzeResponse(BaseModel):
@@ -36,22 +42,58 @@ class AnalyzeResponse(BaseModel):
 class VirtualTryOnRequest(BaseModel):
     user_image: str  # base64
     product_image: str  # base64 or url
+    inline: bool = True  # False: result_image boş döner, görsel result_url'den alınır
 
 # Sanal deneme yanıtı
 class VirtualTryOnResponse(BaseModel):
     result_image: str  # base64
     success: bool
     message: Optional[str] = None
+    result_id: Optional[str] = None
+    result_url: Optional[str] = None  # ?width=320|640|1024&format=webp|jpeg
 
-# QRCode isteği
-class QRCodeRequest(BaseModel):
+# Sanal deneme işi durumu
+class TryOnJobStatus(BaseModel):
+    job_id: str
+    status: str  # pending, running, succeeded, failed
+    result_image: Optional[str] = None  # base64, iş başarılıysa
+    message: Optional[str] = None
+
+# QR kod çıktı formatı
+QRFormat = Literal["png", "svg", "matrix"]
+
+# QRCode için ürün bilgisi
+class QRCodeItem(BaseModel):
     product_id: str
     size: Optional[str] = None
     color: Optional[str] = None
 
+# QRCode isteği
+class QRCodeRequest(QRCodeItem):
+    format: QRFormat = "png"
+
 # QRCode yanıtı
 class QRCodeResponse(BaseModel):
-    qr_token: str
+    qr_token: Optional[str] = None  # png/svg data URL
+    matrix: Optional[List[str]] = None  # satır başına "0"/"1", "1" koyu modül
+
+# Toplu QRCode isteği
+class QRCodeBatchRequest(BaseModel):
+    items: List[QRCodeItem]
+    format: QRFormat = "png"
+
+# Toplu QRCode yanıtı
+class QRCodeBatchItem(QRCodeItem, QRCodeResponse):
+    pass
+
+class QRCodeBatchResponse(BaseModel):
+    codes: List[QRCodeBatchItem]
+
+# Taranan QR kodun çözümü
+class QRCodeResolveResponse(BaseModel):
+    product: ProductData
+    size: Optional[str] = None
+    color: Optional[str] = None
 
 # Hata yanıtı
 class ErrorResponse(BaseModel):
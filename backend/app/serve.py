@@ -0,0 +1,140 @@
+"""
+Üretim sunucusu.
+
+`WORKERS` kadar süreçle çalışır (0 ise CPU sayısı). gunicorn kuruluysa
+uygulama ve model ağırlıkları fork'tan önce ana süreçte yüklenir
+(`preload_app`); worker'lar ağırlık sayfalarını copy-on-write paylaşır.
+Python referans sayaçları yalnızca nesne başlıklarına dokunduğundan
+tensör verisi kopyalanmaz. gunicorn yoksa uvicorn'un kendi worker'larına
+düşülür; bu durumda her worker modeli kendisi yükler ve paylaşım yalnızca
+`MODEL_MMAP` ile (sayfa önbelleği üzerinden) olur.
+
+Birden çok worker'da `LOG_FILE` yok sayılır ve loglar stdout'a yazılır
+(dönen log dosyası süreçler arasında paylaşılamaz).
+
+Çekirdekler worker'lar arasında bölünür: torch, BLAS ve QR süreç havuzu
+worker başına `CPU / WORKERS` thread ile sınırlanır ki N worker N kat
+thread açıp birbirini yavaşlatmasın.
+
+Kullanım:
+    WORKERS=4 python -m app.serve
+"""
+import glob
+import importlib.util
+import multiprocessing
+import os
+import sys
+import tempfile
+from app.utils.config import get_settings
+
+settings = get_settings()
+
+# BLAS/OpenMP havuzlarının boyutu kütüphane yüklenirken okunur
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+def worker_count() -> int:
+    return settings.WORKERS or multiprocessing.cpu_count()
+
+def threads_per_worker(workers: int) -> int:
+    return settings.MODEL_THREADS or max(1, multiprocessing.cpu_count() // workers)
+
+def configure_environment(workers: int) -> int:
+    """
+    Worker'ların ortamını hazırlar; uygulama modülleri içe aktarılmadan
+    önce çağrılmalıdır.
+
+    Returns:
+        int: Worker başına thread sayısı
+    """
+    threads = threads_per_worker(workers)
+    for name in THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+    # Ayarlar hem bu süreçte hem uvicorn'un spawn ettiği worker'larda geçerli olsun
+    os.environ["MODEL_THREADS"] = str(threads)
+    settings.MODEL_THREADS = threads
+    if not settings.QR_WORKERS:
+        os.environ["QR_WORKERS"] = str(threads)
+        settings.QR_WORKERS = threads
+
+    if workers > 1 and settings.LOG_FILE:
+        # RotatingFileHandler süreçler arası güvenli değil: worker'lar aynı
+        # dosyayı ayrı ayrı döndürüp birbirinin kayıtlarını siler. Çok
+        # worker'da loglar yalnızca stdout'a yazılır
+        print(
+            f"WORKERS={workers}: LOG_FILE ({settings.LOG_FILE}) yok sayılıyor, loglar stdout'a yazılır",
+            file=sys.stderr
+        )
+        os.environ["LOG_FILE"] = ""
+        settings.LOG_FILE = ""
+
+    if workers > 1 and settings.METRICS_ENABLED:
+        directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+        if directory is None:
+            os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+        else:
+            # Önceki çalıştırmanın ölü süreçlerine ait değerler toplanmasın
+            os.makedirs(directory, exist_ok=True)
+            for path in glob.glob(os.path.join(directory, "*.db")):
+                os.remove(path)
+    return threads
+
+def gunicorn_options(workers: int) -> dict:
+    return {
+        "bind": f"{settings.HOST}:{settings.PORT}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        # Sanal deneme istekleri REQUEST_MAX_TIMEOUT'a kadar sürebilir
+        "timeout": int(settings.REQUEST_MAX_TIMEOUT) + 10,
+        "graceful_timeout": 30,
+        "keepalive": 5,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+        "loglevel": settings.LOG_LEVEL.lower()
+    }
+
+def load_app():
+    """Uygulamayı ve model ağırlıklarını ana süreçte (fork'tan önce) yükler."""
+    from app.main import app
+    from app.services.deepfashion import deepfashion_service
+    # Isıtma forward pass'i her worker'da lifespan içinde yapılır
+    deepfashion_service.load(warm=False)
+    return app
+
+def post_fork(server, worker) -> None:
+    from app.services.deepfashion import configure_threads
+    configure_threads()
+
+def child_exit(server, worker) -> None:
+    # Ölen worker'ın canlı gauge değerleri toplamdan düşsün
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+def run_gunicorn(workers: int) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(workers).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_app()
+
+    Server().run()
+
+def run_uvicorn(workers: int) -> None:
+    import uvicorn
+    uvicorn.run("app.main:app", host=settings.HOST, port=settings.PORT, workers=workers)
+
+def main() -> None:
+    workers = worker_count()
+    configure_environment(workers)
+    if importlib.util.find_spec("gunicorn") is None:
+        run_uvicorn(workers)
+    else:
+        run_gunicorn(workers)
+
+if __name__ == "__main__":
+    main()
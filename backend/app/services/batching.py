@@ -0,0 +1,129 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, List, Optional
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class MicroBatcher:
+    """
+    Eşzamanlı istekleri kısa bir zaman penceresinde toplayıp tek bir
+    toplu çağrıda işler.
+
+    `process_batch` senkron bir fonksiyondur ve verilen executor'da, event
+    loop'u bloklamadan çalışır. Bir batch işlenirken gelen istekler bir
+    sonraki batch'te birleşir.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        executor: Optional[Executor] = None
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {
+            "batches": 0,
+            "items": 0,
+            "max_batch_size": 0,
+            "last_batch_ms": 0.0,
+            "total_batch_ms": 0.0,
+            "max_batch_ms": 0.0
+        }
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._queue = asyncio.Queue()
+            self._collector = asyncio.ensure_future(self._collect())
+            self._loop = loop
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Bir girdiyi sıradaki batch'e ekler ve kendi sonucunu bekler.
+
+        Args:
+            item (Any): Tek bir girdi
+
+        Returns:
+            Any: `process_batch` çıktısında bu girdiye karşılık gelen sonuç
+        """
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def stop(self) -> None:
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+        self._collector = None
+        self._queue = None
+        self._loop = None
+
+    async def _collect(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._run(loop, batch)
+
+    async def _run(self, loop: asyncio.AbstractEventLoop, batch: list) -> None:
+        items = [item for item, _ in batch]
+        started = time.perf_counter()
+        try:
+            results = await loop.run_in_executor(self.executor, self.process_batch, items)
+        except Exception as e:
+            logger.error(f"Batch işleme hatası ({len(items)} girdi): {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._record(len(items), (time.perf_counter() - started) * 1000)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record(self, size: int, elapsed_ms: float) -> None:
+        stats = self._stats
+        stats["batches"] += 1
+        stats["items"] += size
+        stats["max_batch_size"] = max(stats["max_batch_size"], size)
+        stats["last_batch_ms"] = round(elapsed_ms, 3)
+        stats["total_batch_ms"] += elapsed_ms
+        stats["max_batch_ms"] = round(max(stats["max_batch_ms"], elapsed_ms), 3)
+
+    def stats(self) -> dict:
+        """
+        Batch sayaçlarını ve gecikme bilgisini döndürür.
+
+        Returns:
+            dict: Batch sayısı, ortalama batch boyutu ve batch başına süre (ms)
+        """
+        stats = dict(self._stats)
+        total_ms = stats.pop("total_batch_ms")
+        batches = stats["batches"]
+        stats["avg_batch_size"] = round(stats["items"] / batches, 2) if batches else 0.0
+        stats["avg_batch_ms"] = round(total_ms / batches, 3) if batches else 0.0
+        return stats
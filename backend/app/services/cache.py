@@ -0,0 +1,217 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.utils.redis_client import REDIS_ERRORS, get_redis
+from app.utils.logger import get_logger
+from app.utils.metrics import cache_counters, observe_upstream
+from app.utils.resilience import detached_task, wait_within_deadline
+
+logger = get_logger(__name__)
+
+_MISSING = object()
+
+class LocalTTLCache:
+    """Süre sınırlı girdiler tutan, boyutu sınırlı süreç içi LRU önbellek."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        """Girdiyi döndürür; yoksa veya süresi dolmuşsa `_MISSING` döner."""
+        item = self._data.get(key)
+        if item is None:
+            return _MISSING
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class SingleFlight:
+    """
+    Aynı anahtar için eşzamanlı yüklemeleri tek bir çağrıda birleştirir.
+
+    Yükleme ayrı bir task olarak ve ilk çağıranın son anından bağımsız
+    çalışır; bekleyenlerden biri iptal edilse ya da süresi dolsa bile
+    diğerleri sonucu almaya devam eder ve sonuç önbelleğe yazılır. Her
+    bekleyenin süre sınırı yalnızca kendi beklemesine uygulanır.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = detached_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+        return await wait_within_deadline(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Kimse beklemiyorsa "exception was never retrieved" uyarısını engelle
+        if not task.cancelled():
+            task.exception()
+
+class TwoTierCache:
+    """
+    Süreç içi LRU ön katmanı ve Redis arka katmanı olan önbellek.
+
+    Değerler Redis'te JSON olarak tutulur. Boş (None) sonuçlar ayrı ve
+    genellikle daha kısa bir süreyle (`negative_ttl`) tutulur ki geçici bir
+    upstream ıskalaması anahtarı uzun süre zehirlemesin. Redis erişilemezse önbellek
+    yalnızca yerel katmanla çalışmaya devam eder ve Redis kısa bir süre
+    devre dışı bırakılır.
+    """
+
+    REDIS_RETRY_INTERVAL = 5.0  # saniye
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int,
+        local_maxsize: int = 1024,
+        use_redis: bool = True,
+        negative_ttl: Optional[int] = None
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.use_redis = use_redis
+        self.local = LocalTTLCache(local_maxsize)
+        self.flight = SingleFlight()
+        self._redis_disabled_until = 0.0
+        self._stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "redis_errors": 0
+        }
+        self._counters = cache_counters(namespace, ("local_hit", "redis_hit", "miss"))
+
+    def _ttl_for(self, value: Any) -> int:
+        return self.negative_ttl if value is None else self.ttl
+
+    def _redis_key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def _redis_available(self) -> bool:
+        return self.use_redis and time.monotonic() >= self._redis_disabled_until
+
+    def _redis_failed(self, e: Exception) -> None:
+        self._stats["redis_errors"] += 1
+        self._redis_disabled_until = time.monotonic() + self.REDIS_RETRY_INTERVAL
+        logger.warning(f"Önbellek Redis hatası ({self.namespace}): {str(e)}")
+
+    async def _redis_get(self, key: str) -> Any:
+        if not self._redis_available():
+            return _MISSING
+        try:
+            with observe_upstream("redis"):
+                raw = await get_redis().get(self._redis_key(key))
+        except REDIS_ERRORS as e:
+            self._redis_failed(e)
+            return _MISSING
+        if raw is None:
+            return _MISSING
+        return json.loads(raw)
+
+    async def _redis_set(self, key: str, value: Any) -> None:
+        if not self._redis_available():
+            return
+        try:
+            with observe_upstream("redis"):
+                await get_redis().set(
+                    self._redis_key(key),
+                    json.dumps(value, separators=(",", ":")),
+                    ex=self._ttl_for(value)
+                )
+        except REDIS_ERRORS as e:
+            self._redis_failed(e)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Değeri önbellekten döndürür, yoksa `loader` ile yükler.
+
+        Aynı anahtar için eşzamanlı ıskalamalar tek bir `loader` çağrısı yapar.
+
+        Args:
+            key (str): Önbellek anahtarı
+            loader (Callable): Değeri üreten async fonksiyon (JSON uyumlu değer)
+
+        Returns:
+            Any: Önbellekteki ya da yeni yüklenen değer
+        """
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self._stats["local_hits"] += 1
+            self._counters["local_hit"].inc()
+            return value
+
+        if self.flight.in_flight(key):
+            self._stats["coalesced"] += 1
+
+        return await self.flight.do(key, lambda: self._load(key, loader))
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = await self._redis_get(key)
+        if value is not _MISSING:
+            self._stats["redis_hits"] += 1
+            self._counters["redis_hit"].inc()
+            self.local.set(key, value, self._ttl_for(value))
+            return value
+
+        self._stats["misses"] += 1
+        self._counters["miss"].inc()
+        value = await loader()
+        self.local.set(key, value, self._ttl_for(value))
+        await self._redis_set(key, value)
+        return value
+
+    async def invalidate(self, key: str) -> None:
+        self.local.delete(key)
+        if self._redis_available():
+            try:
+                await get_redis().delete(self._redis_key(key))
+            except REDIS_ERRORS as e:
+                self._redis_failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        İsabet/ıskalama sayaçlarını döndürür.
+
+        Returns:
+            dict: Sayaçlar, isabet oranı ve yerel katmandaki girdi sayısı
+        """
+        stats = dict(self._stats)
+        hits = stats["local_hits"] + stats["redis_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        stats["local_size"] = len(self.local)
+        stats["ttl"] = self.ttl
+        return stats
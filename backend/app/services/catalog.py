@@ -0,0 +1,277 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from app.schemas import ProductData
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Katalog dosyası yoksa kullanılan örnek ürünler
+SAMPLE_PRODUCTS = [
+    {
+        "id": "1",
+        "name": "Casual T-Shirt",
+        "brand": "Example Brand",
+        "category": "T-Shirts",
+        "price": 29.99,
+        "image_url": "https://example.com/tshirt.jpg",
+        "description": "Comfortable cotton t-shirt",
+        "sizes": ["S", "M", "L"],
+        "colors": ["White", "Black", "Gray"],
+        "styles": ["casual"]
+    },
+    {
+        "id": "2",
+        "name": "Slim Fit Jeans",
+        "brand": "Example Brand",
+        "category": "Jeans",
+        "price": 59.99,
+        "image_url": "https://example.com/jeans.jpg",
+        "description": "Classic slim fit jeans",
+        "sizes": ["30", "32", "34"],
+        "colors": ["Blue", "Black"],
+        "styles": ["casual"]
+    }
+]
+
+class ProductCatalog:
+    """
+    Sütun tabanlı, salt okunur ürün kataloğu.
+
+    Fiyat ve kategori NumPy dizilerinde, beden/renk üyelikleri değer başına
+    boolean maskelerde tutulur. Her stil için ürünler önceden sıralanmış bir
+    satır indeksine sahiptir; öneri sorgusu yalnızca o stilin satırları
+    üzerinde vektörel filtreleme yapar. Sıcak sorguların `ProductData`
+    sonuçları LRU önbellekte tutulur.
+    """
+
+    SCAN_CHUNK = 1024
+
+    def __init__(self, products: Iterable[dict], cache_size: int = 1024):
+        rows = [self._validate(product) for product in products]
+        self.size = len(rows)
+
+        # Çıktı için gereken metin sütunları
+        self.ids = [row["id"] for row in rows]
+        self.names = [row["name"] for row in rows]
+        self.brands = [row["brand"] for row in rows]
+        self.image_urls = [row["image_url"] for row in rows]
+        self.descriptions = [row.get("description") for row in rows]
+        self.sizes = [tuple(row.get("sizes") or ()) for row in rows]
+        self.colors = [tuple(row.get("colors") or ()) for row in rows]
+
+        # Filtrelenen sütunlar
+        self.prices = np.array([row["price"] for row in rows], dtype=np.float64)
+        self.categories, self.category_names, self.category_codes = self._encode(
+            [row["category"] for row in rows]
+        )
+        self.size_masks = self._membership(self.sizes, key=str.lower)
+        self.color_masks = self._membership(self.colors, key=str.lower)
+
+        self.id_index: Dict[str, int] = {product_id: i for i, product_id in enumerate(self.ids)}
+        self.style_index = self._build_style_index(rows)
+        # Stili bilinmeyen fotoğraflar için genel sıralama
+        self.default_rows = self._rank(range(self.size), rows)
+
+        self.recommend = lru_cache(maxsize=cache_size)(self._recommend)
+
+    @staticmethod
+    def _validate(product: dict) -> dict:
+        fields = {k: v for k, v in product.items() if k in ProductData.model_fields}
+        ProductData(**fields)
+        return product
+
+    @staticmethod
+    def _encode(values: List[str]) -> Tuple[Dict[str, int], List[str], np.ndarray]:
+        """Metin sütununu tamsayı kodlarına çevirir (büyük/küçük harf duyarsız)."""
+        vocabulary: Dict[str, int] = {}
+        names: List[str] = []
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            code = vocabulary.get(value.lower())
+            if code is None:
+                code = vocabulary[value.lower()] = len(names)
+                names.append(value)
+            codes[i] = code
+        return vocabulary, names, codes
+
+    def _membership(self, values: List[tuple], key) -> Dict[str, np.ndarray]:
+        masks: Dict[str, np.ndarray] = {}
+        for row, row_values in enumerate(values):
+            for value in row_values:
+                mask = masks.get(key(value))
+                if mask is None:
+                    mask = masks[key(value)] = np.zeros(self.size, dtype=bool)
+                mask[row] = True
+        return masks
+
+    @staticmethod
+    def _rank(row_ids: Iterable[int], rows: List[dict]) -> np.ndarray:
+        # Yüksek popülerlik önce; eşitlikte dosyadaki sıra korunur
+        ranked = sorted(row_ids, key=lambda i: -float(rows[i].get("popularity", 0)))
+        return np.array(ranked, dtype=np.int32)
+
+    def _build_style_index(self, rows: List[dict]) -> Dict[str, np.ndarray]:
+        members: Dict[str, List[int]] = {}
+        for i, row in enumerate(rows):
+            for style in row.get("styles") or ():
+                members.setdefault(style.lower(), []).append(i)
+        return {style: self._rank(row_ids, rows) for style, row_ids in members.items()}
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "ProductCatalog":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.loads(line) for line in f if line.strip())
+
+    @classmethod
+    def from_sqlite(cls, path: str, table: str = "products") -> "ProductCatalog":
+        """`sizes`, `colors` ve `styles` sütunları JSON dizisi olarak saklanır."""
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        connection.row_factory = sqlite3.Row
+        try:
+            products = []
+            for row in connection.execute(f"SELECT * FROM {table}"):
+                product = dict(row)
+                for column in ("sizes", "colors", "styles"):
+                    if product.get(column):
+                        product[column] = json.loads(product[column])
+                products.append(product)
+        finally:
+            connection.close()
+        return cls(products)
+
+    @classmethod
+    def from_path(cls, path: Optional[str]) -> "ProductCatalog":
+        if not path or not os.path.exists(path):
+            logger.warning(f"Katalog dosyası bulunamadı ({path}), örnek ürünler kullanılıyor")
+            return cls(SAMPLE_PRODUCTS)
+        if path.endswith((".db", ".sqlite", ".sqlite3")):
+            catalog = cls.from_sqlite(path)
+        else:
+            catalog = cls.from_jsonl(path)
+        logger.info(f"Katalog yüklendi: {catalog.size} ürün ({path})")
+        return catalog
+
+    def _recommend(
+        self,
+        style: str,
+        size: Optional[str] = None,
+        color: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        limit: int = 10
+    ) -> Tuple[ProductData, ...]:
+        rows = self.style_index.get(style.lower(), self.default_rows)
+        return self.select(rows, size, color, category, min_price, max_price, limit)
+
+    def select(
+        self,
+        rows: np.ndarray,
+        size: Optional[str] = None,
+        color: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        limit: int = 10
+    ) -> Tuple[ProductData, ...]:
+        """
+        Verilen sıradaki satırlardan filtrelere uyan ilk `limit` ürünü döndürür.
+
+        Args:
+            rows (np.ndarray): Öncelik sırasına dizilmiş katalog satırları
+            limit (int): En fazla ürün sayısı
+
+        Returns:
+            Tuple[ProductData, ...]: Sırası korunmuş ürünler
+        """
+        category_code = None
+        if category:
+            category_code = self.categories.get(category.lower())
+            if category_code is None:
+                return ()
+
+        filtered = size or color or category or min_price is not None or max_price is not None
+        if not filtered:
+            return tuple(self.product(int(i)) for i in rows[:limit])
+
+        # Satırlar parça parça taranır ve limit dolunca durulur; seçici
+        # olmayan filtrelerde maliyet katalog boyutundan bağımsız kalır
+        selected: List[int] = []
+        for start in range(0, len(rows), self.SCAN_CHUNK):
+            chunk = rows[start:start + self.SCAN_CHUNK]
+            mask = np.ones(len(chunk), dtype=bool)
+            if size:
+                mask &= self._lookup(self.size_masks, size.lower(), chunk)
+            if color:
+                mask &= self._lookup(self.color_masks, color.lower(), chunk)
+            if category_code is not None:
+                mask &= self.category_codes[chunk] == category_code
+            if min_price is not None:
+                mask &= self.prices[chunk] >= min_price
+            if max_price is not None:
+                mask &= self.prices[chunk] <= max_price
+            selected.extend(chunk[mask][:limit - len(selected)].tolist())
+            if len(selected) >= limit:
+                break
+
+        return tuple(self.product(i) for i in selected)
+
+    def rows(self, product_ids: Iterable[str]) -> np.ndarray:
+        """Ürün kimliklerini katalog satırlarına çevirir; katalogda olmayanlar atlanır."""
+        rows = [self.id_index.get(product_id) for product_id in product_ids]
+        return np.array([row for row in rows if row is not None], dtype=np.int32)
+
+    @staticmethod
+    def _lookup(masks: Dict[str, np.ndarray], value: str, rows: np.ndarray) -> np.ndarray:
+        mask = masks.get(value)
+        if mask is None:
+            return np.zeros(len(rows), dtype=bool)
+        return mask[rows]
+
+    def product(self, row: int) -> ProductData:
+        """Satırı doğrulama yapmadan `ProductData`'ya çevirir (veri yüklenirken doğrulandı)."""
+        return ProductData.model_construct(
+            id=self.ids[row],
+            name=self.names[row],
+            brand=self.brands[row],
+            category=self.category_names[self.category_codes[row]],
+            price=float(self.prices[row]),
+            image_url=self.image_urls[row],
+            description=self.descriptions[row],
+            sizes=list(self.sizes[row]) or None,
+            colors=list(self.colors[row]) or None
+        )
+
+    def get(self, product_id: str) -> Optional[ProductData]:
+        """Ürünü kimliğiyle O(1) bulur."""
+        row = self.id_index.get(product_id)
+        return self.product(row) if row is not None else None
+
+_catalog: Optional[ProductCatalog] = None
+_catalog_lock = threading.Lock()
+
+def get_catalog() -> ProductCatalog:
+    """Paylaşılan kataloğu döndürür, ilk çağrıda yükler."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = ProductCatalog.from_path(settings.CATALOG_PATH)
+    return _catalog
+
+async def load_catalog() -> ProductCatalog:
+    """
+    Kataloğu event loop'u bloklamadan döndürür.
+
+    Henüz yüklenmediyse (`lazy` açılışta ısınma sürerken) yükleme ya da
+    kilit beklemesi bir iş parçacığında yapılır.
+    """
+    return _catalog if _catalog is not None else await asyncio.to_thread(get_catalog)
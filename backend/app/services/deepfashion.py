@@ -1,66 +1,267 @@
-import base64
-from typing import List
+import asyncio
+import importlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Union
+import numpy as np
 from app.schemas import ProductData
+from app.services.batching import MicroBatcher
+from app.services.catalog import get_catalog, load_catalog
+from app.services.preprocessing import load_image, normalize_batch
+from app.services.vector_index import get_vector_index, load_vector_index, normalize
+from app.utils.config import get_settings
 from app.utils.logger import get_logger
 
+# torch içe aktarımı ~2 sn sürer; açılışı (ve canlılık yoklamasını) bekletmesin
+# diye model yüklenirken, inference thread'inde yapılır
+torch = None
+
+def _import_torch():
+    global torch
+    if torch is None:
+        try:
+            torch = importlib.import_module("torch")
+        except ImportError:  # Model olmadan da API ayağa kalkabilsin
+            return None
+        configure_threads()
+    return torch
+
+def configure_threads() -> None:
+    """
+    torch'un intra-op thread sayısını `MODEL_THREADS` ile sınırlar.
+
+    Çok worker'lı çalıştırmada her worker çekirdeklerin bir payını alır
+    (`app.serve`); aksi halde her worker tüm çekirdekleri kullanmaya çalışır.
+    """
+    if torch is not None and settings.MODEL_THREADS > 0:
+        torch.set_num_threads(settings.MODEL_THREADS)
+
 logger = get_logger(__name__)
+settings = get_settings()
+
+STYLES = ["casual", "formal", "sporty", "bohemian", "streetwear", "elegant"]
+DEFAULT_STYLE = "casual"
+
+class StyleAnalysis(NamedTuple):
+    style: str
+    embedding: Optional[np.ndarray] = None  # L2 normalize görsel gömmesi
+
+class DeepFashionService:
+    """
+    Stil sınıflandırıcı.
+
+    Model uygulama açılışında bir kez yüklenir ve çıkarım modunda tutulur.
+    Çok worker'lı çalıştırmada ağırlıklar fork'tan önce ana süreçte
+    yüklenebilir (`load(warm=False)`) ya da `MODEL_MMAP` ile salt okunur
+    dosyadan eşlenir; iki durumda da sayfalar worker'lar arasında paylaşılır.
+    Eşzamanlı istekler `MicroBatcher` ile tek bir forward pass'te toplanır;
+    forward pass event loop dışında, tek bir inference thread'inde çalışır.
+    Model bulunamazsa her fotoğraf için varsayılan stil döndürülür.
+
+    Model `(logits, embedding)` çifti döndürüyorsa gömme olarak ikinci çıktı,
+    yalnızca logits döndürüyorsa normalize edilmiş logits kullanılır. Ürün
+    gömmeleri aynı modelle üretilmelidir.
+    """
+
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        model=None,
+        styles: List[str] = None,
+        input_size: int = None,
+        max_batch_size: int = None,
+        max_wait_ms: float = None
+    ):
+        self.model_path = model_path or settings.MODEL_PATH
+        self.model = model
+        self._warm = False
+        self.styles = styles or STYLES
+        self.input_size = input_size or settings.MODEL_INPUT_SIZE
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="deepfashion")
+        self.batcher = MicroBatcher(
+            self._predict_batch,
+            max_batch_size=max_batch_size or settings.MODEL_BATCH_SIZE,
+            max_wait_ms=settings.MODEL_BATCH_WAIT_MS if max_wait_ms is None else max_wait_ms,
+            executor=self._executor
+        )
+        if self.model is not None:
+            self._prepare(self.model)
+
+    @property
+    def ready(self) -> bool:
+        return self.model is not None
+
+    def load(self, warm: bool = True) -> None:
+        """
+        Model ağırlıklarını diskten yükler (senkron, açılışta bir kez).
+
+        Args:
+            warm (bool): İlk çağrının gecikmesini açılışa taşımak için boş bir
+                forward pass yapılır. Fork'tan önce yüklerken kapatılmalıdır;
+                ana süreçte başlayan OpenMP thread'leri fork'tan sonra
+                çocukları kilitleyebilir.
+        """
+        if self.model is None:
+            model = self._read_weights()
+            if model is None:
+                return
+            model.eval()
+            self.model = model
+            logger.info(f"Stil modeli yüklendi: {self.model_path}")
+        if warm and not self._warm:
+            self._prepare(self.model)
+
+    def _read_weights(self):
+        if not os.path.exists(self.model_path):
+            logger.warning(f"Model dosyası bulunamadı: {self.model_path}")
+            return None
+        if _import_torch() is None:
+            logger.warning("torch kurulu değil, stil analizi varsayılan stil ile çalışacak")
+            return None
+
+        try:
+            return torch.jit.load(self.model_path, map_location="cpu")
+        except RuntimeError:
+            # TorchScript değilse tüm modülün kaydedildiğini varsay; mmap ile
+            # tensörler dosyanın sayfa önbelleğinden okunur, kopyalanmaz
+            return torch.load(self.model_path, map_location="cpu", mmap=settings.MODEL_MMAP)
+
+    def _prepare(self, model) -> None:
+        model.eval()
+        # İlk çağrının gecikmesini açılışa taşı
+        dummy = np.zeros((1, 3, self.input_size, self.input_size), dtype=np.float32)
+        self._forward(model, dummy)
+        self._warm = True
+
+    @staticmethod
+    def _forward(model, batch: np.ndarray):
+        torch = _import_torch()
+        with torch.inference_mode():
+            output = model(torch.from_numpy(batch))
+        if isinstance(output, (tuple, list)):
+            logits, embeddings = output[0], output[1]
+        else:
+            logits = embeddings = output
+        return logits.numpy(), normalize(embeddings.numpy())
+
+    def _predict_batch(self, images: List[np.ndarray]) -> List[StyleAnalysis]:
+        logits, embeddings = self._forward(self.model, normalize_batch(images))
+        return [
+            StyleAnalysis(self.styles[i], embedding)
+            for i, embedding in zip(logits.argmax(axis=1), embeddings)
+        ]
+
+    async def start(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.load)
 
-def analyze_style(image_base64: str) -> str:
+    async def stop(self) -> None:
+        await self.batcher.stop()
+
+    async def analyze(self, image: Union[str, bytes]) -> StyleAnalysis:
+        if self.model is None:
+            return StyleAnalysis(DEFAULT_STYLE)
+        # Çözme/küçültme istek başına paralel, normalizasyon batch başına tek geçişte
+        pixels = await asyncio.to_thread(load_image, image, self.input_size)
+        return await self.batcher.submit(pixels)
+
+    async def analyze_style(self, image: Union[str, bytes]) -> str:
+        return (await self.analyze(image)).style
+
+    def stats(self) -> dict:
+        return {"model_loaded": self.ready, **self.batcher.stats()}
+
+deepfashion_service = DeepFashionService()
+
+async def analyze(image: Union[str, bytes]) -> StyleAnalysis:
+    """
+    Kıyafet fotoğrafının stilini ve görsel gömmesini çıkarır.
+    
+    Args:
+        image (Union[str, bytes]): Base64 formatında fotoğraf ya da ham baytlar
+        
+    Returns:
+        StyleAnalysis: Tespit edilen stil ve (model varsa) gömme
+    """
+    try:
+        return await deepfashion_service.analyze(image)
+        
+    except Exception as e:
+        logger.error(f"Stil analizi hatası: {str(e)}")
+        raise
+
+async def analyze_style(image: Union[str, bytes]) -> str:
     """
     Kıyafet fotoğrafının stilini analiz eder.
     
     Args:
-        image_base64 (str): Base64 formatında fotoğraf
+        image (Union[str, bytes]): Base64 formatında fotoğraf ya da ham baytlar
         
     Returns:
         str: Tespit edilen stil (örn. "casual", "formal", "sporty", vb.)
     """
     try:
-        # TODO: Gerçek stil analizi burada yapılacak
-        # Şimdilik örnek bir stil döndürüyoruz
-        return "casual"
+        return await deepfashion_service.analyze_style(image)
         
     except Exception as e:
         logger.error(f"Stil analizi hatası: {str(e)}")
         raise
 
-def get_recommendations(style: str) -> List[ProductData]:
+async def recommend(style: str, embedding: Optional[np.ndarray] = None, **filters) -> List[ProductData]:
+    """
+    `get_recommendations`'ın async karşılığı; katalog ve gömme dizini henüz
+    yüklenmediyse event loop'u bloklamadan bekler. Benzerlik araması
+    (mmap'li vektörler üzerinde matris-vektör çarpımı) thread'de çalışır.
+    """
+    await load_catalog()
+    if embedding is not None:
+        await load_vector_index()
+    return await asyncio.to_thread(get_recommendations, style, embedding=embedding, **filters)
+
+def get_recommendations(
+    style: str,
+    size: Optional[str] = None,
+    color: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: Optional[int] = None,
+    embedding: Optional[np.ndarray] = None
+) -> List[ProductData]:
     """
     Belirtilen stile uygun ürün önerileri döndürür.
     
+    Gömme verilmişse ve gömme dizini yüklüyse öneriler fotoğrafa görsel
+    olarak en yakın ürünlerdir; filtreler yakın adaylara uygulanır, eksik
+    kalan yerler stil önerileriyle doldurulur.
+    
     Args:
         style (str): Kıyafet stili
+        size (str, optional): Beden filtresi
+        color (str, optional): Renk filtresi
+        category (str, optional): Kategori filtresi
+        min_price (float, optional): En düşük fiyat
+        max_price (float, optional): En yüksek fiyat
+        limit (int, optional): En fazla öneri sayısı
+        embedding (np.ndarray, optional): Fotoğrafın görsel gömmesi
         
     Returns:
         List[ProductData]: Önerilen ürünler listesi
     """
     try:
-        # TODO: Gerçek ürün önerileri burada yapılacak
-        # Şimdilik örnek ürünler döndürüyoruz
-        return [
-            ProductData(
-                id="1",
-                name="Casual T-Shirt",
-                brand="Example Brand",
-                category="T-Shirts",
-                price=29.99,
-                image_url="https://example.com/tshirt.jpg",
-                description="Comfortable cotton t-shirt",
-                sizes=["S", "M", "L"],
-                colors=["White", "Black", "Gray"]
-            ),
-            ProductData(
-                id="2",
-                name="Slim Fit Jeans",
-                brand="Example Brand",
-                category="Jeans",
-                price=59.99,
-                image_url="https://example.com/jeans.jpg",
-                description="Classic slim fit jeans",
-                sizes=["30", "32", "34"],
-                colors=["Blue", "Black"]
-            )
-        ]
+        catalog = get_catalog()
+        limit = limit or settings.RECOMMENDATION_LIMIT
+        by_style = catalog.recommend(style, size, color, category, min_price, max_price, limit)
+
+        index = get_vector_index() if embedding is not None else None
+        if index is None or index.dim != len(embedding):
+            return list(by_style)
+
+        neighbours = index.search(embedding, max(limit, settings.EMBEDDING_CANDIDATES))
+        rows = catalog.rows(product_id for product_id, _ in neighbours)
+        similar = list(catalog.select(rows, size, color, category, min_price, max_price, limit))
+        seen = {product.id for product in similar}
+        similar.extend(product for product in by_style if product.id not in seen)
+        return similar[:limit]
         
     except Exception as e:
         logger.error(f"Ürün önerisi hatası: {str(e)}")
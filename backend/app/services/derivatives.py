@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import NamedTuple, Optional
+from PIL import Image
+from app.services.cache import SingleFlight
+from app.services.preprocessing import decode_image_bytes
+from app.services.tryon_cache import DiskLRUStore
+from app.utils.config import get_settings
+from app.utils.exceptions import APIError, ValidationError
+from app.utils.logger import get_logger
+from app.utils.metrics import cache_counters
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Kiosk ve telefon ekranları için sabit genişlikler; keyfi boyutlara izin
+# verilmez ki önbellek sınırlı sayıda türevle dolsun
+WIDTHS = (320, 640, 1024)
+FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+_RESULT_ID = re.compile(r"[0-9a-f]{32}")
+
+class Derivative(NamedTuple):
+    data: bytes
+    media_type: str
+    etag: str
+    last_modified: Optional[float]
+
+def render_derivative(data: bytes, width: int, fmt: str, quality: int) -> bytes:
+    """
+    Görseli en fazla `width` piksel genişliğe küçültüp `fmt` olarak kodlar.
+
+    Görsel hiçbir zaman büyütülmez; JPEG kaynaklarda `draft` ile çözme
+    sırasında ölçeklenir.
+    """
+    with Image.open(BytesIO(data)) as img:
+        size = (width, max(1, round(img.height * width / img.width)))
+        shrink = img.width > width
+        if shrink:
+            img.draft("RGB", size)
+        if fmt == "jpeg" or img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGB")
+        if shrink:
+            img.thumbnail(size, Image.LANCZOS)
+
+        buffer = BytesIO()
+        if fmt == "webp":
+            img.save(buffer, format="WEBP", quality=quality, method=4)
+        else:
+            img.save(buffer, format="JPEG", quality=quality, optimize=True, progressive=True)
+        return buffer.getvalue()
+
+class DerivativeService:
+    """
+    Sanal deneme sonuçlarını bir kez saklar, boyut/format türevlerini
+    istek üzerine üretip önbellekler.
+
+    Sonuçlar içerik özetiyle (`result_id`) adreslenir; aynı görsel iki kez
+    saklanmaz ve bir türevin baytları anahtarından tamamen belirlenir. Bu
+    yüzden ETag türev üretilmeden (diske bile bakılmadan) hesaplanabilir.
+    Türevler thread havuzunda üretilir (PIL kodlama sırasında GIL'i bırakır);
+    aynı türev için eşzamanlı istekler tek bir üretimde birleşir.
+    """
+
+    def __init__(
+        self,
+        originals: DiskLRUStore,
+        variants: DiskLRUStore,
+        quality: int = None,
+        workers: int = None
+    ):
+        self.originals = originals
+        self.variants = variants
+        self.quality = quality or settings.DERIVATIVE_QUALITY
+        self.flight = SingleFlight()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or settings.DERIVATIVE_WORKERS,
+            thread_name_prefix="derivative"
+        )
+        self._stats = {"hits": 0, "misses": 0}
+        self._counters = cache_counters("derivative", ("hit", "miss"))
+
+    @staticmethod
+    def _original_key(result_id: str) -> str:
+        return f"{result_id}.orig"
+
+    def variant_key(self, result_id: str, width: int, fmt: str) -> str:
+        """
+        Türevin depo anahtarı; aynı zamanda ETag değeridir.
+
+        Raises:
+            ValidationError: Kimlik, genişlik ya da format geçersizse
+        """
+        if not _RESULT_ID.fullmatch(result_id):
+            raise ValidationError("Geçersiz sonuç kimliği")
+        if width not in WIDTHS:
+            raise ValidationError(f"Desteklenen genişlikler: {', '.join(map(str, WIDTHS))}")
+        if fmt not in FORMATS:
+            raise ValidationError(f"Desteklenen formatlar: {', '.join(FORMATS)}")
+        return f"{result_id}-{width}-q{self.quality}.{fmt}"
+
+    def etag(self, result_id: str, width: int, fmt: str) -> str:
+        return f'"{self.variant_key(result_id, width, fmt)}"'
+
+    async def save(self, image: str) -> str:
+        """
+        Base64 sonucu (yoksa) saklar ve kimliğini döndürür.
+
+        Raises:
+            ValidationError: Görsel base64 olarak çözülemezse
+        """
+        data = decode_image_bytes(image)
+        result_id = hashlib.blake2b(data, digest_size=16).hexdigest()
+        key = self._original_key(result_id)
+        if await asyncio.to_thread(self.originals.modified, key) is None:
+            await asyncio.to_thread(self.originals.put, key, data)
+        return result_id
+
+    async def get(self, result_id: str, width: int, fmt: str) -> Derivative:
+        """
+        Türevi önbellekten döndürür, yoksa üretir.
+
+        Raises:
+            ValidationError: Parametreler geçersizse
+            APIError: Sonuç bulunamazsa (404)
+        """
+        key = self.variant_key(result_id, width, fmt)
+        data = await asyncio.to_thread(self.variants.get, key)
+        if data is None:
+            self._stats["misses"] += 1
+            self._counters["miss"].inc()
+            data = await self.flight.do(key, lambda: self._render(result_id, width, fmt, key))
+        else:
+            self._stats["hits"] += 1
+            self._counters["hit"].inc()
+        return Derivative(data, FORMATS[fmt], f'"{key}"', await self.last_modified(result_id))
+
+    async def last_modified(self, result_id: str) -> Optional[float]:
+        return await asyncio.to_thread(self.originals.modified, self._original_key(result_id))
+
+    async def _render(self, result_id: str, width: int, fmt: str, key: str) -> bytes:
+        original = await asyncio.to_thread(self.originals.get, self._original_key(result_id))
+        if original is None:
+            raise APIError(status_code=404, detail=f"Sonuç bulunamadı: {result_id}")
+
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(
+            self._executor, render_derivative, original, width, fmt, self.quality
+        )
+        await loop.run_in_executor(self._executor, self.variants.put, key, data)
+        return data
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        total = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / total, 4) if total else 0.0,
+            "originals": len(self.originals),
+            "variants": len(self.variants),
+            "bytes": self.originals.total_bytes + self.variants.total_bytes
+        }
+
+def create_derivative_service(directory: str = None) -> DerivativeService:
+    directory = directory or settings.DERIVATIVE_CACHE_DIR
+    return DerivativeService(
+        DiskLRUStore(os.path.join(directory, "originals"), settings.DERIVATIVE_ORIGINALS_MAX_BYTES),
+        DiskLRUStore(os.path.join(directory, "variants"), settings.DERIVATIVE_MAX_BYTES)
+    )
+
+derivative_service = create_derivative_service()
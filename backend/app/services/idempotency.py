@@ -0,0 +1,352 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from fastapi.responses import JSONResponse
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+from app.utils.metrics import cache_counters, observe_upstream
+from app.utils.redis_client import REDIS_ERRORS, get_redis
+from app.utils.resilience import remaining
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+# İsteğe özgü başlıklar saklanmaz; tekrar oynatılan yanıt kendi değerlerini alır
+PER_REQUEST_HEADERS = frozenset({b"server-timing", b"x-ratelimit-limit", b"x-ratelimit-remaining", b"retry-after"})
+
+class StoredResponse(NamedTuple):
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    fingerprint: str
+
+def _digest(*parts: bytes) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        hasher.update(len(part).to_bytes(8, "big"))
+        hasher.update(part)
+    return hasher.hexdigest()
+
+def _normalized_body(body: bytes, content_type: bytes) -> bytes:
+    # Multipart sınırı her denemede rastgele üretilir; özete katılmamalı
+    for param in content_type.split(b";")[1:]:
+        name, _, value = param.strip().partition(b"=")
+        if name.lower() == b"boundary" and value:
+            return body.replace(value.strip(b'"'), b"")
+    return body
+
+class IdempotencyStore:
+    """
+    Tamamlanmış yanıtları kısa süreli olarak Redis'te tutar.
+
+    Her yanıt tek bir hash'tir (durum, başlıklar, gövde, istek parmak izi);
+    süren işler ayrı bir kilit anahtarıyla işaretlenir ki başka worker'lar
+    aynı işi yeniden başlatmak yerine sonucu beklesin. Redis erişilemezse
+    katman kısa bir süre devre dışı kalır ve istekler normal işlenir.
+    """
+
+    REDIS_RETRY_INTERVAL = 5.0  # saniye
+    POLL_INTERVAL = 0.1  # saniye
+
+    def __init__(self, ttl: int = None, max_bytes: int = None):
+        self.ttl = ttl or settings.IDEMPOTENCY_TTL
+        self.max_bytes = max_bytes or settings.IDEMPOTENCY_MAX_BYTES
+        self._disabled_until = 0.0
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"idem:{key}"
+
+    def available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _failed(self, e: Exception) -> None:
+        self._disabled_until = time.monotonic() + self.REDIS_RETRY_INTERVAL
+        logger.warning(f"Idempotency Redis hatası: {str(e)}")
+
+    async def get(self, key: str) -> Optional[StoredResponse]:
+        if not self.available():
+            return None
+        try:
+            with observe_upstream("redis"):
+                raw = await get_redis().hgetall(self._key(key))
+        except REDIS_ERRORS as e:
+            self._failed(e)
+            return None
+        if not raw:
+            return None
+        return StoredResponse(
+            int(raw[b"status"]),
+            [(name.encode("latin-1"), value.encode("latin-1")) for name, value in json.loads(raw[b"headers"])],
+            raw[b"body"],
+            raw[b"fingerprint"].decode()
+        )
+
+    async def put(self, key: str, response: StoredResponse) -> None:
+        if not self.available() or len(response.body) > self.max_bytes:
+            return
+        headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in response.headers]
+        try:
+            with observe_upstream("redis"):
+                async with get_redis().pipeline(transaction=True) as pipe:
+                    pipe.hset(self._key(key), mapping={
+                        "status": response.status,
+                        "headers": json.dumps(headers),
+                        "body": response.body,
+                        "fingerprint": response.fingerprint
+                    })
+                    pipe.expire(self._key(key), self.ttl)
+                    await pipe.execute()
+        except REDIS_ERRORS as e:
+            self._failed(e)
+
+    async def lock(self, key: str, timeout: float) -> bool:
+        """
+        İşi bu worker'a ayırır.
+
+        Returns:
+            bool: Kilit alındıysa (ya da Redis yoksa) True, iş başka bir
+                worker'da sürüyorsa False
+        """
+        if not self.available():
+            return True
+        try:
+            with observe_upstream("redis"):
+                return bool(await get_redis().set(f"{self._key(key)}:lock", 1, nx=True, px=int(timeout * 1000)))
+        except REDIS_ERRORS as e:
+            self._failed(e)
+            return True
+
+    async def unlock(self, key: str) -> None:
+        if not self.available():
+            return
+        try:
+            with observe_upstream("redis"):
+                await get_redis().delete(f"{self._key(key)}:lock")
+        except REDIS_ERRORS as e:
+            self._failed(e)
+
+    async def wait(self, key: str, timeout: float) -> Optional[StoredResponse]:
+        """
+        Başka bir worker'daki işin sonucunu bekler.
+
+        Kilit kalkar ama sonuç saklanmazsa (hata, saklanamayacak kadar büyük
+        yanıt) ya da süre dolarsa None döner; istek normal işlenir.
+        """
+        until = time.monotonic() + timeout
+        while time.monotonic() < until and self.available():
+            await asyncio.sleep(self.POLL_INTERVAL)
+            stored = await self.get(key)
+            if stored is not None:
+                return stored
+            try:
+                if not await get_redis().exists(f"{self._key(key)}:lock"):
+                    return None
+            except REDIS_ERRORS as e:
+                self._failed(e)
+        return None
+
+idempotency_store = IdempotencyStore()
+
+class IdempotencyMiddleware:
+    """
+    Pahalı POST rotalarında tekrarlanan istekleri tek bir işleme indirger.
+
+    İstek anahtarı istemci, yol, `Accept` ve `Idempotency-Key` başlığından;
+    başlık yoksa gövde özetinden (multipart sınırı hariç) üretilir. Başlıksız
+    isteklerde gövde en fazla `IDEMPOTENCY_MAX_BYTES` kadar tamponlanır;
+    daha büyük gövdeler tekilleştirilmeden akış halinde uygulamaya geçer.
+    Middleware rate limit'in içinde kalır ki reddedilen isteklerin gövdesi
+    hiç okunmasın. Aynı anahtarla gelen istek:
+
+    - iş aynı süreçte sürüyorsa ona bağlanır ve aynı yanıtı alır,
+    - başka bir worker'da sürüyorsa sonucu Redis'ten bekler,
+    - tamamlanmışsa `IDEMPOTENCY_TTL` boyunca Redis'ten tekrar oynatılır
+      (`Idempotent-Replayed: true` başlığıyla).
+
+    Aynı başlık anahtarı farklı bir gövdeyle kullanılırsa 422 döner. 5xx ve 429 yanıtları saklanmaz; istemci yeniden denediğinde
+    iş tekrar yapılır. Servis fonksiyonları ve router'lar değişmez.
+    """
+
+    def __init__(self, app, prefixes: Sequence[str], store: IdempotencyStore = None):
+        self.app = app
+        self.prefixes = tuple(prefix.rstrip("/") for prefix in prefixes)
+        self.store = store or idempotency_store
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._counters = cache_counters("idempotency", ("replay", "attach", "miss"))
+
+    def _applies(self, scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "POST" or not settings.IDEMPOTENCY_ENABLED:
+            return False
+        path = scope["path"]
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in self.prefixes)
+
+    @staticmethod
+    async def _read_body(receive, limit: Optional[int] = None) -> Tuple[Optional[bytes], List[dict]]:
+        """
+        Gövdeyi okur.
+
+        Returns:
+            Tuple[Optional[bytes], List[dict]]: Gövde ve okunan mesajlar; istemci
+                koptuysa (ya da 413 verildiyse) veya gövde `limit`'i aştıysa gövde None
+        """
+        messages = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                return None, messages
+            size += len(message.get("body", b""))
+            if limit is not None and size > limit:
+                return None, messages
+            if not message.get("more_body", False):
+                return b"".join(m.get("body", b"") for m in messages), messages
+
+    @staticmethod
+    def _request_key(scope, header_key: Optional[bytes], body: bytes) -> Tuple[str, str]:
+        headers = dict(scope["headers"])
+        client = scope.get("client")
+        identity = (client[0] if client else "unknown").encode()
+        target = f"{scope['path']}?{scope.get('query_string', b'').decode('latin-1')}".encode()
+        # Aynı rota Accept'e göre farklı temsil döndürebilir (ham görsel / JSON)
+        accept = headers.get(b"accept", b"")
+        fingerprint = _digest(target, _normalized_body(body, headers.get(b"content-type", b"")))
+        if header_key:
+            return _digest(identity, target, accept, header_key), fingerprint
+        return _digest(identity, accept, fingerprint.encode()), fingerprint
+
+    def _payload_too_large(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                return not value.isdigit() or int(value) > self.store.max_bytes
+        return False
+
+    @staticmethod
+    async def _pass_through(app, scope, messages, receive, send) -> None:
+        """Okunmuş mesajları tekrar vererek isteği olduğu gibi uygulamaya geçirir."""
+        pending = list(messages)
+
+        async def replay_receive():
+            return pending.pop(0) if pending else await receive()
+
+        await app(scope, replay_receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if not self._applies(scope):
+            await self.app(scope, receive, send)
+            return
+
+        header_key = dict(scope["headers"]).get(HEADER)
+        if header_key is None:
+            # Başlıksız tekrarlar gövde özetiyle yakalanır; büyük gövdeler tamponlanmaz
+            if self._payload_too_large(scope):
+                await self.app(scope, receive, send)
+                return
+            body, messages = await self._read_body(receive, self.store.max_bytes)
+            if body is None:
+                if messages[-1]["type"] == "http.request":
+                    await self._pass_through(self.app, scope, messages, receive, send)
+                return
+            await self._deduplicate(scope, None, body, receive, send)
+            return
+
+        if not 0 < len(header_key) <= MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=400,
+                content={"detail": f"Idempotency-Key 1-{MAX_KEY_LENGTH} karakter olmalıdır"}
+            )
+            await response(scope, receive, send)
+            return
+
+        body, _ = await self._read_body(receive)
+        if body is None:
+            return
+        await self._deduplicate(scope, header_key, body, receive, send)
+
+    async def _deduplicate(self, scope, header_key: Optional[bytes], body: bytes, receive, send) -> None:
+        key, fingerprint = self._request_key(scope, header_key, body)
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        while key in self._in_flight:
+            self._counters["attach"].inc()
+            result = await asyncio.shield(self._in_flight[key])
+            if result is not None:
+                await self._replay(result, fingerprint, scope, receive, send)
+                return
+            # Önceki deneme saklanamadı (5xx/429, hata); iş yeniden yapılır
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        result = None
+        try:
+            result = await self._lead(key, fingerprint, scope, replay_receive, send)
+        finally:
+            future.set_result(result)
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    async def _lead(self, key, fingerprint, scope, receive, send) -> Optional[StoredResponse]:
+        """İsteği saklanan yanıttan, başka worker'dan ya da uygulamadan yanıtlar."""
+        stored = await self.store.get(key)
+        if stored is not None:
+            self._counters["replay"].inc()
+            await self._replay(stored, fingerprint, scope, receive, send)
+            return stored
+
+        timeout = max(remaining() or settings.REQUEST_MAX_TIMEOUT, 1.0)
+        if not await self.store.lock(key, timeout):
+            stored = await self.store.wait(key, timeout)
+            if stored is not None:
+                self._counters["attach"].inc()
+                await self._replay(stored, fingerprint, scope, receive, send)
+                return stored
+
+        self._counters["miss"].inc()
+        status, headers, chunks = 500, [], []
+
+        async def capture(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status, headers = message["status"], list(message.get("headers", ()))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+            if status >= 500 or status == 429:
+                return None
+            headers = [(name, value) for name, value in headers if name.lower() not in PER_REQUEST_HEADERS]
+            result = StoredResponse(status, headers, b"".join(chunks), fingerprint)
+            # Kilit yanıt saklandıktan sonra kalkar; bekleyen worker'lar sonucu bulur
+            await self.store.put(key, result)
+            return result
+        finally:
+            await self.store.unlock(key)
+
+    async def _replay(self, stored: StoredResponse, fingerprint, scope, receive, send) -> None:
+        if stored.fingerprint != fingerprint:
+            response = JSONResponse(
+                status_code=422,
+                content={"detail": "Idempotency-Key farklı bir istekle daha önce kullanıldı"}
+            )
+            await response(scope, receive, send)
+            return
+        await send({
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": [*stored.headers, (b"idempotent-replayed", b"true")]
+        })
+        await send({"type": "http.response.body", "body": stored.body})
@@ -1,42 +1,79 @@
-import os
 import time
-import jwt
-import requests
-import aiohttp
+from jose import jwt
 from app.schemas import VirtualTryOnResponse
+from app.services.tryon_cache import cached_try_on
 from app.utils.config import get_settings
+from app.utils.http import tryon_session
 from app.utils.logger import get_logger
+from app.utils.resilience import Upstream, UpstreamStatusError
 
 settings = get_settings()
 logger = get_logger(__name__)
 
-KOLORS_API_URL = os.getenv("KOLORS_API_URL")
-KOLORS_ACCESS_KEY = os.getenv("KOLORS_ACCESS_KEY")
-KOLORS_SECRET_KEY = os.getenv("KOLORS_SECRET_KEY")
+class KolorsTokenCache:
+    """
+    Kolors API JWT token'ını önbellekte tutar.
+
+    Token 30 dakika geçerlidir; süresinin dolmasına `refresh_margin`
+    saniye kalana kadar aynı token kullanılır.
+    """
+
+    TOKEN_TTL = 1800  # 30 dk
+
+    def __init__(self, access_key: str, secret_key: str, refresh_margin: int = 60):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.refresh_margin = refresh_margin
+        self._token = None
+        self._expires_at = 0
+
+    def get_token(self) -> str:
+        now = int(time.time())
+        if self._token is None or now >= self._expires_at - self.refresh_margin:
+            self._token, self._expires_at = self._mint(now)
+        return self._token
+
+    def _mint(self, now: int):
+        headers = {"alg": "HS256", "typ": "JWT"}
+        expires_at = now + self.TOKEN_TTL
+        payload = {
+            "iss": self.access_key,
+            "exp": expires_at,
+            "nbf": now - 5
+        }
+        token = jwt.encode(payload, self.secret_key, algorithm="HS256", headers=headers)
+        return token, expires_at
+
+_token_cache = KolorsTokenCache(settings.KOLORS_ACCESS_KEY, settings.KOLORS_SECRET_KEY)
+
+# Kolors ve KlingAI uç noktaları aynı sağlayıcıda; devre kesici ortak. Üretim
+# ücretli ve idempotent değil; zaman aşımında yeniden gönderilmez
+_upstream = Upstream("kling", settings.TRYON_TIMEOUT, max_attempts=settings.TRYON_MAX_ATTEMPTS, idempotent=False)
 
 def generate_kolors_api_token():
-    """Kolors API için JWT token."""
-    headers = {"alg": "HS256", "typ": "JWT"}
-    payload = {
-        "iss": KOLORS_ACCESS_KEY,
-        "exp": int(time.time()) + 1800,  # 30 dk
-        "nbf": int(time.time()) - 5
-    }
-    token = jwt.encode(payload, KOLORS_SECRET_KEY, algorithm="HS256", headers=headers)
-    return token
+    """Kolors API için JWT token (süresi dolana kadar önbellekten)."""
+    return _token_cache.get_token()
 
-def virtual_try_on(payload: dict) -> VirtualTryOnResponse:
-    url = f"{KOLORS_API_URL}/v1/images/kolors-virtual-try-on"
+async def virtual_try_on(payload: dict) -> VirtualTryOnResponse:
+    url = f"{settings.KOLORS_API_URL}/v1/images/kolors-virtual-try-on"
     token = generate_kolors_api_token()
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json"
     }
-    response = requests.post(url, json=payload, headers=headers)
-    if response.status_code != 200:
-        raise Exception(f"Kolors Virtual Try-On API hatası {response.status_code}: {response.text}")
-    data = response.json().get("data", {})
-    return VirtualTryOnResponse(virtual_image_url=data.get("virtual_image_url", ""))
+
+    async def post(timeout: float) -> dict:
+        async with tryon_session.request("POST", url, json=payload, headers=headers, timeout=timeout) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise UpstreamStatusError(
+                    response.status,
+                    f"Kolors Virtual Try-On API hatası {response.status}: {error_text}"
+                )
+            return (await response.json()).get("data", {})
+
+    data = await _upstream.call(post)
+    return VirtualTryOnResponse(result_image=data.get("virtual_image_url", ""), success=True)
 
 class KlingAIService:
     def __init__(self):
@@ -44,6 +81,7 @@ class KlingAIService:
         self.access_key = settings.KOLORS_ACCESS_KEY
         self.secret_key = settings.KOLORS_SECRET_KEY
 
+    @cached_try_on("kling", "human_image", "cloth_image")
     async def generate_virtual_try_on(self, human_image: str, cloth_image: str) -> dict:
         """
         Kolors AI API'sini kullanarak virtual try-on işlemi gerçekleştirir.
@@ -68,19 +106,25 @@ class KlingAIService:
                 "cloth_image": cloth_image
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
+            async def post(timeout: float) -> dict:
+                async with tryon_session.request(
+                    "POST",
                     f"{self.api_url}/virtual-try-on",
                     headers=headers,
-                    json=payload
+                    json=payload,
+                    timeout=timeout
                 ) as response:
                     if response.status != 200:
                         error_data = await response.json()
                         logger.error(f"Kolors API error: {error_data}")
-                        raise Exception(f"Kolors API error: {error_data.get('message', 'Unknown error')}")
+                        raise UpstreamStatusError(
+                            response.status,
+                            f"Kolors API error: {error_data.get('message', 'Unknown error')}"
+                        )
                     
-                    result = await response.json()
-                    return result
+                    return await response.json()
+            
+            return await _upstream.call(post)
 
         except Exception as e:
             logger.error(f"Virtual try-on generation error: {str(e)}")
@@ -1,23 +1,42 @@
+import base64
+from typing import Union
 import aiohttp
+from app.services.tryon_cache import cached_try_on
 from app.utils.config import get_settings
+from app.utils.http import tryon_session
 from app.utils.logger import get_logger
+from app.utils.resilience import Upstream, UpstreamStatusError
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+def _as_base64(image: Union[str, bytes]) -> str:
+    if isinstance(image, str):
+        return image
+    return base64.b64encode(image).decode()
+
 class KolorsService:
     def __init__(self):
         self.api_url = settings.KOLORS_API_URL
         self.access_key = settings.KOLORS_ACCESS_KEY
         self.secret_key = settings.KOLORS_SECRET_KEY
+        # Üretim ücretli ve idempotent değil; zaman aşımında yeniden gönderilmez
+        self.upstream = Upstream(
+            "kolors", settings.TRYON_TIMEOUT, max_attempts=settings.TRYON_MAX_ATTEMPTS, idempotent=False
+        )
         
-    async def try_on(self, user_image: str, product_image: str) -> str:
+    @cached_try_on("kolors", "user_image", "product_image")
+    async def try_on(
+        self,
+        user_image: Union[str, bytes],
+        product_image: Union[str, bytes]
+    ) -> str:
         """
         Kolors API'sini kullanarak sanal deneme yapar.
         
         Args:
-            user_image (str): Base64 formatında kullanıcı fotoğrafı
-            product_image (str): Base64 formatında ürün fotoğrafı
+            user_image (Union[str, bytes]): Base64 formatında ya da ham bayt olarak kullanıcı fotoğrafı
+            product_image (Union[str, bytes]): Base64 formatında ya da ham bayt olarak ürün fotoğrafı
             
         Returns:
             str: Base64 formatında sonuç fotoğrafı
@@ -29,24 +48,29 @@ class KolorsService:
                 "Content-Type": "application/json"
             }
             
+            # Yüklenen dosyalar upstream için yalnızca burada bir kez base64'e çevrilir
             payload = {
-                "user_image": user_image,
-                "product_image": product_image
+                "user_image": _as_base64(user_image),
+                "product_image": _as_base64(product_image)
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
+            async def post(timeout: float) -> str:
+                async with tryon_session.request(
+                    "POST",
                     self.api_url,
                     headers=headers,
-                    json=payload
+                    json=payload,
+                    timeout=timeout
                 ) as response:
                     if response.status != 200:
                         error_text = await response.text()
                         logger.error(f"Kolors API hatası: {error_text}")
-                        raise Exception("Sanal deneme başarısız oldu")
+                        raise UpstreamStatusError(response.status, "Sanal deneme başarısız oldu")
                         
                     result = await response.json()
                     return result["result_image"]
+            
+            return await self.upstream.call(post)
                     
         except aiohttp.ClientError as e:
             logger.error(f"Kolors API bağlantı hatası: {str(e)}")
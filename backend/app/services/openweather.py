@@ -0,0 +1,118 @@
+from typing import Optional, Tuple
+from app.services.cache import TwoTierCache
+from app.utils.config import get_settings
+from app.utils.http import PooledSession
+from app.utils.logger import get_logger
+from app.utils.resilience import Upstream
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+class OpenWeatherClient:
+    """
+    OpenWeather API için bloklamayan, bağlantı havuzlu istemci.
+
+    Çağrılar devre kesici ve yeniden deneme bütçesiyle sarılır; GET
+    istekleri idempotent olduğundan geciken yanıtlar için yedek istek
+    gönderilebilir (`OPENWEATHER_HEDGE_DELAY`).
+    """
+
+    def __init__(self):
+        self.api_key = settings.OPENWEATHER_API_KEY
+        self.base_url = settings.OPENWEATHER_BASE_URL.rstrip("/")
+        self.timeout = settings.OPENWEATHER_TIMEOUT
+        self.hedge_delay = settings.OPENWEATHER_HEDGE_DELAY
+        self.upstream = Upstream("openweather", self.timeout)
+        self.http = PooledSession(
+            limit=settings.OPENWEATHER_POOL_SIZE,
+            timeout=settings.OPENWEATHER_TIMEOUT,
+            max_concurrency=settings.OPENWEATHER_MAX_CONCURRENCY,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            name="openweather"
+        )
+        # Koordinatlar neredeyse hiç değişmez, hava durumu ise kısa sürede eskir;
+        # "bulunamadı" yanıtları geçici olabileceğinden kısa süre tutulur
+        self.geocode_cache = TwoTierCache(
+            "geocode",
+            ttl=settings.GEOCODE_CACHE_TTL,
+            local_maxsize=settings.CACHE_LOCAL_MAXSIZE,
+            negative_ttl=settings.GEOCODE_NEGATIVE_CACHE_TTL
+        )
+        self.weather_cache = TwoTierCache(
+            "weather",
+            ttl=settings.WEATHER_CACHE_TTL,
+            local_maxsize=settings.CACHE_LOCAL_MAXSIZE
+        )
+
+    async def start(self) -> None:
+        await self.http.start()
+
+    async def close(self) -> None:
+        await self.http.close()
+
+    async def _get_json(self, path: str, params: dict):
+        params = {**params, "appid": self.api_key}
+
+        async def fetch(timeout: float):
+            async with self.http.request(
+                "GET",
+                f"{self.base_url}{path}",
+                params=params,
+                timeout=timeout
+            ) as response:
+                response.raise_for_status()
+                return await response.json()
+
+        return await self.upstream.call(fetch, hedge_delay=self.hedge_delay)
+
+    async def geocode(self, location: str) -> Optional[Tuple[float, float]]:
+        """
+        Konum adını koordinatlara çevirir.
+
+        Args:
+            location (str): Şehir veya konum adı
+
+        Returns:
+            Optional[Tuple[float, float]]: (lat, lon) ya da konum bulunamazsa None
+        """
+        async def load():
+            geo_data = await self._get_json(
+                "/geo/1.0/direct",
+                {"q": location, "limit": 1}
+            )
+            if not geo_data:
+                return None
+            return [geo_data[0]["lat"], geo_data[0]["lon"]]
+
+        key = " ".join(location.lower().split())
+        coords = await self.geocode_cache.get_or_load(key, load)
+        return tuple(coords) if coords else None
+
+    async def current_weather(self, lat: float, lon: float) -> dict:
+        """
+        Koordinatlar için anlık hava durumunu getirir.
+
+        Args:
+            lat (float): Enlem
+            lon (float): Boylam
+
+        Returns:
+            dict: OpenWeather ham yanıtı
+        """
+        async def load():
+            return await self._get_json(
+                "/data/2.5/weather",
+                {"lat": lat, "lon": lon, "units": "metric"}
+            )
+
+        # ~1 km hassasiyet aynı şehir için tek önbellek girdisi sağlar
+        key = f"{lat:.2f}:{lon:.2f}"
+        return await self.weather_cache.get_or_load(key, load)
+
+    def cache_stats(self) -> dict:
+        return {
+            "geocode": self.geocode_cache.stats(),
+            "weather": self.weather_cache.stats()
+        }
+
+openweather_client = OpenWeatherClient()
@@ -0,0 +1,102 @@
+import base64
+import binascii
+import io
+from typing import List, Optional, Sequence, Union
+import numpy as np
+from PIL import Image, ImageOps, UnidentifiedImageError
+from app.utils.exceptions import ValidationError
+
+# ImageNet normalizasyonu: (x / 255 - mean) / std == x * SCALE - OFFSET
+MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+SCALE = (1.0 / (255.0 * STD)).reshape(1, 3, 1, 1)
+OFFSET = (MEAN / STD).reshape(1, 3, 1, 1)
+
+ImageInput = Union[str, bytes, bytearray, memoryview]
+
+def decode_image_bytes(image: ImageInput) -> Union[bytes, memoryview]:
+    """
+    Base64 metni ya da data URL'i baytlara çevirir; baytları kopyalamadan döndürür.
+
+    Raises:
+        ValidationError: Base64 çözülemezse
+    """
+    if not isinstance(image, str):
+        return image
+    if image.startswith("data:"):
+        image = image.split(",", 1)[1]
+    try:
+        return base64.b64decode(image, validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise ValidationError(f"Geçersiz fotoğraf: {str(e)}")
+
+def load_image(image: ImageInput, size: int) -> np.ndarray:
+    """
+    Fotoğrafı çözer, EXIF yönünü uygular ve `size` x `size` boyutuna getirir.
+
+    JPEG'ler `draft` ile doğrudan küçültülmüş ölçekte (1/2, 1/4, 1/8)
+    çözülür; 12 MP bir fotoğraf hiçbir zaman tam çözünürlükte belleğe
+    alınmaz. Diğer formatlar `reduce` ile ucuzca küçültülür. Kırpma ve
+    yeniden boyutlandırma tek bir `resize` çağrısında yapılır.
+
+    Args:
+        image (ImageInput): Base64 metin, data URL ya da ham baytlar
+        size (int): Hedef kenar uzunluğu (piksel)
+
+    Returns:
+        np.ndarray: (size, size, 3) uint8 RGB dizi
+
+    Raises:
+        ValidationError: Fotoğraf çözülemezse
+    """
+    data = decode_image_bytes(image)
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            # Kısa kenar hedefin altına düşmeyecek en küçük JPEG ölçeği
+            img.draft("RGB", (size, size))
+            img = ImageOps.exif_transpose(img)
+
+            factor = min(img.size) // size
+            if factor >= 2:
+                img = img.reduce(factor)
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+
+            # Ortadan kare kırp ve hedef boyuta getir
+            width, height = img.size
+            side = min(width, height)
+            left = (width - side) / 2
+            top = (height - side) / 2
+            img = img.resize(
+                (size, size),
+                Image.BILINEAR,
+                box=(left, top, left + side, top + side)
+            )
+            return np.asarray(img)
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        raise ValidationError(f"Geçersiz fotoğraf: {str(e)}")
+
+def normalize_batch(images: Sequence[np.ndarray], out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    uint8 HWC dizileri tek geçişte normalize edilmiş NCHW float32 batch'e çevirir.
+
+    Ara float kopyası oluşturulmaz: çarpım doğrudan çıktı tamponuna yazılır,
+    ofset yerinde çıkarılır.
+
+    Args:
+        images (Sequence[np.ndarray]): (H, W, 3) uint8 diziler
+        out (np.ndarray, optional): Yeniden kullanılacak (N, 3, H, W) float32 tampon
+
+    Returns:
+        np.ndarray: (N, 3, H, W) float32 batch
+    """
+    stacked = np.stack(images).transpose(0, 3, 1, 2)
+    if out is None:
+        out = np.empty(stacked.shape, dtype=np.float32)
+    np.multiply(stacked, SCALE, out=out)
+    out -= OFFSET
+    return out
+
+def preprocess_batch(images: List[ImageInput], size: int) -> np.ndarray:
+    """Fotoğraf listesini modele hazır (N, 3, size, size) batch'e çevirir."""
+    return normalize_batch([load_image(image, size) for image in images])
@@ -1,51 +1,253 @@
-import qrcode
+import asyncio
 import base64
-from io import BytesIO
+import binascii
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+from app.schemas import ProductData
+from app.services.cache import _MISSING, LocalTTLCache
+from app.services.catalog import load_catalog
+from app.services.qr_render import QROutput, render_chunk, render_payload
+from app.utils.config import get_settings
+from app.utils.exceptions import APIError, ValidationError
 from app.utils.logger import get_logger
+from app.utils.metrics import cache_counters
 
 logger = get_logger(__name__)
+settings = get_settings()
 
-def generate_qr_token(product_id: str, size: str = None, color: str = None) -> str:
+FORMATS = ("png", "svg", "matrix")
+# QR çıktısı yükten deterministik olarak üretilir, süresi dolmaz
+_FOREVER = float("inf")
+
+# Yük formatı: [sürüm][uzunluk + ürün id][uzunluk + beden][uzunluk + renk][HMAC]
+# Base32 alfabesi (A-Z, 2-7) QR'ın alfanümerik modunda karakter başına 5.5 bit
+# ile kodlanır; bayt modundaki dict metnine göre çok daha düşük QR sürümü verir.
+PAYLOAD_VERSION = 1
+MAC_SIZE = 10
+
+def _signing_key() -> Optional[bytes]:
+    if settings.QR_SIGNING_KEY:
+        return settings.QR_SIGNING_KEY.encode()
+    if settings.APP_ENV == "development":
+        logger.warning("QR_SIGNING_KEY tanımlı değil; QR kodlar yalnızca bu süreçte doğrulanabilir")
+        return os.urandom(32)
+    # Süreç başına rastgele anahtar, başka worker'ın ya da yeniden başlatma
+    # öncesinin ürettiği kodları geçersiz kılar; imzalamayı tamamen reddet
+    return None
+
+_KEY = _signing_key()
+
+def require_signing_key() -> None:
+    """
+    Açılışta çağrılır; geliştirme ortamı dışında QR_SIGNING_KEY yoksa
+    uygulamanın başlamasını engeller.
+    """
+    if _KEY is None:
+        raise RuntimeError("QR_SIGNING_KEY tanımlanmalıdır (yalnızca APP_ENV=development'ta boş bırakılabilir)")
+
+class QRPayload(NamedTuple):
+    product_id: str
+    size: Optional[str] = None
+    color: Optional[str] = None
+
+def _sign(body: bytes) -> bytes:
+    if _KEY is None:
+        raise APIError(503, "QR imzalama anahtarı yapılandırılmamış")
+    return hmac.new(_KEY, body, hashlib.sha256).digest()[:MAC_SIZE]
+
+def build_payload(product_id: str, size: str = None, color: str = None) -> str:
+    """
+    QR koda yazılacak imzalı, kompakt yükü oluşturur.
+
+    Returns:
+        str: Dolgusuz base32 metin
+    """
+    body = bytearray([PAYLOAD_VERSION])
+    for field in (product_id, size or "", color or ""):
+        data = field.encode()
+        if len(data) > 255:
+            raise ValidationError("QR alanı 255 bayttan uzun olamaz")
+        body.append(len(data))
+        body += data
+    return base64.b32encode(bytes(body) + _sign(bytes(body))).decode().rstrip("=")
+
+@lru_cache(maxsize=settings.QR_CACHE_SIZE)
+def parse_payload(token: str) -> QRPayload:
+    """
+    Taranan yükü doğrular ve çözer; imza sabit zamanlı karşılaştırılır.
+
+    Raises:
+        ValidationError: Yük bozuksa ya da imza geçersizse
+    """
+    token = token.strip().upper()
+    try:
+        raw = base64.b32decode(token + "=" * (-len(token) % 8))
+    except (binascii.Error, ValueError):
+        raise ValidationError("Geçersiz QR kod")
+
+    body, mac = raw[:-MAC_SIZE], raw[-MAC_SIZE:]
+    if len(raw) <= MAC_SIZE or not hmac.compare_digest(mac, _sign(body)):
+        raise ValidationError("Geçersiz QR kod")
+    if body[0] != PAYLOAD_VERSION:
+        raise ValidationError("Desteklenmeyen QR kod sürümü")
+
+    fields = []
+    offset = 1
+    for _ in range(3):
+        length = body[offset]
+        fields.append(body[offset + 1:offset + 1 + length].decode() or None)
+        offset += 1 + length
+    return QRPayload(*fields)
+
+async def resolve_payload(token: str) -> Tuple[QRPayload, Optional[ProductData]]:
+    """
+    Taranan yükü doğrular ve ürünü katalogdan bulur.
+
+    Yalnızca imza doğrulaması token başına önbelleklenir; ürün her seferinde
+    katalogda (O(1)) aranır ki sonradan eklenen ürünler de bulunsun.
+
+    Returns:
+        Tuple[QRPayload, Optional[ProductData]]: Çözülen yük ve ürün (katalogda yoksa None)
     """
-    Ürün bilgilerine göre QR kod oluşturur ve base64 formatında döndürür.
-    
+    payload = parse_payload(token)
+    return payload, (await load_catalog()).get(payload.product_id)
+
+class QREngine:
+    """
+    Yüke göre LRU önbellekli QR üretici.
+
+    Mağaza ekranları aynı ürün/beden/renk kombinasyonlarını tekrar tekrar
+    istediğinden hazır çıktı (data URL ya da matris) `(format, yük)`
+    anahtarıyla saklanır. Toplu üretimde önbellekte olmayan yükler süreç
+    havuzuna parçalar halinde dağıtılır; QR üretimi saf Python olduğundan
+    thread'ler GIL yüzünden hızlandırmaz.
+    """
+
+    CHUNK_SIZE = 32
+
+    def __init__(
+        self,
+        cache_size: int = None,
+        box_size: int = None,
+        border: int = 4,
+        workers: int = None
+    ):
+        self.cache = LocalTTLCache(cache_size or settings.QR_CACHE_SIZE)
+        self.box_size = box_size or settings.QR_BOX_SIZE
+        self.border = border
+        self.workers = workers or settings.QR_WORKERS or None
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._stats = {"hits": 0, "misses": 0}
+        self._counters = cache_counters("qrcode", ("hit", "miss"))
+
+    def _get(self, key: tuple):
+        with self._lock:
+            value = self.cache.get(key)
+        if value is _MISSING:
+            self._stats["misses"] += 1
+            self._counters["miss"].inc()
+        else:
+            self._stats["hits"] += 1
+            self._counters["hit"].inc()
+        return value
+
+    def _set(self, key: tuple, value: QROutput) -> None:
+        with self._lock:
+            self.cache.set(key, value, _FOREVER)
+
+    def render(self, payload: str, fmt: str = "png") -> QROutput:
+        """Tek bir yükü önbellekten ya da yerinde üretir."""
+        key = (fmt, payload)
+        value = self._get(key)
+        if value is _MISSING:
+            value = render_payload(payload, fmt, self.box_size, self.border)
+            self._set(key, value)
+        return value
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # fork, model ve HTTP thread'leri olan bir süreçte güvenli değil
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def render_many(self, payloads: Sequence[str], fmt: str = "png") -> List[QROutput]:
+        """
+        Yük listesini üretir; tekrarlar bir kez, önbellek dışındakiler süreç havuzunda.
+
+        Returns:
+            List[QROutput]: `payloads` ile aynı sırada çıktılar
+        """
+        results: Dict[str, QROutput] = {}
+        missing = []
+        for payload in dict.fromkeys(payloads):
+            value = self._get((fmt, payload))
+            if value is _MISSING:
+                missing.append(payload)
+            else:
+                results[payload] = value
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            chunks = [missing[i:i + self.CHUNK_SIZE] for i in range(0, len(missing), self.CHUNK_SIZE)]
+            if len(chunks) == 1:
+                # Tek parça için süreçler arası kopyalama maliyetine değmez
+                rendered = [await asyncio.to_thread(
+                    render_chunk, chunks[0], fmt, self.box_size, self.border
+                )]
+            else:
+                executor = self._executor()
+                rendered = await asyncio.gather(*[
+                    loop.run_in_executor(executor, render_chunk, chunk, fmt, self.box_size, self.border)
+                    for chunk in chunks
+                ])
+            for chunk, outputs in zip(chunks, rendered):
+                for payload, value in zip(chunk, outputs):
+                    self._set((fmt, payload), value)
+                    results[payload] = value
+
+        return [results[payload] for payload in payloads]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        total = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / total, 4) if total else 0.0,
+            "size": len(self.cache)
+        }
+
+qr_engine = QREngine()
+
+def generate_qr_token(product_id: str, size: str = None, color: str = None, fmt: str = "png") -> QROutput:
+    """
+    Ürün bilgilerine göre QR kod oluşturur.
+
     Args:
         product_id (str): Ürün ID'si
         size (str, optional): Ürün bedeni
         color (str, optional): Ürün rengi
-        
+        fmt (str): "png" (varsayılan), "svg" ya da "matrix"
+
     Returns:
-        str: Base64 formatında QR kod
+        QROutput: png/svg için data URL, matrix için satır dizeleri
     """
     try:
-        # QR kod içeriğini oluştur
-        qr_data = {
-            "product_id": product_id,
-            "size": size,
-            "color": color
-        }
-        qr_string = str(qr_data)
-        
-        # QR kod oluştur
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_string)
-        qr.make(fit=True)
-
-        # QR kodu PNG formatında oluştur
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # PNG'yi base64'e çevir
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        qr_base64 = base64.b64encode(buffered.getvalue()).decode()
-        
-        return f"data:image/png;base64,{qr_base64}"
-        
+        return qr_engine.render(build_payload(product_id, size, color), fmt)
+
     except Exception as e:
         logger.error(f"QR kod oluşturma hatası: {str(e)}")
         raise
@@ -0,0 +1,63 @@
+# QR çizimi ve süreç havuzunun hedef fonksiyonları. Uygulama modüllerini
+# (ayarlar, loglama, metrikler, katalog) bilerek içe aktarmaz: "spawn" ile
+# başlayan havuz süreçleri yalnızca bunu yükler, log dosyasını açmaz.
+import base64
+from io import BytesIO
+from typing import List, Union
+import numpy as np
+import qrcode
+from PIL import Image
+
+QROutput = Union[str, List[str]]
+
+def qr_matrix(payload: str, border: int = 4) -> np.ndarray:
+    """Yükün QR modül matrisini (kenar boşluğu dahil, True = koyu) döndürür."""
+    qr = qrcode.QRCode(
+        version=None,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        border=border,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    return np.array(qr.get_matrix(), dtype=bool)
+
+def matrix_to_png(matrix: np.ndarray, box_size: int) -> bytes:
+    # 1 bit/piksel PNG; büyütme PIL çizimi yerine NumPy ile yapılır
+    pixels = np.repeat(np.repeat(~matrix, box_size, axis=0), box_size, axis=1)
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def matrix_to_svg(matrix: np.ndarray, box_size: int) -> str:
+    # Her satırdaki koyu modül dizileri tek bir path komutuna çevrilir
+    segments = []
+    for y, row in enumerate(matrix):
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], row.view(np.int8), [0]))))
+        for start, end in zip(edges[::2], edges[1::2]):
+            segments.append(f"M{start} {y}h{end - start}v1h-{end - start}z")
+    side = len(matrix)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {side} {side}" '
+        f'width="{side * box_size}" height="{side * box_size}" shape-rendering="crispEdges">'
+        f'<rect width="100%" height="100%" fill="#fff"/>'
+        f'<path d="{"".join(segments)}" fill="#000"/></svg>'
+    )
+
+def render_payload(payload: str, fmt: str = "png", box_size: int = 10, border: int = 4) -> QROutput:
+    """
+    Yükü istenen formatta QR koda çevirir.
+
+    Returns:
+        QROutput: png/svg için data URL, matrix için satır başına "0"/"1" dizeleri
+    """
+    matrix = qr_matrix(payload, border)
+    if fmt == "matrix":
+        return ["".join("1" if cell else "0" for cell in row) for row in matrix]
+    if fmt == "svg":
+        svg = matrix_to_svg(matrix, box_size)
+        return f"data:image/svg+xml;base64,{base64.b64encode(svg.encode()).decode()}"
+    png = matrix_to_png(matrix, box_size)
+    return f"data:image/png;base64,{base64.b64encode(png).decode()}"
+
+def render_chunk(payloads: List[str], fmt: str, box_size: int, border: int) -> List[QROutput]:
+    return [render_payload(payload, fmt, box_size, border) for payload in payloads]
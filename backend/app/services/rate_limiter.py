@@ -1,148 +1,517 @@
-import redis
+import asyncio
+import secrets
 import time
-from redis.connection import ConnectionPool
-from fastapi import HTTPException
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from fastapi.responses import JSONResponse
+from redis.commands.core import AsyncScript
 from app.utils.config import get_settings
 from app.utils.logger import get_logger
-from app.utils.exceptions import RateLimitError
-from functools import wraps
+from app.utils.metrics import RATE_LIMIT_REJECTIONS, observe_upstream
+from app.utils.redis_client import REDIS_ERRORS, get_redis
 
 logger = get_logger(__name__)
 settings = get_settings()
 
-# Redis bağlantı havuzu
-pool = ConnectionPool(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=0,
-    decode_responses=True,
-    max_connections=10
-)
+GCRA = "gcra"
+SLIDING_WINDOW = "sliding_window"
+
+# GCRA (token bucket'ın tek değerli eşdeğeri). Anahtar, bir sonraki isteğin
+# "teorik varış zamanı"nı (TAT, ms) tutar. Kova kapasitesi `limit`, dolum
+# hızı `limit / period`. Dönüş: {izin, kalan, retry_after_ms}
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval * cost
+local allow_at = new_tat - capacity
+if now < allow_at then
+    return {0, math.floor((capacity - (tat - now)) / interval), math.ceil(allow_at - now)}
+end
+
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((capacity - (new_tat - now)) / interval), 0}
+"""
+
+# Kesin kayan pencere: her istek sorted set'te benzersiz bir üye olarak
+# tutulur. Dönüş: {izin, kalan, retry_after_ms}
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local member = ARGV[5]
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+
+if count + cost > limit then
+    local retry_after = window
+    local index = count + cost - limit - 1
+    if cost <= limit then
+        -- Yeterli sayıda eski kaydın pencereden çıkacağı an
+        local entry = redis.call('ZRANGE', KEYS[1], index, index, 'WITHSCORES')
+        retry_after = tonumber(entry[2]) + window - now
+    end
+    return {0, math.max(limit - count, 0), math.max(retry_after, 1)}
+end
+
+for i = 1, cost do
+    redis.call('ZADD', KEYS[1], now, member .. ':' .. i)
+end
+redis.call('PEXPIRE', KEYS[1], window)
+return {1, limit - count - cost, 0}
+"""
+
+# Hibrit mod için toplu GCRA senkronizasyonu. Her anahtar için ARGV'de
+# (interval, capacity, used, cost) dörtlüsü gelir: `used` yerelde zaten
+# kabul edilmiş isteklerdir ve koşulsuz işlenir, `cost` > 0 ise ayrıca bu
+# istek için GCRA kontrolü yapılır. Dönüş: anahtar başına {izin, kalan, retry_after_ms}
+SYNC_SCRIPT = """
+local now = tonumber(ARGV[1])
+local result = {}
+for i = 1, #KEYS do
+    local base = 1 + (i - 1) * 4
+    local interval = tonumber(ARGV[base + 1])
+    local capacity = tonumber(ARGV[base + 2])
+    local used = tonumber(ARGV[base + 3])
+    local cost = tonumber(ARGV[base + 4])
+
+    local tat = tonumber(redis.call('GET', KEYS[i]))
+    if not tat or tat < now then
+        tat = now
+    end
+    tat = tat + interval * used
+
+    local allowed = 1
+    if cost > 0 then
+        local new_tat = tat + interval * cost
+        if now < new_tat - capacity then
+            allowed = 0
+        else
+            tat = new_tat
+        end
+    end
+    if tat > now then
+        redis.call('SET', KEYS[i], tat, 'PX', math.ceil(tat - now))
+    end
+
+    local remaining = math.floor((capacity - (tat - now)) / interval)
+    local retry_after = 0
+    if remaining < math.max(cost, 1) then
+        retry_after = math.ceil(tat + interval * math.max(cost, 1) - capacity - now)
+    end
+    table.insert(result, allowed)
+    table.insert(result, math.max(remaining, 0))
+    table.insert(result, math.max(retry_after, 0))
+end
+return result
+"""
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # saniye, izin verildiyse 0
 
 class RateLimiter:
-    def __init__(self):
-        self.redis = redis.Redis(connection_pool=pool)
-        self.default_limit = settings.RATE_LIMIT_PER_MINUTE
-        self.window = 60  # 1 dakika
+    """
+    Redis üzerinde atomik rate limiter.
+
+    Her kontrol tek bir Lua script çağrısıdır (tek round-trip); kalan hak ve
+    `retry_after` aynı çağrıdan döner. İki algoritma desteklenir:
+
+    - `gcra`: token bucket davranışı, anahtar başına tek bir sayı
+    - `sliding_window`: son `period` saniyedeki isteklerin kesin sayımı
+
+    Redis'e erişilemezse istek kabul edilir (fail-open).
+    """
+
+    def __init__(
+        self,
+        algorithm: str = None,
+        limit: int = None,
+        period: float = None,
+        prefix: str = "rate_limit"
+    ):
+        self.algorithm = algorithm or settings.RATE_LIMIT_ALGORITHM
+        if self.algorithm not in (GCRA, SLIDING_WINDOW):
+            raise ValueError(f"Bilinmeyen rate limit algoritması: {self.algorithm}")
+        self.default_limit = limit or settings.RATE_LIMIT_PER_MINUTE
+        self.period = period or settings.RATE_LIMIT_PERIOD
+        self.prefix = prefix
+        script = GCRA_SCRIPT if self.algorithm == GCRA else SLIDING_WINDOW_SCRIPT
+        # Script SHA'sı bir kez hesaplanır; istemci çağrı anında verilir
+        self._script = AsyncScript(None, script.encode())
 
-    def check_rate_limit(self, key: str, limit: int = None) -> bool:
+    async def check_rate_limit(self, key: str, limit: int = None, cost: int = 1) -> RateLimitResult:
         """
-        Rate limit kontrolü yapar.
-        
+        Rate limit kontrolü yapar ve izin verilirse hakkı tüketir.
+
         Args:
             key (str): Rate limit için kullanılacak anahtar
-            limit (int, optional): Dakikadaki istek limiti
-            
+            limit (int, optional): `period` başına istek limiti
+            cost (int): İsteğin tükettiği hak sayısı
+
         Returns:
-            bool: Limit aşılmadıysa True, aşıldıysa False
-            
-        Raises:
-            RateLimitError: Redis bağlantı hatası durumunda
+            RateLimitResult: İzin durumu, kalan hak ve bekleme süresi
         """
+        limit = limit or self.default_limit
+        now = int(time.time() * 1000)
+        period_ms = int(self.period * 1000)
+        if self.algorithm == GCRA:
+            args = (now, period_ms / limit, period_ms, cost)
+        else:
+            args = (now, period_ms, limit, cost, f"{now}:{secrets.token_hex(6)}")
+
         try:
-            pipe = self.redis.pipeline()
-            now = int(time.time())
-            limit = limit or self.default_limit
-            
-            # Pencere başlangıcı
-            window_start = now - self.window
-            
-            # Eski kayıtları temizle
-            pipe.zremrangebyscore(key, 0, window_start)
-            
-            # Mevcut istek sayısını al
-            pipe.zcard(key)
-            
-            # Yeni isteği ekle
-            pipe.zadd(key, {str(now): now})
-            
-            # Anahtarın süresini ayarla (60 saniye)
-            pipe.expire(key, self.window)
-            
-            # Pipeline'ı çalıştır
-            _, request_count, *_ = pipe.execute()
-            
-            # Limit kontrolü
-            if request_count > limit:
-                logger.warning(f"Rate limit exceeded for key: {key}")
-                return False
-                
-            return True
-            
-        except redis.RedisError as e:
+            with observe_upstream("redis"):
+                allowed, remaining, retry_after_ms = await self._script(
+                    keys=[f"{self.prefix}:{key}"],
+                    args=args,
+                    client=get_redis()
+                )
+        except REDIS_ERRORS as e:
             logger.error(f"Redis error in rate limiter: {str(e)}")
             # Redis hatası durumunda isteğe izin ver
-            return True
-            
-        except Exception as e:
-            logger.error(f"Unexpected error in rate limiter: {str(e)}")
-            return True
+            return RateLimitResult(True, limit, limit, 0.0)
+
+        if not allowed:
+            logger.debug("Rate limit exceeded for key: %s", key)
+        return RateLimitResult(bool(allowed), limit, max(int(remaining), 0), retry_after_ms / 1000)
+
+    async def stop(self) -> None:
+        pass
+
+class _LocalBucket:
+    __slots__ = ("limit", "allowance", "pending", "remaining", "retry_at", "touched")
+
+    def __init__(self, limit: int, allowance: int):
+        self.limit = limit
+        self.allowance = allowance  # bir sonraki senkronizasyona kadar yerelde verilebilecek hak
+        self.pending = 0  # kabul edilmiş ama Redis'e henüz yazılmamış hak
+        self.remaining = limit  # son senkronizasyonda Redis'in bildirdiği kalan hak
+        self.retry_at = 0.0  # bu ana kadar global limit dolu (monotonic)
+        self.touched = 0.0
+
+class HybridRateLimiter:
+    """
+    Yerel token bucket'lar + Redis ile toplu senkronizasyon.
+
+    Her worker anahtar başına yerel bir pay (`allowance`) tutar; pay
+    yettikçe istek Redis'e gitmeden, mikro saniyeler içinde kabul edilir.
+    Kabul edilen istekler `flush_interval` aralıklarla tek bir Lua çağrısında
+    Redis'teki GCRA durumuna yazılır ve dönen kalan hakla paylar yenilenir.
+    Pay tükenirse o istek için Redis'e tek bir senkron çağrı yapılır.
+
+    Yerel pay en fazla `slack` olduğundan global limitin aşımı, senkronizasyon
+    aralığı başına worker başına en fazla `slack` istektir. Redis'e
+    erişilemezse istekler kabul edilir (fail-open).
+    """
+
+    REDIS_RETRY_INTERVAL = 5.0  # saniye
+    FLUSH_BATCH_SIZE = 500
 
-    def get_remaining_requests(self, key: str) -> int:
+    def __init__(
+        self,
+        limit: int = None,
+        period: float = None,
+        slack: int = None,
+        flush_interval: float = None,
+        prefix: str = "rate_limit"
+    ):
+        self.default_limit = limit or settings.RATE_LIMIT_PER_MINUTE
+        self.period = period or settings.RATE_LIMIT_PERIOD
+        self.slack = settings.RATE_LIMIT_SLACK if slack is None else slack
+        self.flush_interval = flush_interval or settings.RATE_LIMIT_FLUSH_INTERVAL
+        self.prefix = prefix
+        self._script = AsyncScript(None, SYNC_SCRIPT.encode())
+        self._buckets: Dict[str, _LocalBucket] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis_disabled_until = 0.0
+        self._stats = {
+            "local_hits": 0,
+            "remote_checks": 0,
+            "flushes": 0,
+            "redis_errors": 0
+        }
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._flusher = loop.create_task(self._run())
+            self._loop = loop
+
+    async def check_rate_limit(self, key: str, limit: int = None, cost: int = 1) -> RateLimitResult:
         """
-        Kalan istek sayısını döndürür.
-        
+        Rate limit kontrolü yapar; çoğu istek Redis'e gitmeden yanıtlanır.
+
         Args:
-            key (str): Rate limit anahtarı
-            
+            key (str): Rate limit için kullanılacak anahtar
+            limit (int, optional): `period` başına istek limiti
+            cost (int): İsteğin tükettiği hak sayısı
+
         Returns:
-            int: Kalan istek sayısı
+            RateLimitResult: İzin durumu, kalan hak ve bekleme süresi
         """
+        self._ensure_started()
+        limit = limit or self.default_limit
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket.limit != limit:
+            bucket = self._buckets[key] = _LocalBucket(limit, min(self.slack, limit))
+        bucket.touched = now
+
+        if bucket.retry_at > now:
+            return RateLimitResult(False, limit, 0, bucket.retry_at - now)
+        if bucket.allowance >= cost:
+            self._stats["local_hits"] += 1
+            return self._admit(bucket, cost)
+        if now < self._redis_disabled_until:
+            # Redis yokken yerel pay yenilenir, istek kabul edilir
+            bucket.allowance = self.slack
+            bucket.pending = 0
+            return RateLimitResult(True, limit, limit, 0.0)
+
+        self._stats["remote_checks"] += 1
+        used, bucket.pending = bucket.pending, 0
         try:
-            now = int(time.time())
-            window_start = now - self.window
-            
-            # Eski kayıtları temizle ve mevcut sayıyı al
-            self.redis.zremrangebyscore(key, 0, window_start)
-            current_count = self.redis.zcard(key)
-            
-            return max(0, self.default_limit - current_count)
-            
-        except Exception as e:
-            logger.error(f"Error getting remaining requests: {str(e)}")
-            return 0
-
-_rate_limiter = RateLimiter()
-
-def rate_limit(key_prefix: str = None, limit: int = None):
+            (allowed, remaining, retry_after_ms), = await self._sync([(key, bucket, used, cost)])
+        except REDIS_ERRORS as e:
+            self._on_redis_error(e)
+            bucket.allowance = self.slack
+            return RateLimitResult(True, limit, limit, 0.0)
+
+        self._apply(bucket, remaining, retry_after_ms, time.monotonic())
+        if not allowed:
+            logger.debug("Rate limit exceeded for key: %s", key)
+            return RateLimitResult(False, limit, remaining, retry_after_ms / 1000)
+        return RateLimitResult(True, limit, remaining, 0.0)
+
+    @staticmethod
+    def _admit(bucket: _LocalBucket, cost: int) -> RateLimitResult:
+        bucket.allowance -= cost
+        bucket.pending += cost
+        bucket.remaining = max(bucket.remaining - cost, 0)
+        return RateLimitResult(True, bucket.limit, bucket.remaining, 0.0)
+
+    def _apply(self, bucket: _LocalBucket, remaining: int, retry_after_ms: int, now: float) -> None:
+        # Çağrı sürerken yerelde kabul edilenler yeni paydan düşülür
+        bucket.remaining = max(remaining - bucket.pending, 0)
+        bucket.allowance = max(min(self.slack, remaining) - bucket.pending, 0)
+        bucket.retry_at = now + retry_after_ms / 1000 if bucket.remaining == 0 else 0.0
+
+    async def _sync(self, entries: List[Tuple[str, _LocalBucket, int, int]]) -> List[Tuple[int, int, int]]:
+        period_ms = self.period * 1000
+        keys = []
+        args = [int(time.time() * 1000)]
+        for key, bucket, used, cost in entries:
+            keys.append(f"{self.prefix}:{key}")
+            args.extend((period_ms / bucket.limit, period_ms, used, cost))
+        with observe_upstream("redis"):
+            result = await self._script(keys=keys, args=args, client=get_redis())
+        return [tuple(result[i:i + 3]) for i in range(0, len(result), 3)]
+
+    def _on_redis_error(self, error: Exception) -> None:
+        logger.error(f"Redis error in rate limiter: {str(error)}")
+        self._stats["redis_errors"] += 1
+        self._redis_disabled_until = time.monotonic() + self.REDIS_RETRY_INTERVAL
+
+    async def flush(self) -> None:
+        """Bekleyen yerel kabulleri toplu olarak Redis'e yazar ve payları yeniler."""
+        now = time.monotonic()
+        entries = []
+        for key, bucket in list(self._buckets.items()):
+            if bucket.pending:
+                entries.append((key, bucket, bucket.pending, 0))
+                bucket.pending = 0
+            elif now - bucket.touched > self.period:
+                # Uzun süredir görülmeyen anahtarlar bellekten atılır
+                del self._buckets[key]
+        if not entries or now < self._redis_disabled_until:
+            return
+
+        self._stats["flushes"] += 1
+        for start in range(0, len(entries), self.FLUSH_BATCH_SIZE):
+            batch = entries[start:start + self.FLUSH_BATCH_SIZE]
+            try:
+                results = await self._sync(batch)
+            except REDIS_ERRORS as e:
+                self._on_redis_error(e)
+                return
+            now = time.monotonic()
+            for (_, bucket, _, _), (_, remaining, retry_after_ms) in zip(batch, results):
+                self._apply(bucket, remaining, retry_after_ms, now)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Rate limit senkronizasyon hatası: {str(e)}")
+
+    async def stop(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except (asyncio.CancelledError, RuntimeError):
+                pass
+            if self._loop is asyncio.get_running_loop():
+                await self.flush()
+        self._flusher = None
+        self._loop = None
+
+    def stats(self) -> dict:
+        return {"keys": len(self._buckets), **self._stats}
+
+def create_rate_limiter():
     """
-    Rate limiting decorator.
-    
-    Args:
-        key_prefix (str, optional): Rate limit anahtarı için önek
-        limit (int, optional): İstek limiti
-        
-    Returns:
-        function: Decorator fonksiyonu
+    Ayarlardaki moda göre (`hybrid` ya da `redis`) limiter oluşturur.
+
+    Hibrit mod yalnızca GCRA ile senkronize olur; başka bir algoritma
+    seçilmişse semantiği korumak için `redis` moduna düşülür ve uyarı verilir.
     """
-    def decorator(func):
-        @wraps(func)
-        async def wrapper(*args, **kwargs):
-            # Request nesnesini bul
-            request = None
-            for arg in args:
-                if hasattr(arg, "client"):
-                    request = arg
-                    break
-            
-            if not request:
-                return await func(*args, **kwargs)
-            
-            # Rate limit anahtarını oluştur
-            key = f"rate_limit:{key_prefix or func.__name__}:{request.client.host}"
-            
-            # Rate limit kontrolü
-            if not _rate_limiter.check_rate_limit(key, limit):
-                remaining = _rate_limiter.get_remaining_requests(key)
-                raise HTTPException(
-                    status_code=429,
-                    detail={
-                        "message": "Rate limit exceeded",
-                        "remaining": remaining,
-                        "retry_after": 60  # saniye
-                    }
-                )
-            
-            return await func(*args, **kwargs)
-        return wrapper
-    return decorator
+    if settings.RATE_LIMIT_MODE == "hybrid":
+        if settings.RATE_LIMIT_ALGORITHM == GCRA:
+            return HybridRateLimiter()
+        logger.warning(
+            "RATE_LIMIT_MODE=hybrid yalnızca gcra algoritmasını destekler; "
+            "RATE_LIMIT_ALGORITHM=%s için redis moduna geçiliyor",
+            settings.RATE_LIMIT_ALGORITHM
+        )
+    return RateLimiter()
+
+_rate_limiter = None
+
+def get_rate_limiter():
+    """Paylaşılan limiter'ı ilk kullanımda oluşturur."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = create_rate_limiter()
+    return _rate_limiter
+
+async def close_rate_limiter() -> None:
+    """Bekleyen yerel kabulleri Redis'e yazar ve arka plan görevini durdurur."""
+    if _rate_limiter is not None:
+        await _rate_limiter.stop()
+
+class RateLimitPolicy(NamedTuple):
+    cost: int = 1  # isteğin tükettiği hak
+    limit: Optional[int] = None  # period başına hak, None ise RATE_LIMIT_PER_MINUTE
+    methods: Tuple[str, ...] = ("POST",)
+
+class RateLimitMiddleware:
+    """
+    Rota bazlı politika tablosuyla rate limit uygulayan ASGI middleware.
+
+    `policies` yol önekinden politikaya bir eşlemedir. İlk istekte uygulamanın
+    rotaları bir kez taranır ve her (method, path) çifti en uzun eşleşen
+    öneke çözülür; istek başına yalnızca tek bir dict araması yapılır. Aynı
+    önek altındaki rotalar istemci başına aynı kovayı paylaşır.
+
+    Limit aşılırsa istek, gövdesi okunmadan 429 ile reddedilir.
+    """
+
+    def __init__(self, app, policies: Dict[str, RateLimitPolicy], limiter=None):
+        self.app = app
+        self.policies = policies
+        self.limiter = limiter
+        self._table: Optional[Dict[Tuple[str, str], Tuple[str, RateLimitPolicy]]] = None
+        self._patterns: List[tuple] = []
+
+    def _policy_for(self, path: str) -> Optional[Tuple[str, RateLimitPolicy]]:
+        matches = [
+            prefix for prefix in self.policies
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/")
+        ]
+        if not matches:
+            return None
+        prefix = max(matches, key=len)
+        return prefix.strip("/") or "root", self.policies[prefix]
+
+    def resolve(self, routes) -> None:
+        """Rotaları politika tablosuna çevirir (uygulama başına bir kez)."""
+        table = {}
+        patterns = []
+        for route in routes:
+            path = getattr(route, "path", None)
+            methods = getattr(route, "methods", None)
+            if path is None or not methods:
+                continue
+            entry = self._policy_for(path)
+            if entry is None:
+                continue
+            for method in methods & set(entry[1].methods):
+                if "{" in path:
+                    patterns.append((route.path_regex, method, entry))
+                else:
+                    table[(method, path)] = entry
+        self._patterns = patterns
+        self._table = table
+
+    def _lookup(self, method: str, path: str) -> Optional[Tuple[str, RateLimitPolicy]]:
+        entry = self._table.get((method, path))
+        if entry is None:
+            for regex, pattern_method, pattern_entry in self._patterns:
+                if method == pattern_method and regex.match(path):
+                    return pattern_entry
+        return entry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        if self._table is None:
+            self.resolve(scope["app"].routes)
+
+        entry = self._lookup(scope["method"], scope["path"])
+        if entry is None:
+            await self.app(scope, receive, send)
+            return
+
+        bucket, policy = entry
+        client = scope.get("client")
+        key = f"{bucket}:{client[0] if client else 'unknown'}"
+        limiter = self.limiter or get_rate_limiter()
+        result = await limiter.check_rate_limit(key, policy.limit, policy.cost)
+        if not result.allowed:
+            RATE_LIMIT_REJECTIONS.labels(bucket).inc()
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": {
+                    "message": "Rate limit exceeded",
+                    "remaining": result.remaining,
+                    "retry_after": round(result.retry_after, 3)  # saniye
+                }},
+                headers={
+                    "Retry-After": str(max(1, round(result.retry_after))),
+                    **self._headers(result)
+                }
+            )
+            await response(scope, receive, send)
+            return
+
+        extra = [(name.lower().encode(), value.encode()) for name, value in self._headers(result).items()]
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", ()), *extra]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    def _headers(result: RateLimitResult) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining)
+        }
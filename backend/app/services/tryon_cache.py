@@ -0,0 +1,241 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional, Union
+from app.services.cache import SingleFlight
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+from app.utils.metrics import cache_counters
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+def image_digest(image: Union[str, bytes]) -> bytes:
+    """
+    Fotoğrafın çözülmüş baytlarından hızlı bir özet üretir.
+
+    Aynı fotoğraf data URL önekiyle ya da öneksiz gelse de aynı özeti
+    verir. Base64 olmayan değerler (örn. ürün URL'i) olduğu gibi özetlenir.
+
+    Args:
+        image (Union[str, bytes]): Base64 metin, data URL, URL ya da ham bayt
+
+    Returns:
+        bytes: 16 baytlık BLAKE2b özeti
+    """
+    if isinstance(image, str):
+        data = image.split(",", 1)[1] if image.startswith("data:") else image
+        try:
+            image = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError):
+            image = image.encode()
+    return hashlib.blake2b(image, digest_size=16).digest()
+
+class DiskLRUStore:
+    """
+    Toplam boyutu sınırlı, dosya tabanlı LRU depo.
+
+    Her girdi ayrı bir dosyadır; sınır aşılınca en uzun süredir
+    kullanılmayan girdiler silinir.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load_index(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name.endswith(".tmp"):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._total += size
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._index.pop(key, 0)
+            return None
+        with self._lock:
+            if key not in self._index:
+                # Aynı dizini paylaşan başka bir worker yazmış olabilir
+                self._index[key] = len(data)
+                self._total += len(data)
+            self._index.move_to_end(key)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            self._total += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            evicted = self._evict()
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def modified(self, key: str) -> Optional[float]:
+        """Girdinin yazıldığı an (Unix zamanı); girdi yoksa None."""
+        try:
+            return os.path.getmtime(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    def _evict(self) -> list:
+        evicted = []
+        while self._total > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total -= size
+            self.evictions += 1
+            evicted.append(key)
+        return evicted
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+class TryOnResultCache:
+    """
+    Sanal deneme sonuçları için içerik adresli önbellek.
+
+    Anahtar, backend adı ile kullanıcı ve ürün fotoğraflarının özetlerinden
+    oluşur. Aynı anda gelen özdeş istekler tek bir upstream çağrısında
+    birleştirilir. Hatalı sonuçlar önbelleğe alınmaz.
+    """
+
+    def __init__(self, store: DiskLRUStore, enabled: bool = True):
+        self.store = store
+        self.enabled = enabled
+        self.flight = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+        self._counters = cache_counters("tryon", ("hit", "miss"))
+
+    @staticmethod
+    def make_key(namespace: str, user_image: Union[str, bytes], product_image: Union[str, bytes]) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(namespace.encode())
+        digest.update(image_digest(user_image))
+        digest.update(image_digest(product_image))
+        return digest.hexdigest()
+
+    async def get_or_generate(
+        self,
+        namespace: str,
+        user_image: Union[str, bytes],
+        product_image: Union[str, bytes],
+        generate: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Sonucu önbellekten döndürür, yoksa `generate` ile üretip saklar.
+
+        Args:
+            namespace (str): Backend adı (örn. "kolors")
+            user_image: Kullanıcı fotoğrafı
+            product_image: Ürün fotoğrafı
+            generate (Callable): Upstream'i çağıran async fonksiyon
+
+        Returns:
+            Any: Backend sonucu (JSON uyumlu değer)
+        """
+        if not self.enabled:
+            return await generate()
+
+        key = self.make_key(namespace, user_image, product_image)
+        if self.flight.in_flight(key):
+            self._stats["coalesced"] += 1
+        return await self.flight.do(key, lambda: self._load(key, generate))
+
+    async def _load(self, key: str, generate: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            cached = await asyncio.to_thread(self.store.get, key)
+        except OSError as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Sanal deneme önbelleği okunamadı: {str(e)}")
+            cached = None
+
+        if cached is not None:
+            self._stats["hits"] += 1
+            self._counters["hit"].inc()
+            return json.loads(cached)
+
+        self._stats["misses"] += 1
+        self._counters["miss"].inc()
+        result = await generate()
+        try:
+            await asyncio.to_thread(self.store.put, key, json.dumps(result).encode())
+        except OSError as e:
+            self._stats["errors"] += 1
+            logger.warning(f"Sanal deneme önbelleğine yazılamadı: {str(e)}")
+        return result
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["entries"] = len(self.store)
+        stats["bytes"] = self.store.total_bytes
+        stats["evictions"] = self.store.evictions
+        return stats
+
+tryon_result_cache = TryOnResultCache(
+    DiskLRUStore(settings.TRYON_CACHE_DIR, settings.TRYON_CACHE_MAX_BYTES),
+    enabled=settings.TRYON_CACHE_ENABLED
+)
+
+def cached_try_on(namespace: str, user_arg: str, product_arg: str):
+    """
+    Bir sanal deneme backend metodunu sonuç önbelleğinin arkasına alır.
+
+    Args:
+        namespace (str): Önbellek anahtarında kullanılacak backend adı
+        user_arg (str): Kullanıcı fotoğrafı parametresinin adı
+        product_arg (str): Ürün fotoğrafı parametresinin adı
+
+    Returns:
+        function: Decorator fonksiyonu
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            return await tryon_result_cache.get_or_generate(
+                namespace,
+                bound.arguments[user_arg],
+                bound.arguments[product_arg],
+                lambda: func(*args, **kwargs)
+            )
+        return wrapper
+    return decorator
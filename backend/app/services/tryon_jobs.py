@@ -0,0 +1,192 @@
+import asyncio
+import json
+import time
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from app.utils.config import get_settings
+from app.utils.exceptions import APIError
+from app.utils.redis_client import get_redis
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL_STATES = (SUCCEEDED, FAILED)
+
+class QueueFullError(APIError):
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="Sanal deneme kuyruğu dolu. Lütfen daha sonra tekrar deneyin."
+        )
+
+class TryOnJobStore:
+    """
+    Sanal deneme işlerinin durumunu Redis'te tutar.
+
+    Her iş `tryon:job:{id}` hash'inde saklanır; durum değişiklikleri
+    `tryon:job:{id}:events` kanalına yayınlanır, böylece herhangi bir
+    replika işi sorgulayabilir veya akış olarak izleyebilir.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"tryon:job:{job_id}"
+
+    @staticmethod
+    def _channel(job_id: str) -> str:
+        return f"tryon:job:{job_id}:events"
+
+    async def save(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        mapping = {k: "" if v is None else str(v) for k, v in fields.items()}
+        redis = get_redis()
+        pipe = redis.pipeline(transaction=False)
+        pipe.hset(self._key(job_id), mapping=mapping)
+        pipe.expire(self._key(job_id), self.ttl)
+        pipe.publish(self._channel(job_id), fields.get("status", ""))
+        await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, str]]:
+        data = await get_redis().hgetall(self._key(job_id))
+        if not data:
+            return None
+        job = {k.decode(): v.decode() for k, v in data.items()}
+        job["job_id"] = job_id
+        return job
+
+    async def watch(self, job_id: str, poll_interval: float = 5.0) -> AsyncIterator[Dict[str, str]]:
+        """
+        İşin her durum değişikliğini üretir, iş bitince sonlanır.
+
+        Yayın kaçırılırsa `poll_interval` saniyede bir durum yeniden okunur.
+        """
+        pubsub = get_redis().pubsub()
+        await pubsub.subscribe(self._channel(job_id))
+        try:
+            last_status = None
+            while True:
+                # Abonelikten sonra okumak, arada kaçan güncellemeyi engeller
+                job = await self.get(job_id)
+                if job is None:
+                    return
+                if job["status"] != last_status:
+                    last_status = job["status"]
+                    yield job
+                if job["status"] in TERMINAL_STATES:
+                    return
+                await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=poll_interval
+                )
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+class TryOnJobQueue:
+    """
+    Sanal deneme işlerini sınırlı sayıda worker ile işleyen kuyruk.
+
+    İş girdileri (fotoğraflar) süreç içi kuyrukta, iş durumları ise
+    Redis'te tutulur. Replika kapanırsa bekleyen işler kaybolur ve
+    TTL sonunda silinir.
+    """
+
+    def __init__(
+        self,
+        backend: Callable[[str, str], Awaitable[str]],
+        concurrency: int = None,
+        max_queue: int = None,
+        ttl: int = None
+    ):
+        self.backend = backend
+        self.concurrency = concurrency or settings.TRYON_JOB_CONCURRENCY
+        self.max_queue = max_queue or settings.TRYON_JOB_QUEUE_SIZE
+        self.store = TryOnJobStore(ttl or settings.TRYON_JOB_TTL)
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        """Kuyruğu ve worker'ları çalışan event loop'ta başlatır."""
+        if self._loop is asyncio.get_running_loop():
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._workers = [
+            asyncio.ensure_future(self._worker(i))
+            for i in range(self.concurrency)
+        ]
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        """Worker'ları durdurur; işlenmekte olan işler iptal edilir."""
+        for task in self._workers:
+            task.cancel()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._loop = None
+
+    async def submit(self, user_image: str, product_image: str) -> str:
+        """
+        Yeni bir sanal deneme işi kuyruğa ekler.
+
+        Args:
+            user_image (str): Base64 formatında kullanıcı fotoğrafı
+            product_image (str): Base64 formatında ürün fotoğrafı
+
+        Returns:
+            str: İş kimliği
+
+        Raises:
+            QueueFullError: Kuyruk doluysa
+        """
+        await self.start()
+        if self._queue.full():
+            raise QueueFullError()
+
+        job_id = uuid.uuid4().hex
+        await self.store.save(job_id, status=PENDING, created_at=time.time())
+        try:
+            self._queue.put_nowait((job_id, user_image, product_image))
+        except asyncio.QueueFull:
+            # Kayıt sırasında eşzamanlı bir istek son yeri aldı
+            error = QueueFullError()
+            await self.store.save(job_id, status=FAILED, message=error.detail)
+            raise error
+        return job_id
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id, user_image, product_image = await self._queue.get()
+            try:
+                await self._run(job_id, user_image, product_image)
+            except Exception as e:
+                logger.error(f"Sanal deneme işi {job_id} kaydedilemedi: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, user_image: str, product_image: str) -> None:
+        await self.store.save(job_id, status=RUNNING)
+        try:
+            result_image = await self.backend(user_image, product_image)
+        except Exception as e:
+            logger.error(f"Sanal deneme işi {job_id} başarısız: {str(e)}")
+            await self.store.save(job_id, status=FAILED, message=str(e))
+            return
+        await self.store.save(job_id, status=SUCCEEDED, result_image=result_image)
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+def format_sse(job: Dict[str, str]) -> str:
+    """İş durumunu bir Server-Sent Events mesajına çevirir."""
+    return f"event: {job['status']}\ndata: {json.dumps(job, separators=(',', ':'))}\n\n"
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import threading
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Vektörleri L2 normuna böler (iç çarpım == kosinüs benzerliği)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """En yüksek `k` skorun indekslerini azalan sırada döndürür."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    candidates = np.argpartition(-scores, k)[:k]
+    return candidates[np.argsort(-scores[candidates])]
+
+def kmeans(vectors: np.ndarray, n_lists: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    Küresel k-means: normalize vektörler için `n_lists` merkez üretir.
+
+    Eğitim, büyük kataloglarda liste başına en fazla 256 örnekle yapılır.
+    """
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_lists * 256)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = (sample @ centroids.T).argmax(axis=1)
+        for i in range(n_lists):
+            members = sample[assignment == i]
+            if len(members):
+                centroids[i] = members.sum(axis=0)
+        centroids = normalize(centroids)
+    return centroids
+
+class VectorIndex:
+    """
+    Ürün görseli gömmeleri üzerinde kosinüs benzerliği ile en yakın komşu araması.
+
+    `centroids` yoksa arama tam (exact) yapılır: tek bir matris-vektör
+    çarpımı ve `argpartition`. Büyük kataloglar için IVF kullanılır:
+    vektörler k-means listelerine bölünüp liste sırasına dizilir, sorgu
+    yalnızca en yakın `nprobe` listenin bitişik dilimlerini tarar.
+
+    Dizin diskte `.npy` dosyaları olarak saklanır ve `np.load(mmap_mode="r")`
+    ile açılır; vektörler yalnızca erişildikçe belleğe sayfalanır.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        centroids: Optional[np.ndarray] = None,
+        offsets: Optional[np.ndarray] = None
+    ):
+        self.ids = ids
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+        self.dim = vectors.shape[1]
+
+    @property
+    def n_lists(self) -> int:
+        return 0 if self.centroids is None else len(self.centroids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids: Sequence[str], vectors: np.ndarray, n_lists: int = 0) -> "VectorIndex":
+        """
+        Gömmelerden dizin kurar.
+
+        Args:
+            ids (Sequence[str]): Ürün kimlikleri, `vectors` satırlarıyla aynı sırada
+            vectors (np.ndarray): (N, D) gömmeler
+            n_lists (int): IVF liste sayısı; 0 ise tam arama
+
+        Returns:
+            VectorIndex: Kurulan dizin
+        """
+        vectors = normalize(vectors)
+        if len(ids) != len(vectors):
+            raise ValueError("ids ve vectors aynı uzunlukta olmalı")
+        if not n_lists:
+            return cls(list(ids), vectors)
+
+        centroids = kmeans(vectors, n_lists)
+        assignment = (vectors @ centroids.T).argmax(axis=1)
+        order = np.argsort(assignment, kind="stable")
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(assignment, minlength=n_lists))
+        return cls(
+            [ids[i] for i in order],
+            np.ascontiguousarray(vectors[order]),
+            centroids,
+            offsets
+        )
+
+    def search(self, query: np.ndarray, k: int, nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Sorguya en benzer `k` ürünü döndürür.
+
+        Args:
+            query (np.ndarray): (D,) gömme
+            k (int): Sonuç sayısı
+            nprobe (int, optional): IVF'de taranacak liste sayısı
+
+        Returns:
+            List[Tuple[str, float]]: (ürün kimliği, kosinüs benzerliği), azalan sırada
+        """
+        query = normalize(query)
+        if query.shape != (self.dim,):
+            raise ValueError(f"Gömme boyutu {self.dim} olmalı, {query.shape} geldi")
+
+        if self.centroids is None:
+            rows = np.arange(len(self.ids))
+            scores = self.vectors @ query
+        else:
+            nprobe = min(nprobe or settings.EMBEDDING_NPROBE, self.n_lists)
+            lists = top_k(self.centroids @ query, nprobe)
+            rows = np.concatenate([
+                np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists
+            ])
+            scores = np.concatenate([
+                self.vectors[self.offsets[i]:self.offsets[i + 1]] @ query for i in lists
+            ])
+
+        best = top_k(scores, k)
+        return [(self.ids[rows[i]], float(scores[i])) for i in best]
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, "vectors.npy"), self.vectors)
+        if self.centroids is not None:
+            np.save(os.path.join(path, "centroids.npy"), self.centroids)
+            np.save(os.path.join(path, "offsets.npy"), self.offsets)
+        with open(os.path.join(path, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump(self.ids, f)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "VectorIndex":
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(path, "ids.json"), encoding="utf-8") as f:
+            ids = json.load(f)
+        vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode)
+        centroids = offsets = None
+        if os.path.exists(os.path.join(path, "centroids.npy")):
+            # Merkezler küçük ve her sorguda okunur, belleğe alınır
+            centroids = np.load(os.path.join(path, "centroids.npy"))
+            offsets = np.load(os.path.join(path, "offsets.npy"))
+        return cls(ids, vectors, centroids, offsets)
+
+_UNSET = object()
+_index = _UNSET
+_index_lock = threading.Lock()
+
+def get_vector_index() -> Optional[VectorIndex]:
+    """Paylaşılan dizini döndürür; dizin dosyası yoksa None (stil tabanlı öneri)."""
+    global _index
+    if _index is _UNSET:
+        with _index_lock:
+            if _index is _UNSET:
+                path = settings.EMBEDDING_INDEX_PATH
+                if path and os.path.exists(os.path.join(path, "ids.json")):
+                    _index = VectorIndex.load(path)
+                    kind = f"IVF, {_index.n_lists} liste" if _index.n_lists else "tam arama"
+                    logger.info(f"Gömme dizini yüklendi: {len(_index)} ürün, {kind} ({path})")
+                else:
+                    _index = None
+    return _index
+
+async def load_vector_index() -> Optional[VectorIndex]:
+    """`get_vector_index`'in event loop'u bloklamayan karşılığı."""
+    return _index if _index is not _UNSET else await asyncio.to_thread(get_vector_index)
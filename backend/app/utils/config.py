@@ -5,25 +5,165 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     # OpenWeather API
     OPENWEATHER_API_KEY: str
+    OPENWEATHER_BASE_URL: str = "http://api.openweathermap.org"
+    OPENWEATHER_TIMEOUT: float = 5.0  # saniye, istek başına
+    OPENWEATHER_MAX_CONCURRENCY: int = 50
+    OPENWEATHER_POOL_SIZE: int = 100
+    OPENWEATHER_HEDGE_DELAY: float = 0.3  # saniye; yanıt gecikirse ikinci istek (0: kapalı)
     
     # Kolors (Virtual Try-On) API
     KOLORS_API_URL: str
     KOLORS_ACCESS_KEY: str
     KOLORS_SECRET_KEY: str
+    TRYON_TIMEOUT: float = 120.0  # saniye, üretim uzun sürebilir
+    TRYON_POOL_SIZE: int = 20
+    TRYON_MAX_ATTEMPTS: int = 2
+    TRYON_JOB_CONCURRENCY: int = 4  # Kolors'a aynı anda giden iş sayısı
+    TRYON_JOB_QUEUE_SIZE: int = 100
+    TRYON_JOB_TTL: int = 3600  # saniye
+    TRYON_CACHE_ENABLED: bool = True
+    TRYON_CACHE_DIR: str = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        "cache",
+        "tryon"
+    )
+    TRYON_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    
+    # Sanal deneme sonuç görselleri ve küçültülmüş türevleri
+    DERIVATIVE_CACHE_DIR: str = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        "cache",
+        "derivatives"
+    )
+    DERIVATIVE_ORIGINALS_MAX_BYTES: int = 1024 * 1024 * 1024
+    DERIVATIVE_MAX_BYTES: int = 512 * 1024 * 1024
+    DERIVATIVE_QUALITY: int = 80
+    DERIVATIVE_WORKERS: int = 2
+    
+    # Paylaşılan HTTP oturumları
+    HTTP_DNS_CACHE_TTL: int = 300  # saniye
+    
+    # Upstream dayanıklılığı (devre kesici, yeniden deneme bütçesi, süre sınırı)
+    UPSTREAM_BREAKER_FAILURES: int = 5  # devreyi açan ardışık hata sayısı
+    UPSTREAM_BREAKER_RESET: float = 30.0  # saniye, yarı açık denemeye kadar
+    UPSTREAM_RETRY_ATTEMPTS: int = 3
+    UPSTREAM_RETRY_BASE_DELAY: float = 0.1  # saniye
+    UPSTREAM_RETRY_MAX_DELAY: float = 1.0  # saniye
+    UPSTREAM_RETRY_BUDGET: float = 0.2  # çağrı başına biriken yeniden deneme hakkı
+    UPSTREAM_RETRY_MIN_PER_SECOND: float = 1.0
+    REQUEST_MAX_TIMEOUT: float = 130.0  # saniye; X-Request-Timeout üst sınırı
     
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 0.5  # saniye
+    
+    # Önbellek (saniye cinsinden TTL)
+    GEOCODE_CACHE_TTL: int = 30 * 24 * 3600
+    GEOCODE_NEGATIVE_CACHE_TTL: int = 300  # konum bulunamadı yanıtları
+    WEATHER_CACHE_TTL: int = 600
+    CACHE_LOCAL_MAXSIZE: int = 4096
     
     # Model
     MODEL_PATH: str = os.path.join(
         os.path.dirname(os.path.dirname(__file__)), 
         "models", 
-        "deepfashion_model.h5"
+        "deepfashion_model.pt"
+    )
+    MODEL_INPUT_SIZE: int = 224
+    MODEL_BATCH_SIZE: int = 16
+    MODEL_BATCH_WAIT_MS: float = 10.0
+    MODEL_THREADS: int = 0  # torch intra-op thread sayısı; 0: torch varsayılanı
+    MODEL_MMAP: bool = True  # torch.load ağırlıkları dosyadan eşler (TorchScript hariç)
+    
+    # Üretim sunucusu (python -m app.serve); WORKERS 0 ise CPU sayısı kadar
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WORKERS: int = 0
+    # Çalışma ortamı; "development" dışında eksik gizli anahtarlarla açılmaz
+    APP_ENV: str = "production"
+    
+    # Açılış modu: eager (model, katalog ve indeksler uygulama istek kabul
+    # etmeden yüklenir) ya da lazy (arka planda yüklenir, /ready ısınma
+    # bitene kadar 503 döner; /health hemen cevap verir)
+    STARTUP_MODE: str = "eager"
+
+    # Ürün kataloğu (JSON lines ya da SQLite)
+    CATALOG_PATH: str = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        "data",
+        "catalog.jsonl"
     )
+    RECOMMENDATION_LIMIT: int = 10
+    
+    # Ürün görseli gömme dizini (yoksa yalnızca stil tabanlı öneri)
+    EMBEDDING_INDEX_PATH: str = os.path.join(
+        os.path.dirname(os.path.dirname(__file__)),
+        "data",
+        "embeddings"
+    )
+    EMBEDDING_NPROBE: int = 8
+    EMBEDDING_CANDIDATES: int = 200
+    
+    # /analyze aşama süre sınırları (saniye)
+    ANALYZE_STYLE_TIMEOUT: float = 10.0
+    ANALYZE_WEATHER_TIMEOUT: float = 1.5
+    # Aşama sürelerini Server-Timing başlığıyla istemciye açar; iç yapıyı
+    # ve upstream gecikmelerini sızdırdığından yalnızca hata ayıklarken açın
+    SERVER_TIMING_ENABLED: bool = False
+    
+    # QR kod üretimi
+    QR_CACHE_SIZE: int = 4096
+    QR_BOX_SIZE: int = 10
+    QR_WORKERS: int = 0  # 0: CPU sayısı kadar süreç
+    QR_BATCH_MAX_ITEMS: int = 1000
+    # QR yüklerinin HMAC anahtarı; tüm worker'larda ve yeniden başlatmalarda
+    # aynı olmalı. Boşsa uygulama yalnızca APP_ENV=development'ta açılır.
+    QR_SIGNING_KEY: str = ""
+    
+    # Dosya yükleme
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
     
     # Rate Limiting
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_PERIOD: float = 60.0
+    RATE_LIMIT_ALGORITHM: str = "gcra"  # gcra ya da sliding_window
+    # hybrid: yerel token bucket + toplu Redis senkronizasyonu (yalnızca GCRA;
+    # sliding_window seçilirse uyarıyla redis moduna düşülür)
+    # redis: her istekte tek Lua çağrısı
+    RATE_LIMIT_MODE: str = "hybrid"
+    RATE_LIMIT_SLACK: int = 5  # worker başına senkronizasyonlar arası en fazla aşım
+    RATE_LIMIT_FLUSH_INTERVAL: float = 0.1
+    
+    # Pahalı POST rotalarında tekrar eden istekler (Idempotency-Key başlığı,
+    # başlık yoksa gövde özeti) tek işleme indirilir, yanıtlar Redis'ten
+    # tekrar oynatılır
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL: int = 300  # saniye
+    # Daha büyük yanıtlar saklanmaz, başlıksız daha büyük gövdeler özetlenmez
+    IDEMPOTENCY_MAX_BYTES: int = 16 * 1024 * 1024
+    
+    # Prometheus metrikleri (/metrics); çok worker'lı çalıştırmada ortamda
+    # PROMETHEUS_MULTIPROC_DIR de tanımlanmalıdır
+    METRICS_ENABLED: bool = True
+    
+    # Hızlı yanıt yolu: orjson varsayılan yanıt sınıfı, doğrulanmış modellerin
+    # yeniden doğrulanmadan serileştirilmesi ve büyük base64 alanların
+    # kopyalanmadan yazılması
+    FAST_RESPONSES: bool = False
+    
+    # Loglama; LOG_ASYNC açıkken yazım arka plandaki tek bir thread'de yapılır
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # text ya da json
+    LOG_FILE: str = "app.log"  # boş: yalnızca konsol
+    LOG_ASYNC: bool = True
+    LOG_QUEUE_SIZE: int = 10000  # dolarsa yeni kayıtlar düşürülür
+    LOG_SAMPLE_RATE: float = 1.0  # WARNING altı kayıtların tutulan oranı
+    
+    # Frontend URL
+    BASE_URL: str = "http://localhost:3000"
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,131 @@
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+from typing import AsyncIterator, Optional
+import aiohttp
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+from app.utils.metrics import observe_upstream
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+class PooledSession:
+    """
+    Uygulama ömrü boyunca yaşayan, bağlantı havuzlu aiohttp oturumu.
+
+    Oturum ve eşzamanlılık semaforu çalışan event loop'a bağlıdır; loop
+    değişirse (örn. testlerde) ikisi de yeniden oluşturulur. `name` verilirse
+    her çağrının süresi bu adla upstream histogramına yazılır.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        timeout: float = 10.0,
+        max_concurrency: Optional[int] = None,
+        ttl_dns_cache: Optional[int] = None,
+        name: Optional[str] = None
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_concurrency = max_concurrency
+        self.ttl_dns_cache = ttl_dns_cache
+        self.name = name
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _create(self) -> None:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=self.ttl_dns_cache is not None,
+            ttl_dns_cache=self.ttl_dns_cache
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout
+        )
+        self._semaphore = (
+            asyncio.Semaphore(self.max_concurrency)
+            if self.max_concurrency else None
+        )
+        self._loop = asyncio.get_running_loop()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Çalışan loop için geçerli oturumu döndürür, gerekirse oluşturur."""
+        if (
+            self._session is None
+            or self._session.closed
+            or self._loop is not asyncio.get_running_loop()
+        ):
+            self._create()
+        return self._session
+
+    async def start(self) -> None:
+        """Oturumu uygulama açılışında oluşturur."""
+        self.session
+
+    async def close(self) -> None:
+        """Oturumu ve havuzdaki bağlantıları kapatır."""
+        if self._session is not None and not self._session.closed:
+            try:
+                await self._session.close()
+            except Exception as e:
+                logger.warning(f"HTTP oturumu kapatılamadı: {str(e)}")
+        self._session = None
+        self._semaphore = None
+        self._loop = None
+
+    @asynccontextmanager
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Eşzamanlılık sınırı içinde bir HTTP isteği yapar.
+
+        Args:
+            method (str): HTTP metodu
+            url (str): İstek adresi
+            timeout (float, optional): Bu çağrıya özel toplam zaman aşımı (saniye)
+
+        Yields:
+            aiohttp.ClientResponse: Upstream yanıtı
+        """
+        session = self.session
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+        if self._semaphore is None:
+            with self._observe():
+                async with session.request(method, url, **kwargs) as response:
+                    yield response
+            return
+
+        async with self._semaphore:
+            # Semafor beklemesi upstream süresine dahil edilmez
+            with self._observe():
+                async with session.request(method, url, **kwargs) as response:
+                    yield response
+
+    def _observe(self):
+        return observe_upstream(self.name) if self.name else nullcontext()
+
+# Tüm sanal deneme servislerinin (Kolors, KlingAI) paylaştığı oturum
+tryon_session = PooledSession(
+    limit=settings.TRYON_POOL_SIZE,
+    timeout=settings.TRYON_TIMEOUT,
+    ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+    name="tryon"
+)
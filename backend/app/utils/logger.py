@@ -1,42 +1,184 @@
+import atexit
+import json
 import logging
+import os
+import queue
+import random
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
+from app.utils.config import get_settings
+
+settings = get_settings()
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# LogRecord'un standart alanları; bunların dışındakiler `extra` ile gelmiştir
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    """Kaydı tek satırlık JSON'a çevirir; `extra` alanları da eklenir."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and key != "sample_rate":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    WARNING altındaki kayıtların yalnızca `rate` oranını geçirir.
+
+    Kayıt bazında `extra={"sample_rate": 0.01}` ile oran değiştirilebilir;
+    uyarı ve hatalar her zaman geçer.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = getattr(record, "sample_rate", self.rate)
+        return rate >= 1.0 or random.random() < rate
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Kaydı biçimlendirmeden kuyruğa atar; kuyruk doluysa kaydı düşürür.
+
+    Standart `QueueHandler.prepare` mesajı çağıran thread'de biçimlendirir;
+    burada `%` biçimlendirmesi, traceback ve JSON çevirisi dinleyici
+    thread'ine bırakılır. Süreç içi kuyruk kullanıldığından kaydın
+    serileştirilmesine gerek yoktur.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogListener(QueueListener):
+    """Durdurma işaretini dolu kuyrukta da (bekleyerek) ekleyen dinleyici."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+def _formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT)
+
+def _output_handlers() -> List[logging.Handler]:
+    formatter = _formatter()
+
+    # Console handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    # File handler
+    if settings.LOG_FILE:
+        file_handler = RotatingFileHandler(
+            settings.LOG_FILE,
+            maxBytes=10485760,  # 10MB
+            backupCount=5
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    return handlers
+
+_lock = threading.Lock()
+_handlers: Optional[List[logging.Handler]] = None
+_listener: Optional[LogListener] = None
+
+def _shared_handlers() -> List[logging.Handler]:
+    """Tüm logger'ların paylaştığı handler'ları (ilk çağrıda) kurar."""
+    global _handlers, _listener
+    with _lock:
+        if _handlers is None:
+            outputs = _output_handlers()
+            if settings.LOG_ASYNC:
+                log_queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+                _listener = LogListener(log_queue, *outputs, respect_handler_level=True)
+                _listener.start()
+                atexit.register(stop_logging)
+                _handlers = [NonBlockingQueueHandler(log_queue)]
+            else:
+                _handlers = outputs
+            if settings.LOG_SAMPLE_RATE < 1.0:
+                sampler = SamplingFilter(settings.LOG_SAMPLE_RATE)
+                for handler in _handlers:
+                    handler.addFilter(sampler)
+        return _handlers
+
+def stop_logging() -> None:
+    """Kuyrukta kalan kayıtları yazar ve dinleyici thread'ini durdurur."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+def _restart_after_fork() -> None:
+    """
+    Fork edilen çocukta (gunicorn worker'ları) dinleyici thread'i yoktur;
+    yeni bir kuyruk ve dinleyici kurulur. Ebeveynin kuyruğunda bekleyen
+    kayıtlar ebeveyn tarafından yazılacağından çocuğa taşınmaz.
+    """
+    global _lock, _listener
+    _lock = threading.Lock()
+    if _listener is None:
+        return
+    log_queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+    for handler in _handlers:
+        if isinstance(handler, NonBlockingQueueHandler):
+            handler.queue = log_queue
+    _listener = LogListener(log_queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+os.register_at_fork(after_in_child=_restart_after_fork)
+
+def dropped_records() -> int:
+    """Kuyruk dolu olduğu için düşürülen kayıt sayısı."""
+    return sum(getattr(handler, "dropped", 0) for handler in _handlers or ())
 
 def get_logger(name: str) -> logging.Logger:
     """
     Uygulama için özelleştirilmiş logger oluşturur.
-    
+
+    Varsayılan olarak (`LOG_ASYNC`) kayıtlar süreç başına tek bir kuyruğa
+    atılır ve dosya/konsol yazımı arka plandaki dinleyici thread'inde
+    yapılır; istek yolu diske hiç beklemez.
+
     Args:
         name: Logger ismi (genellikle __name__)
-        
+
     Returns:
         logging.Logger: Yapılandırılmış logger nesnesi
     """
     logger = logging.getLogger(name)
-    
+
     if not logger.handlers:  # Prevent adding handlers multiple times
-        logger.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
-        console_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
-        
-        # File handler
-        file_handler = RotatingFileHandler(
-            'app.log',
-            maxBytes=10485760,  # 10MB
-            backupCount=5
-        )
-        file_handler.setLevel(logging.INFO)
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-    
+        logger.setLevel(settings.LOG_LEVEL)
+        for handler in _shared_handlers():
+            logger.addHandler(handler)
+
     return logger
@@ -0,0 +1,175 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+from app.utils.config import get_settings
+
+settings = get_settings()
+
+# Çok süreçli mod: PROMETHEUS_MULTIPROC_DIR süreç başlamadan ortamda tanımlı
+# olmalıdır; her worker sayaçlarını bu dizindeki mmap dosyalarına yazar ve
+# /metrics hepsini toplayarak döndürür.
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+UNMATCHED = "<unmatched>"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "Tamamlanan HTTP istekleri",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP istek süresi (yanıt gövdesi gönderilene kadar)",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "İşlenmekte olan HTTP istekleri",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+UPSTREAM_DURATION = Histogram(
+    "upstream_request_duration_seconds",
+    "Dış servis çağrılarının süresi",
+    ["upstream", "outcome"],
+    buckets=LATENCY_BUCKETS
+)
+UPSTREAM_RETRIES = Counter(
+    "upstream_retries_total",
+    "Upstream'e yapılan ek denemeler (retry: yeniden deneme, hedge: yedek istek)",
+    ["upstream", "kind"]
+)
+CIRCUIT_STATE = Gauge(
+    "upstream_circuit_state",
+    "Devre kesici durumu (0: kapalı, 1: yarı açık, 2: açık)",
+    ["upstream"],
+    multiprocess_mode="max"
+)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Önbellek aramaları (isabet oranı: *_hit / toplam)",
+    ["cache", "result"]
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total",
+    "Rate limit nedeniyle reddedilen istekler",
+    ["bucket"]
+)
+
+def cache_counters(cache: str, results: Iterable[str]) -> Dict[str, Counter]:
+    """Bir önbelleğin sonuç sayaçlarını önceden bağlar; sıcak yolda etiket araması yapılmaz."""
+    return {result: CACHE_LOOKUPS.labels(cache, result) for result in results}
+
+@contextmanager
+def observe_upstream(upstream: str):
+    """
+    Bloğun süresini upstream histogramına yazar.
+
+    Blok hata fırlatırsa `outcome="error"`, aksi halde `outcome="ok"`
+    etiketiyle kaydedilir; hata yeniden fırlatılır.
+    """
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        UPSTREAM_DURATION.labels(upstream, outcome).observe(time.perf_counter() - started)
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Prometheus metin formatında tüm metrikleri döndürür.
+
+    Returns:
+        Tuple[bytes, str]: Gövde ve Content-Type
+    """
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+class MetricsMiddleware:
+    """
+    Rota bazlı istek sayacı, gecikme histogramı ve işlemdeki istek göstergesi.
+
+    Etiket kardinalitesini sınırlamak için istekler ham yola göre değil rota
+    şablonuna göre (örn. `/virtual-try-on/{job_id}`) etiketlenir; hiçbir
+    rotaya uymayan yollar tek bir `<unmatched>` etiketinde toplanır. Şablonlar
+    ilk istekte uygulamanın rotalarından bir kez çıkarılır.
+    """
+
+    def __init__(self, app, exclude: Iterable[str] = ()):
+        self.app = app
+        self.exclude = set(exclude)
+        self._table: Optional[Dict[Tuple[str, str], str]] = None
+        self._patterns: List[tuple] = []
+
+    def resolve(self, routes) -> None:
+        """Rotaları (method, yol) -> şablon tablosuna çevirir (uygulama başına bir kez)."""
+        table = {}
+        patterns = []
+        for route in routes:
+            path = getattr(route, "path", None)
+            methods = getattr(route, "methods", None)
+            if path is None or not methods:
+                continue
+            for method in methods:
+                if "{" in path:
+                    patterns.append((route.path_regex, method, path))
+                else:
+                    table[(method, path)] = path
+        self._patterns = patterns
+        self._table = table
+
+    def _route(self, method: str, path: str) -> str:
+        route = self._table.get((method, path))
+        if route is None:
+            for regex, pattern_method, template in self._patterns:
+                if method == pattern_method and regex.match(path):
+                    return template
+            return UNMATCHED
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+        if self._table is None:
+            self.resolve(scope["app"].routes)
+
+        method = scope["method"]
+        route = self._route(method, scope["path"])
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = HTTP_IN_FLIGHT.labels(method, route)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            in_flight.dec()
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Optional
+import redis
+import redis.asyncio as aioredis
+from app.utils.config import get_settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Redis'e erişilemediğini gösteren hatalar (bağlantı, zaman aşımı)
+REDIS_ERRORS = (redis.RedisError, OSError, asyncio.TimeoutError)
+
+_client: Optional[aioredis.Redis] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_pinned = False
+
+def get_redis() -> aioredis.Redis:
+    """
+    Paylaşılan async Redis istemcisini döndürür.
+
+    Bağlantılar çalışan event loop'a bağlı olduğundan loop değiştiğinde
+    istemci yeniden oluşturulur.
+
+    Returns:
+        redis.asyncio.Redis: Bağlantı havuzlu istemci
+    """
+    global _client, _loop
+    if _pinned:
+        return _client
+    loop = asyncio.get_running_loop()
+    if _client is None or _loop is not loop:
+        _client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=0,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+        _loop = loop
+    return _client
+
+def set_redis(client: Optional[aioredis.Redis]) -> None:
+    """
+    Paylaşılan istemciyi sabitler (testler ve benchmark'lar için).
+
+    None verilirse varsayılan, ayarlardan oluşturulan istemciye dönülür.
+    """
+    global _client, _loop, _pinned
+    _client = client
+    _loop = None
+    _pinned = client is not None
+
+async def close_redis() -> None:
+    """Paylaşılan istemciyi ve bağlantı havuzunu kapatır."""
+    global _client, _loop
+    if _pinned:
+        return
+    if _client is not None:
+        try:
+            await _client.aclose()
+        except Exception as e:
+            logger.warning(f"Redis bağlantısı kapatılamadı: {str(e)}")
+    _client = None
+    _loop = None
@@ -0,0 +1,381 @@
+import asyncio
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Coroutine, Optional, TypeVar
+import aiohttp
+from app.utils.config import get_settings
+from app.utils.exceptions import APIError
+from app.utils.logger import get_logger
+from app.utils.metrics import CIRCUIT_STATE, UPSTREAM_RETRIES
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# İsteğin mutlak son anı (time.monotonic); upstream çağrıları kalan süreyi aşmaz
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """İsteğin süresi upstream çağrısı yapılamadan doldu."""
+
+class CircuitOpenError(APIError):
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=f"{upstream} servisi geçici olarak kullanılamıyor. Lütfen daha sonra tekrar deneyin."
+        )
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+class UpstreamStatusError(Exception):
+    """Upstream'in başarısız HTTP yanıtı; 5xx ve 429 yeniden denenebilir."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """
+    Blok (ve içinde oluşturulan task'lar) için son anı ayarlar.
+
+    Dıştaki son an daha erkense o korunur; `seconds` None ise değişiklik yapılmaz.
+    """
+    if seconds is None:
+        yield
+        return
+    current = _deadline.get()
+    until = time.monotonic() + seconds
+    token = _deadline.set(until if current is None else min(current, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """İsteğin kalan süresi (saniye); son an yoksa None."""
+    until = _deadline.get()
+    return None if until is None else until - time.monotonic()
+
+def detached_task(coro: Coroutine[Any, Any, T]) -> "asyncio.Task[T]":
+    """
+    Çağıranın son anını taşımayan bir task başlatır.
+
+    Birden çok isteğin paylaştığı işler (tekilleştirilmiş yüklemeler) tek
+    bir isteğin süre sınırıyla kesilmemelidir; her bekleyen kendi süresini
+    `wait_within_deadline` ile uygular.
+    """
+    context = contextvars.copy_context()
+    context.run(_deadline.set, None)
+    return context.run(asyncio.ensure_future, coro)
+
+async def wait_within_deadline(task: "asyncio.Future[T]") -> T:
+    """
+    Paylaşılan task'ı isteğin kalan süresi kadar bekler; task iptal edilmez.
+
+    Raises:
+        DeadlineExceeded: Task isteğin süresi içinde bitmediyse
+    """
+    left = remaining()
+    if left is None:
+        return await asyncio.shield(task)
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), max(left, 0.0))
+    except asyncio.TimeoutError:
+        if task.done():
+            raise
+        raise DeadlineExceeded("Paylaşılan işin sonucu isteğin süresi içinde alınamadı") from None
+
+def is_retryable(error: BaseException) -> bool:
+    """Hata geçici mi (bağlantı, zaman aşımı, 5xx/429)?"""
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if isinstance(error, (aiohttp.ClientResponseError, UpstreamStatusError)):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+def is_resubmittable(error: BaseException) -> bool:
+    """
+    Idempotent olmayan (ücretli üretim gibi) bir çağrı yeniden gönderilebilir mi?
+
+    Yalnızca isteğin upstream'e ulaşmadığı kesin olan durumlar: bağlantı
+    kurulamadı ya da upstream 429/503 ile reddetti. Zaman aşımı ve kopan
+    bağlantıda iş upstream'de kabul edilmiş olabilir; yeniden gönderilmez.
+    """
+    if isinstance(error, (aiohttp.ClientResponseError, UpstreamStatusError)):
+        return error.status in (429, 503)
+    return isinstance(error, aiohttp.ClientConnectorError)
+
+class CircuitBreaker:
+    """
+    Ardışık hatalarda upstream'e giden çağrıları kesen devre kesici.
+
+    `failure_threshold` ardışık hatadan sonra devre açılır ve çağrılar
+    upstream'e gitmeden `CircuitOpenError` ile reddedilir. `reset_timeout`
+    saniye sonra yarı açık duruma geçilir ve tek bir deneme çağrısına izin
+    verilir; başarılıysa devre kapanır, değilse yeniden açılır.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._gauge = CIRCUIT_STATE.labels(name)
+        self._gauge.set(_STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.warning("Devre kesici %s: %s -> %s", self.name, self.state, state)
+        self.state = state
+        self._gauge.set(_STATE_VALUES[state])
+
+    def acquire(self) -> bool:
+        """
+        Çağrıya izin verilip verilmediğini kontrol eder.
+
+        Returns:
+            bool: Çağrı yarı açık durumdaki deneme çağrısıysa True; sonucu
+                `release`'e aynen geçirilmelidir
+
+        Raises:
+            CircuitOpenError: Devre açıksa ya da yarı açıkta deneme sürüyorsa
+        """
+        if self.state == OPEN:
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset_timeout:
+                raise CircuitOpenError(self.name, self.reset_timeout - waited)
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probing:
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self._probing = True
+            return True
+        return False
+
+    def release(self, success: Optional[bool], probe: bool = False) -> None:
+        """
+        Çağrının sonucunu kaydeder.
+
+        Args:
+            success (Optional[bool]): None ise çağrı iptal edildi ya da kendi
+                süre sınırımız yüzünden kesildi; upstream hakkında bilgi vermez.
+            probe (bool): `acquire`'ın döndürdüğü değer
+        """
+        if probe:
+            self._probing = False
+        if success is None:
+            return
+        if self.state != CLOSED and not probe:
+            # Devre açılmadan önce başlamış eski bir çağrı; yarı açık durumu
+            # yalnızca deneme çağrısı çözer
+            return
+        if success:
+            self.failures = 0
+            self._set_state(CLOSED)
+            return
+        self.failures += 1
+        if probe or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+class RetryBudget:
+    """
+    Yeniden denemeleri normal trafiğin bir oranıyla sınırlar.
+
+    Her yeni çağrı bütçeye `ratio` kadar jeton ekler, her yeniden deneme
+    (ya da yedek istek) bir jeton harcar. Düşük trafikte de birkaç yeniden
+    deneme yapılabilsin diye bütçe saniyede `min_per_second` jetonla
+    dolar. Upstream çöktüğünde yeniden denemeler trafiği en fazla
+    `1 + ratio` katına çıkarabilir.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._updated = time.monotonic()
+
+    def _refill(self, amount: float) -> None:
+        now = time.monotonic()
+        amount += (now - self._updated) * self.min_per_second
+        self._updated = now
+        self.tokens = min(self.max_tokens, self.tokens + amount)
+
+    def deposit(self) -> None:
+        self._refill(self.ratio)
+
+    def withdraw(self) -> bool:
+        self._refill(0.0)
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+class Upstream:
+    """
+    Bir upstream'e yapılan çağrıları devre kesici, yeniden deneme bütçesi,
+    istek süre sınırı ve isteğe bağlı yedek (hedged) isteklerle sarar.
+
+    `call` verilen fonksiyona bu deneme için kullanılabilecek süreyi
+    (upstream zaman aşımı ile isteğin kalan süresinin küçüğü) geçirir.
+    Yeniden denemeler arasında tam jitter'lı üstel bekleme yapılır ve
+    bekleme isteğin kalan süresini aşacaksa yeniden denenmez.
+    `idempotent=False` olan upstream'lerde yalnızca `is_resubmittable`
+    hatalar yeniden denenir.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        max_attempts: int = None,
+        base_delay: float = None,
+        max_delay: float = None,
+        breaker: CircuitBreaker = None,
+        budget: RetryBudget = None,
+        idempotent: bool = True
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.should_retry = is_retryable if idempotent else is_resubmittable
+        self.max_attempts = max_attempts or settings.UPSTREAM_RETRY_ATTEMPTS
+        self.base_delay = settings.UPSTREAM_RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = settings.UPSTREAM_RETRY_MAX_DELAY if max_delay is None else max_delay
+        self.breaker = breaker or CircuitBreaker(
+            name,
+            settings.UPSTREAM_BREAKER_FAILURES,
+            settings.UPSTREAM_BREAKER_RESET
+        )
+        self.budget = budget or RetryBudget(
+            settings.UPSTREAM_RETRY_BUDGET,
+            settings.UPSTREAM_RETRY_MIN_PER_SECOND
+        )
+        self._retries = UPSTREAM_RETRIES.labels(name, "retry")
+        self._hedges = UPSTREAM_RETRIES.labels(name, "hedge")
+
+    def _attempt_timeout(self) -> float:
+        left = remaining()
+        if left is None:
+            return self.timeout
+        if left <= 0:
+            raise DeadlineExceeded(f"{self.name} çağrısı için süre kalmadı")
+        return min(self.timeout, left)
+
+    async def _attempt(self, fn: Callable[[float], Awaitable[T]]) -> T:
+        timeout = self._attempt_timeout()
+        probe = self.breaker.acquire()
+        success = None
+        try:
+            result = await asyncio.wait_for(fn(timeout), timeout)
+            success = True
+            return result
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError) and timeout < self.timeout:
+                # Upstream değil isteğin kalan süresi yetmedi
+                raise DeadlineExceeded(f"{self.name} çağrısı isteğin süresini aştı") from e
+            # 4xx gibi kalıcı hatalar upstream'in sağlıklı olduğunu gösterir
+            success = not is_retryable(e)
+            raise
+        finally:
+            self.breaker.release(success, probe)
+
+    async def _hedged_attempt(self, fn: Callable[[float], Awaitable[T]], delay: float) -> T:
+        first = asyncio.ensure_future(self._attempt(fn))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done or self.breaker.state != CLOSED or not self.budget.withdraw():
+            return await first
+
+        self._hedges.inc()
+        pending = {first, asyncio.ensure_future(self._attempt(fn))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def call(self, fn: Callable[[float], Awaitable[T]], hedge_delay: float = 0.0) -> T:
+        """
+        `fn(timeout)` çağrısını dayanıklılık politikalarıyla yapar.
+
+        Args:
+            fn (Callable): Deneme başına süre sınırını (saniye) alan async fonksiyon
+            hedge_delay (float): > 0 ise ilk deneme bu sürede bitmezse ikinci
+                bir istek gönderilir ve önce biten kullanılır (yalnızca
+                idempotent çağrılar için)
+
+        Raises:
+            CircuitOpenError: Devre açıksa
+            DeadlineExceeded: İsteğin süresi dolduysa
+        """
+        self.budget.deposit()
+        attempt = 1
+        while True:
+            try:
+                if hedge_delay > 0:
+                    return await self._hedged_attempt(fn, hedge_delay)
+                return await self._attempt(fn)
+            except Exception as e:
+                if not self.should_retry(e) or attempt >= self.max_attempts:
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                left = remaining()
+                if (left is not None and left <= delay) or not self.budget.withdraw():
+                    raise
+                logger.warning(
+                    "%s çağrısı başarısız (%s), %.2f sn sonra yeniden deneniyor (%d/%d)",
+                    self.name, type(e).__name__, delay, attempt + 1, self.max_attempts
+                )
+                self._retries.inc()
+                attempt += 1
+                await asyncio.sleep(delay)
+
+class DeadlineMiddleware:
+    """
+    Her isteğe bir son an atar; upstream çağrıları bu süreyi aşmaz.
+
+    İstemci kalan süresini `X-Request-Timeout` (saniye) başlığıyla
+    bildirebilir; değer `REQUEST_MAX_TIMEOUT` ile sınırlanır.
+    """
+
+    def __init__(self, app, max_timeout: float = None):
+        self.app = app
+        self.max_timeout = max_timeout or settings.REQUEST_MAX_TIMEOUT
+
+    def _timeout(self, scope) -> float:
+        for name, value in scope["headers"]:
+            if name == b"x-request-timeout":
+                try:
+                    requested = float(value)
+                except ValueError:
+                    break
+                if requested > 0:
+                    return min(requested, self.max_timeout)
+        return self.max_timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with deadline(self._timeout(scope)):
+            await self.app(scope, receive, send)
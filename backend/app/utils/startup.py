@@ -0,0 +1,79 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Sequence, Tuple
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STARTING = "starting"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+WarmupStep = Tuple[str, Callable[[], Awaitable[None]]]
+
+class Readiness:
+    """
+    Açılış ısınmasının (model, katalog, indeksler) durumunu tutar.
+
+    Canlılık (`/health`) süreç cevap verdiği sürece olumludur; hazırlık
+    (`/ready`) ise ısınma adımlarının hepsi bitene kadar olumsuzdur. Böylece
+    `lazy` açılışta pod saniyeler içinde canlı görünür, trafik ancak
+    ısındıktan sonra yönlendirilir.
+    """
+
+    def __init__(self):
+        self.state = STARTING
+        self.started_at = time.monotonic()
+        self.steps: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    async def _run(self, steps: Sequence[WarmupStep]) -> None:
+        self.state = WARMING
+        try:
+            for name, step in steps:
+                started = time.perf_counter()
+                await step()
+                self.steps[name] = round(time.perf_counter() - started, 3)
+        except Exception as e:
+            self.state = FAILED
+            self.error = f"{name}: {e}"
+            logger.error(f"Açılış ısınması başarısız ({name}): {str(e)}")
+            raise
+        self.state = READY
+        logger.info("Uygulama hazır (%.2f sn): %s", time.monotonic() - self.started_at, self.steps)
+
+    def start(self, steps: Sequence[WarmupStep]) -> asyncio.Task:
+        """Isınma adımlarını sırayla çalıştıran task'ı başlatır."""
+        self.state = STARTING
+        self.started_at = time.monotonic()
+        self.steps = {}
+        self.error = None
+        self._task = asyncio.create_task(self._run(steps))
+        # lazy açılışta kimse beklemez; hata yukarıda loglandı
+        self._task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+
+    def report(self) -> dict:
+        return {
+            "status": self.state,
+            "uptime": round(time.monotonic() - self.started_at, 3),
+            "steps": dict(self.steps),
+            "error": self.error
+        }
+
+readiness = Readiness()
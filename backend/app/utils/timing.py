@@ -0,0 +1,67 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class StageTimer:
+    """
+    Bir isteğin aşama sürelerini toplar ve `Server-Timing` başlığına çevirir.
+
+    Aşamalar eşzamanlı çalışabilir; her aşama kendi başlangıcından itibaren
+    ölçülür, `total` ise zamanlayıcının oluşturulmasından itibaren geçen süredir.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Tuple[float, Optional[str]]] = {}
+
+    def record(self, name: str, elapsed: float, desc: Optional[str] = None) -> None:
+        self.stages[name] = (elapsed * 1000, desc)
+
+    @contextmanager
+    def measure(self, name: str):
+        started = time.perf_counter()
+        desc = None
+        try:
+            yield
+        except Exception:
+            desc = "error"
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, desc)
+
+    async def run(self, name: str, awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        Aşamayı süre sınırıyla çalıştırır ve süresini kaydeder.
+
+        Raises:
+            asyncio.TimeoutError: Aşama `timeout` saniyede bitmezse
+        """
+        started = time.perf_counter()
+        desc = None
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            desc = "timeout"
+            raise
+        except asyncio.CancelledError:
+            desc = "cancelled"
+            raise
+        except Exception:
+            desc = "error"
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started, desc)
+
+    def header(self) -> str:
+        """`Server-Timing` başlık değeri, örn. `style;dur=12.5, total;dur=13.1`."""
+        entries = []
+        for name, (duration, desc) in self.stages.items():
+            entry = f"{name};dur={duration:.1f}"
+            if desc:
+                entry += f';desc="{desc}"'
+            entries.append(entry)
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(entries)
@@ -0,0 +1,129 @@
+from typing import Dict, Optional
+from fastapi import Request, UploadFile
+from fastapi.responses import JSONResponse
+from app.utils.exceptions import APIError, ValidationError
+
+CHUNK_SIZE = 64 * 1024
+# Multipart sınırları ve form alanları için pay
+MULTIPART_OVERHEAD = 64 * 1024
+
+def multipart_limit(files: int, max_bytes: int) -> int:
+    """`files` adet dosya içeren bir multipart gövdenin üst sınırı."""
+    return files * max_bytes + MULTIPART_OVERHEAD
+
+class PayloadTooLargeError(APIError):
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=413,
+            detail=f"Dosya çok büyük. En fazla {max_bytes // (1024 * 1024)} MB yüklenebilir."
+        )
+
+class UploadLimitMiddleware:
+    """
+    Yükleme yollarında gövde boyutunu, gövde ayrıştırılmadan önce sınırlar.
+
+    Content-Length sınırı aşıyorsa istek hemen 413 ile reddedilir. Başlık
+    yoksa (chunked) gelen baytlar sayılır ve sınır aşıldığında akış kesilir.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name != b"content-length":
+                continue
+            try:
+                length = int(value)
+            except ValueError:
+                length = -1
+            if length < 0:
+                response = JSONResponse(status_code=400, content={"detail": "Geçersiz Content-Length başlığı"})
+                await response(scope, receive, send)
+                return
+            if length > limit:
+                await self._reject(limit, scope, receive, send)
+                return
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit and not rejected:
+                    rejected = True
+                    await self._reject(limit, scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            # Reddettikten sonra uygulamanın yanıtı yutulur
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            # Kesilen gövde yüzünden oluşan ayrıştırma hataları zaten yanıtlandı
+            if not rejected:
+                raise
+
+    @staticmethod
+    async def _reject(limit: int, scope, receive, send):
+        error = PayloadTooLargeError(limit)
+        response = JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+        await response(scope, receive, send)
+
+async def read_upload(upload: UploadFile, max_bytes: int) -> bytes:
+    """
+    Yüklenen dosyayı parça parça okur, sınır aşılırsa okumayı keser.
+
+    Args:
+        upload (UploadFile): Multipart dosya alanı (diske taşabilen tampon)
+        max_bytes (int): İzin verilen en büyük dosya boyutu
+
+    Returns:
+        bytes: Dosya içeriği
+
+    Raises:
+        PayloadTooLargeError: Dosya sınırı aşarsa
+        ValidationError: Dosya boşsa
+    """
+    # Parçalar sonda tek seferde birleştirilir; ara kopya tepe belleği ikiye katlamaz
+    chunks = []
+    size = 0
+    while True:
+        chunk = await upload.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise PayloadTooLargeError(max_bytes)
+        chunks.append(chunk)
+    if not size:
+        raise ValidationError(f"Boş dosya: {upload.filename or 'image'}")
+    return b"".join(chunks)
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    """Baytların imzasına bakarak görüntünün MIME türünü tahmin eder."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+def wants_image(request: Request) -> bool:
+    """İstemci JSON yerine doğrudan görüntü baytları istiyor mu?"""
+    accept = request.headers.get("accept", "")
+    return "image/" in accept and "application/json" not in accept
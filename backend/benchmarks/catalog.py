@@ -0,0 +1,98 @@
+"""
+Ürün önerisi benchmark'ı.
+
+Farklı katalog boyutlarında (varsayılan 1k / 10k / 100k SKU) sentetik bir
+katalog kurar ve `ProductCatalog.recommend` gecikmesini ölçer:
+
+- cold: önbelleği atlayan sorgu (indeks + vektörel filtre)
+- hot: LRU önbellekten dönen sorgu
+
+Kullanım:
+    python -m benchmarks.catalog --sizes 1000 10000 100000 --output catalog.json
+"""
+import argparse
+import json
+import random
+import time
+import numpy as np
+from app.services.catalog import ProductCatalog
+from app.services.deepfashion import STYLES
+
+SIZES = ["XS", "S", "M", "L", "XL"]
+COLORS = ["Black", "White", "Blue", "Red", "Green", "Gray", "Navy", "Brown"]
+CATEGORIES = ["T-Shirts", "Jeans", "Shirts", "Dresses", "Shoes", "Jackets", "Bags", "Pants"]
+
+def make_products(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            "id": str(i),
+            "name": f"Product {i}",
+            "brand": f"Brand {i % 50}",
+            "category": rng.choice(CATEGORIES),
+            "price": round(rng.uniform(10, 300), 2),
+            "image_url": f"https://example.com/{i}.jpg",
+            "sizes": rng.sample(SIZES, rng.randint(1, len(SIZES))),
+            "colors": rng.sample(COLORS, rng.randint(1, 3)),
+            "styles": rng.sample(STYLES, rng.randint(1, 2)),
+            "popularity": rng.random()
+        }
+
+def make_queries(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [
+        (
+            rng.choice(STYLES),
+            rng.choice(SIZES + [None]),
+            rng.choice(COLORS + [None]),
+            rng.choice(CATEGORIES + [None, None, None]),
+            None,
+            rng.choice([None, 50.0, 100.0, 200.0])
+        )
+        for _ in range(count)
+    ]
+
+def measure(func, queries) -> dict:
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        func(*query)
+        timings.append((time.perf_counter() - started) * 1e6)
+    return {
+        "us_p50": round(float(np.percentile(timings, 50)), 1),
+        "us_p95": round(float(np.percentile(timings, 95)), 1),
+        "us_p99": round(float(np.percentile(timings, 99)), 1)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Katalog öneri benchmark'ı")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries)
+    results = []
+    for size in args.sizes:
+        started = time.perf_counter()
+        catalog = ProductCatalog(make_products(size))
+        build_s = time.perf_counter() - started
+
+        cold = measure(catalog._recommend, queries)
+        for query in queries:
+            catalog.recommend(*query)
+        hot = measure(catalog.recommend, queries)
+
+        results.append({"skus": size, "build_s": round(build_s, 2), "cold": cold, "hot": hot})
+        print(
+            f"  {size:>7} SKU  kurulum {build_s:6.2f} s"
+            f"  cold p50 {cold['us_p50']:>8.1f} µs  p99 {cold['us_p99']:>8.1f} µs"
+            f"  hot p50 {hot['us_p50']:>6.1f} µs"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"queries": args.queries, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
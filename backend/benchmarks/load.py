@@ -0,0 +1,263 @@
+"""
+Rota bazlı yük ve gecikme benchmark'ı.
+
+Uygulama süreç içinde (httpx ASGITransport) lifespan ile birlikte ayağa
+kaldırılır. OpenWeather ve Kolors yerine aynı event loop'ta çalışan, gecikmesi
+ayarlanabilir aiohttp taklitleri, Redis yerine fakeredis kullanılır; böylece
+sonuçlar ağdan ve dış servislerden bağımsız, sürümden sürüme karşılaştırılabilir
+olur. Her rota için sabit sayıda istek belirli eşzamanlılıkla gönderilir ve
+RPS, p50/p95/p99 gecikme, durum kodu dağılımı ve bellek (RSS) raporlanır.
+
+`--baseline` ile önceki bir `--output` dosyası verilirse RPS ve p95
+değişimleri de yazdırılır.
+
+Kullanım:
+    python -m benchmarks.load --requests 500 --concurrency 20 --upstream-latency 50 --output load.json
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import platform
+import random
+import resource
+import tempfile
+import time
+from collections import Counter
+from io import BytesIO
+from unittest.mock import patch
+import fakeredis.aioredis
+import httpx
+import numpy as np
+from aiohttp import web
+from PIL import Image
+from app.utils.redis_client import set_redis
+
+ROUTES = ("health", "weather", "analyze", "analyze_weather", "virtual_try_on", "qrcode", "qrcode_resolve")
+
+def rss_mb() -> float:
+    """Anlık yerleşik bellek (MB); /proc yoksa tepe değer kullanılır."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class Upstreams:
+    """OpenWeather ve Kolors taklitleri; her yanıt `latency ± jitter` ms bekletilir."""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, seed: int = 0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.rng = random.Random(seed)
+        self.calls = Counter()
+        self.url = None
+
+    async def _delay(self, name: str) -> None:
+        self.calls[name] += 1
+        delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def geocode(self, request: web.Request) -> web.Response:
+        await self._delay("geocode")
+        # Konum adından deterministik koordinat
+        digest = hashlib.sha1(request.query.get("q", "").encode()).digest()
+        lat = digest[0] / 255 * 180 - 90
+        lon = digest[1] / 255 * 360 - 180
+        return web.json_response([{"lat": lat, "lon": lon}])
+
+    async def weather(self, request: web.Request) -> web.Response:
+        await self._delay("weather")
+        return web.json_response({
+            "main": {"temp": 18.5, "humidity": 60},
+            "wind": {"speed": 3.2},
+            "weather": [{"description": "açık", "icon": "01d"}]
+        })
+
+    async def try_on(self, request: web.Request) -> web.Response:
+        await request.read()
+        await self._delay("kolors")
+        return web.json_response({"result_image": "cmVzdWx0"})
+
+    async def start(self) -> None:
+        app = web.Application(client_max_size=32 * 2 ** 20)
+        app.router.add_get("/geo/1.0/direct", self.geocode)
+        app.router.add_get("/data/2.5/weather", self.weather)
+        app.router.add_post("/kolors", self.try_on)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self) -> None:
+        await self._runner.cleanup()
+
+def sample_image(size=(256, 384)) -> str:
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=85)
+    return f"data:image/jpeg;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+def build_requests(args, catalog_ids) -> dict:
+    """Rota adı -> `i` numaralı istek için (method, path, kwargs) üreten fonksiyon."""
+    from app.services.qr_generator import build_payload
+
+    image = sample_image()
+    locations = [f"city-{i}" for i in range(args.locations)]
+    tokens = [build_payload(product_id, "M", "Black") for product_id in catalog_ids]
+
+    def location(i):
+        return locations[i % len(locations)]
+
+    return {
+        "health": lambda i: ("GET", "/health", {}),
+        "weather": lambda i: ("GET", "/weather", {"params": {"location": location(i)}}),
+        "analyze": lambda i: ("POST", "/analyze", {"json": {"image": image}}),
+        "analyze_weather": lambda i: (
+            "POST", "/analyze", {"json": {"image": image, "location": location(i)}}
+        ),
+        # Her istek farklı fotoğraf gönderir; sonuç önbelleği yerine upstream ölçülür
+        "virtual_try_on": lambda i: ("POST", "/virtual-try-on", {"json": {
+            "user_image": base64.b64encode(f"user-{i}".encode()).decode(),
+            "product_image": "cHJvZHVjdA=="
+        }}),
+        "qrcode": lambda i: ("POST", "/qrcode", {"json": {
+            "product_id": catalog_ids[i % len(catalog_ids)], "size": "M", "color": "Black"
+        }}),
+        "qrcode_resolve": lambda i: (
+            "GET", "/qrcode/resolve", {"params": {"token": tokens[i % len(tokens)]}}
+        ),
+    }
+
+async def drive(client: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    timings = []
+    statuses = Counter()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            method, path, kwargs = make_request(i)
+            started = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            timings.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] += 1
+
+    rss_before = rss_mb()
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {
+        "requests": requests,
+        "rps": round(requests / elapsed, 1),
+        "ms_p50": round(float(p50), 2),
+        "ms_p95": round(float(p95), 2),
+        "ms_p99": round(float(p99), 2),
+        "ms_max": round(max(timings), 2),
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "rss_mb": round(rss_mb(), 1),
+        "rss_delta_mb": round(rss_mb() - rss_before, 1)
+    }
+
+async def main_async(args) -> dict:
+    from app.main import app
+    from app.routers.virtual_try_on import kolors_service
+    from app.services.catalog import get_catalog
+    from app.services.openweather import openweather_client
+    from app.services.tryon_cache import DiskLRUStore, TryOnResultCache
+
+    upstreams = Upstreams(args.upstream_latency, args.jitter)
+    await upstreams.start()
+    openweather_client.base_url = upstreams.url
+    kolors_service.api_url = f"{upstreams.url}/kolors"
+    set_redis(fakeredis.aioredis.FakeRedis())
+
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir, \
+         patch("app.services.tryon_cache.tryon_result_cache",
+               TryOnResultCache(DiskLRUStore(cache_dir, 256 * 2 ** 20))), \
+         patch("app.services.rate_limiter.settings.RATE_LIMIT_ENABLED", args.rate_limit):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                catalog_ids = list(get_catalog().ids[:50])
+                factories = build_requests(args, catalog_ids)
+                for route in args.routes:
+                    await drive(client, factories[route], args.warmup, args.concurrency)
+                    results[route] = await drive(client, factories[route], args.requests, args.concurrency)
+    await upstreams.stop()
+    set_redis(None)
+    return {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "upstream_latency_ms": args.upstream_latency,
+            "jitter_ms": args.jitter,
+            "locations": args.locations,
+            "rate_limit": args.rate_limit,
+            "python": platform.python_version(),
+            "machine": platform.machine()
+        },
+        "upstream_calls": dict(upstreams.calls),
+        "routes": results
+    }
+
+def print_report(report: dict, baseline: dict = None) -> None:
+    config = report["config"]
+    print(
+        f"{config['requests']} istek/rota, {config['concurrency']} eşzamanlı, "
+        f"upstream {config['upstream_latency_ms']}±{config['jitter_ms']} ms"
+    )
+    print(f"  {'rota':<16} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'rss MB':>8}  durum")
+    for route, result in report["routes"].items():
+        line = (
+            f"  {route:<16} {result['rps']:>8} {result['ms_p50']:>8} {result['ms_p95']:>8} "
+            f"{result['ms_p99']:>8} {result['rss_mb']:>8}  {result['statuses']}"
+        )
+        previous = (baseline or {}).get("routes", {}).get(route)
+        if previous:
+            rps = (result["rps"] / previous["rps"] - 1) * 100
+            p95 = (result["ms_p95"] / previous["ms_p95"] - 1) * 100
+            line += f"  (rps {rps:+.1f}%, p95 {p95:+.1f}%)"
+        print(line)
+    print(f"  upstream çağrıları: {report['upstream_calls']}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rota bazlı yük benchmark'ı")
+    parser.add_argument("--requests", type=int, default=500, help="Rota başına istek")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--upstream-latency", type=float, default=50.0, help="ms")
+    parser.add_argument("--jitter", type=float, default=10.0, help="ms")
+    parser.add_argument("--locations", type=int, default=50, help="Farklı konum sayısı")
+    parser.add_argument("--routes", nargs="+", default=list(ROUTES), choices=ROUTES)
+    parser.add_argument("--rate-limit", action="store_true", help="Rate limit middleware'i açık kalsın")
+    parser.add_argument("--log-level", default="WARNING", help="Uygulama logger seviyesi")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    # Uygulama logger'ları import sırasında kurulur; seviye sonradan düşürülür
+    import app.main  # noqa: F401
+    for name, logger in logging.root.manager.loggerDict.items():
+        if name.startswith("app") and isinstance(logger, logging.Logger):
+            logger.setLevel(args.log_level)
+
+    report = asyncio.run(main_async(args))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
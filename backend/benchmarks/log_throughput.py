@@ -0,0 +1,127 @@
+"""
+Loglama throughput benchmark'ı.
+
+Birkaç thread aynı anda log yazarken çağıran taraftaki `logger.info`
+süresini ölçer:
+
+- sync: eski yol (her logger'da doğrudan RotatingFileHandler + konsol)
+- queue text / queue json: `NonBlockingQueueHandler` + tek dinleyici thread'i
+- queue sampled: aynı, WARNING altı kayıtların `--sample-rate` oranı
+
+`--disk-latency` dosya yazımına yapay gecikme ekler (yavaş disk, NFS);
+senkron yolda bu gecikme doğrudan isteğe yansır. Konsol çıktısı ölçüme
+karışmasın diye yalnızca dosyaya yazılır.
+
+Kullanım:
+    python -m benchmarks.log_throughput --records 50000 --threads 4 --disk-latency 0.2
+"""
+import argparse
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+import numpy as np
+from app.utils.logger import TEXT_FORMAT, JsonFormatter, LogListener, NonBlockingQueueHandler, SamplingFilter
+
+class SlowFileHandler(RotatingFileHandler):
+    """Her yazımda `latency` ms bekleyen dosya handler'ı."""
+
+    def __init__(self, filename: str, latency_ms: float):
+        super().__init__(filename, maxBytes=10485760, backupCount=2)
+        self.latency = latency_ms / 1000
+
+    def emit(self, record):
+        if self.latency:
+            time.sleep(self.latency)
+        super().emit(record)
+
+def build(mode: str, path: str, args) -> tuple:
+    file_handler = SlowFileHandler(path, args.disk_latency)
+    file_handler.setFormatter(JsonFormatter() if mode == "queue json" else logging.Formatter(TEXT_FORMAT))
+    logger = logging.getLogger(f"bench.{mode.replace(' ', '_')}")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+
+    if mode == "sync":
+        logger.addHandler(file_handler)
+        return logger, None, None
+
+    log_queue = queue.Queue(args.queue_size)
+    handler = NonBlockingQueueHandler(log_queue)
+    if mode == "queue sampled":
+        handler.addFilter(SamplingFilter(args.sample_rate))
+    listener = LogListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    logger.addHandler(handler)
+    return logger, listener, handler
+
+def run(mode: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.log")
+        logger, listener, handler = build(mode, path, args)
+        per_thread = args.records // args.threads
+        timings = [[] for _ in range(args.threads)]
+
+        def worker(samples):
+            for i in range(per_thread):
+                started = time.perf_counter()
+                logger.info("GET %s %d %.3f", "/weather", 200, i / 1000)
+                samples.append((time.perf_counter() - started) * 1e6)
+
+        threads = [threading.Thread(target=worker, args=(samples,)) for samples in timings]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        caller_s = time.perf_counter() - started
+        if listener is not None:
+            listener.stop()
+        drained_s = time.perf_counter() - started
+        for h in logger.handlers:
+            h.close()
+        with open(path, "rb") as f:
+            written = sum(1 for _ in f)
+
+    calls = np.concatenate(timings)
+    return {
+        "mode": mode,
+        "records_per_s": round(len(calls) / caller_s),
+        "us_p50": round(float(np.percentile(calls, 50)), 2),
+        "us_p99": round(float(np.percentile(calls, 99)), 2),
+        "caller_s": round(caller_s, 3),
+        "drained_s": round(drained_s, 3),
+        "written": written,
+        "dropped": handler.dropped if handler is not None else 0
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Loglama throughput benchmark'ı")
+    parser.add_argument("--records", type=int, default=50000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--disk-latency", type=float, default=0.0, help="Yazım başına ms")
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    results = [run(mode, args) for mode in ("sync", "queue text", "queue json", "queue sampled")]
+    print(f"{args.records} kayıt, {args.threads} thread, disk gecikmesi {args.disk_latency} ms")
+    for result in results:
+        print(
+            f"  {result['mode']:<14} {result['records_per_s']:>9} kayıt/sn"
+            f"  p50 {result['us_p50']:>8.2f} µs  p99 {result['us_p99']:>9.2f} µs"
+            f"  yazılan {result['written']:>6}  düşürülen {result['dropped']}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"records": args.records, "threads": args.threads,
+                       "disk_latency_ms": args.disk_latency, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Fotoğraf ön işleme benchmark'ı.
+
+Telefon çözünürlüğünde (varsayılan 12 MP) bir JPEG için iki yolu karşılaştırır:
+
+- naive: tam çözünürlükte çözme + yeniden boyutlandırma + float dönüşümü
+- pipeline: `app.services.preprocessing` (draft çözme + tek geçişli normalizasyon)
+
+Her yol ayrı bir süreçte çalışır; fotoğraf başına süre (ms) ve sürecin
+tepe bellek artışı (MB) raporlanır.
+
+Kullanım:
+    python -m benchmarks.preprocessing --runs 20 --output preprocessing.json
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import resource
+import sys
+import time
+import numpy as np
+from PIL import Image, ImageOps
+
+def make_photo(width: int, height: int) -> bytes:
+    rng = np.random.default_rng(0)
+    # Gürültülü gradyan: sıkıştırma oranı gerçek bir fotoğrafa yakın olsun
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    noise = rng.normal(0, 8, (height, width, 3)).astype(np.float32)
+    pixels = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+def naive(photo: bytes, size: int) -> np.ndarray:
+    mean = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+    std = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+    img = ImageOps.exif_transpose(Image.open(io.BytesIO(photo))).convert("RGB")
+    img = img.resize((size, size), Image.BILINEAR)
+    array = np.asarray(img, dtype=np.float32) / 255.0
+    return ((array - mean) / std).transpose(2, 0, 1)[None]
+
+def pipeline(photo: bytes, size: int) -> np.ndarray:
+    from app.services.preprocessing import load_image, normalize_batch
+    return normalize_batch([load_image(photo, size)])
+
+def reset_peak_rss() -> None:
+    """Linux'ta sürecin tepe RSS değerini (VmHWM) sıfırlar."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run(name: str, photo: bytes, size: int, runs: int, queue) -> None:
+    import app.services.preprocessing  # noqa: F401  import maliyetini ölçüme katma
+
+    func = naive if name == "naive" else pipeline
+    reset_peak_rss()
+    baseline = peak_rss_mb()
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func(photo, size)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    queue.put({
+        "name": name,
+        "ms_per_image": round(float(np.median(timings)), 2),
+        "ms_p95": round(float(np.percentile(timings, 95)), 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "peak_rss_delta_mb": round(peak_rss_mb() - baseline, 1)
+    })
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ön işleme benchmark'ı")
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--size", type=int, default=224)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    photo = make_photo(args.width, args.height)
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for name in ("naive", "pipeline"):
+        queue = context.Queue()
+        process = context.Process(target=run, args=(name, photo, args.size, args.runs, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    report = {
+        "photo": {"width": args.width, "height": args.height, "bytes": len(photo)},
+        "size": args.size,
+        "runs": args.runs,
+        "results": results
+    }
+    print(f"{args.width}x{args.height} JPEG ({len(photo) / 1e6:.1f} MB) -> {args.size}x{args.size}")
+    for result in results:
+        print(
+            f"  {result['name']:<9} {result['ms_per_image']:>8.2f} ms/fotoğraf"
+            f"  p95 {result['ms_p95']:>8.2f} ms"
+            f"  tepe bellek +{result['peak_rss_delta_mb']:.1f} MB"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
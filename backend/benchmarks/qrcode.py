@@ -0,0 +1,80 @@
+"""
+QR kod üretimi benchmark'ı.
+
+Bir koleksiyonun etiketleri (varsayılan 1000 ürün x 3 beden) için:
+
+- naive: eski yol (her çağrıda QRCode + PIL çizimi + PNG + base64)
+- batch cold: `QREngine.render_many`, boş önbellek, süreç havuzu
+- batch warm: aynı liste, önbellekten
+
+Kullanım:
+    python -m benchmarks.qrcode --products 1000 --output qrcode.json
+"""
+import argparse
+import asyncio
+import base64
+import json
+import time
+from io import BytesIO
+import qrcode
+from app.services.qr_generator import QREngine, build_payload
+
+def naive(payload: str) -> str:
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(payload)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffered = BytesIO()
+    img.save(buffered, format="PNG")
+    return f"data:image/png;base64,{base64.b64encode(buffered.getvalue()).decode()}"
+
+async def batched(engine: QREngine, payloads, fmt: str) -> dict:
+    started = time.perf_counter()
+    await engine.render_many(payloads, fmt)
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    await engine.render_many(payloads, fmt)
+    warm = time.perf_counter() - started
+    return {"cold_s": round(cold, 3), "warm_s": round(warm, 4)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="QR kod benchmark'ı")
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--format", default="png", choices=["png", "svg", "matrix"])
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    payloads = [
+        build_payload(f"SKU-{i:06d}", size, "Black")
+        for i in range(args.products)
+        for size in ("S", "M", "L")
+    ]
+
+    started = time.perf_counter()
+    for payload in payloads:
+        naive(payload)
+    naive_s = time.perf_counter() - started
+
+    engine = QREngine(cache_size=len(payloads), box_size=10, workers=args.workers or None)
+    try:
+        result = asyncio.run(batched(engine, payloads, args.format))
+    finally:
+        engine.close()
+
+    report = {"labels": len(payloads), "format": args.format, "naive_s": round(naive_s, 3), **result}
+    print(f"{len(payloads)} etiket ({args.format})")
+    print(f"  naive       {naive_s:8.3f} s")
+    print(f"  batch cold  {result['cold_s']:8.3f} s")
+    print(f"  batch warm  {result['warm_s']:8.4f} s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Rate limiter throughput benchmark'ı.
+
+Aynı istek akışını dört yöntemle çalıştırır:
+
+- pipeline: eski ZREMRANGEBYSCORE/ZCARD/ZADD/EXPIRE pipeline'ı, reddedilen
+  isteklerde kalan hakkı okumak için iki ek round-trip
+- gcra / sliding_window: `RateLimiter` (tek Lua çağrısı)
+- hybrid: `HybridRateLimiter` (yerel token bucket + toplu senkronizasyon)
+
+`--redis-url` verilmezse fakeredis kullanılır; gerçek ağ gecikmesini
+görmek için yerel bir Redis ile çalıştırın.
+
+Kullanım:
+    python -m benchmarks.rate_limiter --requests 20000 --concurrency 50 --redis-url redis://localhost:6379/15
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import numpy as np
+import redis.asyncio as aioredis
+from app.services.rate_limiter import GCRA, SLIDING_WINDOW, HybridRateLimiter, RateLimiter
+from app.utils.redis_client import set_redis
+
+async def legacy_check(client: aioredis.Redis, key: str, limit: int, window: int = 60) -> bool:
+    now = int(time.time())
+    pipe = client.pipeline()
+    pipe.zremrangebyscore(key, 0, now - window)
+    pipe.zcard(key)
+    pipe.zadd(key, {str(now): now})
+    pipe.expire(key, window)
+    _, count, *_ = await pipe.execute()
+    if count > limit:
+        await client.zremrangebyscore(key, 0, now - window)
+        await client.zcard(key)
+        return False
+    return True
+
+async def run(name: str, client: aioredis.Redis, keys, concurrency: int, limit: int) -> dict:
+    await client.flushdb()
+    if name == "pipeline":
+        limiter = None
+    elif name == "hybrid":
+        limiter = HybridRateLimiter(limit=limit, period=60)
+    else:
+        limiter = RateLimiter(name, limit=limit, period=60)
+    queue = list(keys)
+    timings = []
+    rejected = 0
+
+    async def worker():
+        nonlocal rejected
+        while queue:
+            key = queue.pop()
+            started = time.perf_counter()
+            if limiter is None:
+                allowed = await legacy_check(client, f"legacy:{key}", limit)
+            else:
+                allowed = (await limiter.check_rate_limit(key)).allowed
+            timings.append((time.perf_counter() - started) * 1e6)
+            rejected += not allowed
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    if limiter is not None:
+        await limiter.stop()
+    return {
+        "name": name,
+        "checks_per_s": round(len(keys) / elapsed),
+        "us_p50": round(float(np.percentile(timings, 50)), 1),
+        "us_p99": round(float(np.percentile(timings, 99)), 1),
+        "rejected": rejected
+    }
+
+async def main_async(args) -> list:
+    if args.redis_url:
+        client = aioredis.Redis.from_url(args.redis_url)
+    else:
+        import fakeredis
+        client = fakeredis.aioredis.FakeRedis()
+    set_redis(client)
+
+    rng = random.Random(0)
+    # Birkaç sıcak istemci limiti aşar, geri kalanlar limit altında kalır
+    keys = [f"client-{int(rng.paretovariate(1.2)) % args.clients}" for _ in range(args.requests)]
+    results = []
+    for name in ("pipeline", GCRA, SLIDING_WINDOW, "hybrid"):
+        results.append(await run(name, client, keys, args.concurrency, args.limit))
+    await client.flushdb()
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rate limiter benchmark'ı")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=60)
+    parser.add_argument("--redis-url", help="Örn. redis://localhost:6379/15 (verilmezse fakeredis)")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    backend = args.redis_url or "fakeredis"
+    print(f"{args.requests} istek, {args.concurrency} eşzamanlı, {backend}")
+    for result in results:
+        print(
+            f"  {result['name']:<15} {result['checks_per_s']:>8} kontrol/sn"
+            f"  p50 {result['us_p50']:>8.1f} µs  p99 {result['us_p99']:>8.1f} µs"
+            f"  reddedilen {result['rejected']}"
+        )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"backend": backend, "requests": args.requests, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Çok worker'lı sunum ölçekleme benchmark'ı.
+
+Her worker sayısı için `python -m app.serve` ayrı bir süreç olarak
+başlatılır ve `/analyze/upload`'a sabit eşzamanlılıkla JPEG gönderilir
+(çözme, küçültme ve küçük bir TorchScript modelle çıkarım; CPU'ya bağlı
+iş). Throughput, gecikme yüzdelikleri ve sunucu süreçlerinin toplam
+RSS/PSS değerleri raporlanır. PSS paylaşılan sayfaları süreçler arasında
+böldüğünden, model fork'tan önce yüklendiğinde worker başına PSS artışı
+RSS artışından belirgin şekilde düşüktür.
+
+Kullanım:
+    python -m benchmarks.scaling --workers 1 2 4 --concurrency 16 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+import aiohttp
+import numpy as np
+from PIL import Image
+from benchmarks.startup import save_model
+
+def make_jpeg(size=(1024, 1536)) -> bytes:
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 255, (size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(pixels).resize(size).save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+def memory_kb(pid: int) -> dict:
+    """Sürecin ve çocuklarının toplam RSS ve PSS değerleri (kB)."""
+    pids = [pid]
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        pids.extend(int(child) for child in f.read().split())
+    totals = {"rss_kb": 0, "pss_kb": 0}
+    for child in pids:
+        with open(f"/proc/{child}/smaps_rollup") as f:
+            for line in f:
+                name, value = line.split(":", 1)
+                if name in ("Rss", "Pss"):
+                    totals[f"{name.lower()}_kb"] += int(value.split()[0])
+    return totals
+
+async def wait_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(f"{url}/ready") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError("Sunucu hazır olmadı")
+
+async def drive(url: str, image: bytes, concurrency: int, duration: float) -> dict:
+    latencies, statuses = [], {}
+    stop_at = time.monotonic() + duration
+
+    async def client(session):
+        while time.monotonic() < stop_at:
+            form = aiohttp.FormData()
+            form.add_field("image", image, filename="photo.jpg", content_type="image/jpeg")
+            started = time.perf_counter()
+            async with session.post(f"{url}/analyze/upload", data=form) as response:
+                await response.read()
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*[client(session) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "statuses": statuses
+    }
+
+def run(workers: int, args, model_path: str, image: bytes) -> dict:
+    env = {
+        **os.environ,
+        "WORKERS": str(workers),
+        "PORT": str(args.port),
+        "MODEL_PATH": model_path,
+        "RATE_LIMIT_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+        "LOG_FILE": ""
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve"], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(wait_ready(url))
+        # Her worker ısınsın
+        asyncio.run(drive(url, image, args.concurrency, 1.0))
+        result = asyncio.run(drive(url, image, args.concurrency, args.duration))
+        result.update(memory_kb(server.pid))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return {"workers": workers, **result}
+
+def main() -> None:
+    cores = multiprocessing.cpu_count()
+    parser = argparse.ArgumentParser(description="Çok worker'lı sunum ölçekleme benchmark'ı")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, max(1, cores // 2), cores}))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8799)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    image = make_jpeg()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        model_path = os.path.join(directory, "style.pt")
+        save_model(model_path)
+        print(f"{cores} çekirdek, eşzamanlılık {args.concurrency}, {args.duration:g} sn")
+        for workers in args.workers:
+            result = run(workers, args, model_path, image)
+            results.append(result)
+            base = results[0]["rps"]
+            print(
+                f"  {workers:>2} worker  {result['rps']:>7.1f} istek/sn (x{result['rps'] / base:.2f})"
+                f"  p50 {result['p50_ms']:>7.1f} ms  p99 {result['p99_ms']:>7.1f} ms"
+                f"  RSS {result['rss_kb'] / 1024:>6.0f} MB  PSS {result['pss_kb'] / 1024:>6.0f} MB"
+                f"  {result['statuses']}"
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cores": cores, "concurrency": args.concurrency, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
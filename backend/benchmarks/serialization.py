@@ -0,0 +1,124 @@
+"""
+Yanıt serileştirme benchmark'ı.
+
+`AnalyzeResponse` (öneri listesi + hava durumu) ve farklı boyutlarda base64
+sonuç taşıyan `VirtualTryOnResponse` için gövdenin üretilme süresini ve
+tracemalloc ile ölçülen en yüksek bellek kullanımını karşılaştırır:
+
+- fastapi json: varsayılan yol (`serialize_response` ile yeniden doğrulama,
+  `jsonable_encoder`, `json.dumps`)
+- fastapi orjson: aynı yol, `ORJSONResponse` ile
+- model: `ModelResponse` (doğrulamasız, pydantic-core `to_json`)
+- model raw: `ModelResponse`, `result_image` kopyalanmadan ayrı parça olarak
+
+Kullanım:
+    python -m benchmarks.serialization --recommendations 10 --image-mb 2 8
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+import tracemalloc
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+import numpy as np
+from app.schemas import AnalyzeResponse, ProductData, VirtualTryOnResponse, WeatherData
+from app.utils.responses import ModelResponse
+
+def analyze_response(count: int) -> AnalyzeResponse:
+    return AnalyzeResponse(
+        style="casual",
+        recommendations=[
+            ProductData(
+                id=f"prod-{i:05d}",
+                name=f"Ürün {i} — pamuklu tişört",
+                brand="Moda Aynası",
+                category="tops",
+                price=199.9 + i,
+                image_url=f"https://cdn.example.com/products/{i:05d}.jpg",
+                description="Günlük kullanım için rahat kesim, %100 pamuk",
+                sizes=["XS", "S", "M", "L", "XL"],
+                colors=["siyah", "beyaz", "lacivert"]
+            )
+            for i in range(count)
+        ],
+        weather_data=WeatherData(
+            temperature=21.5, description="parçalı bulutlu", humidity=60, wind_speed=3.2, icon="02d"
+        )
+    )
+
+def try_on_response(megabytes: float) -> VirtualTryOnResponse:
+    image = base64.b64encode(os.urandom(int(megabytes * 1024 * 1024 * 3 / 4))).decode()
+    return VirtualTryOnResponse(
+        result_image=image, success=True, result_id="0" * 32, result_url=f"/virtual-try-on/results/{'0' * 32}"
+    )
+
+def renderers(model) -> dict:
+    field = create_response_field(name=f"Response_{type(model).__name__}", type_=type(model))
+
+    def fastapi_path(response_class):
+        def render():
+            content = asyncio.run(serialize_response(field=field, response_content=model))
+            return response_class(content).body
+        return render
+
+    return {
+        "fastapi json": fastapi_path(JSONResponse),
+        "fastapi orjson": fastapi_path(ORJSONResponse),
+        "model": lambda: ModelResponse(model).chunks,
+        "model raw": lambda: ModelResponse(model, raw_fields=("result_image",)).chunks
+    }
+
+def measure(render, repeat: int) -> dict:
+    render()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    body = render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = len(body) if isinstance(body, bytes) else sum(len(chunk) for chunk in body)
+    return {
+        "ms_p50": round(float(np.percentile(timings, 50)) * 1000, 3),
+        "ms_p99": round(float(np.percentile(timings, 99)) * 1000, 3),
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "body_kb": round(size / 1024, 1)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Yanıt serileştirme benchmark'ı")
+    parser.add_argument("--recommendations", type=int, default=10)
+    parser.add_argument("--image-mb", type=float, nargs="+", default=[2.0, 8.0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    cases = {f"AnalyzeResponse ({args.recommendations} ürün)": analyze_response(args.recommendations)}
+    for megabytes in args.image_mb:
+        cases[f"VirtualTryOnResponse ({megabytes:g} MB)"] = try_on_response(megabytes)
+
+    results = []
+    for case, model in cases.items():
+        print(case)
+        for path, render in renderers(model).items():
+            if path == "model raw" and not isinstance(model, VirtualTryOnResponse):
+                continue
+            result = {"case": case, "path": path, **measure(render, args.repeat)}
+            results.append(result)
+            print(
+                f"  {path:<15} p50 {result['ms_p50']:>9.3f} ms  p99 {result['ms_p99']:>9.3f} ms"
+                f"  tepe bellek {result['peak_mb']:>7.2f} MB  gövde {result['body_kb']:>9.1f} KB"
+            )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"repeat": args.repeat, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
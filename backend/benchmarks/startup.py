@@ -0,0 +1,126 @@
+"""
+Soğuk açılış benchmark'ı ve içe aktarma profili.
+
+Her açılış modu (`eager`, `lazy`) için temiz bir Python süreci başlatılır
+ve süreç başından itibaren şunlar ölçülür:
+
+- import: `app.main` içe aktarımı
+- live: lifespan başlangıcı bitip `/health` ilk 200'ü döndüğünde
+- ready: `/ready` ilk 200'ü döndüğünde
+
+Ölçümde küçük bir TorchScript modeli yüklenir ki model ısınması (torch
+içe aktarımı dahil) gerçekçi olsun; Redis yerine fakeredis kullanılır.
+Ardından `python -X importtime` çıktısından en pahalı modüller listelenir.
+
+Kullanım:
+    python -m benchmarks.startup --runs 3 --top 15
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+def probe() -> None:
+    """Alt süreçte çalışır; ölçümleri tek satır JSON olarak yazar."""
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    import fakeredis.aioredis
+    import httpx
+    from app.utils.redis_client import set_redis
+
+    async def run():
+        set_redis(fakeredis.aioredis.FakeRedis())
+        transport = httpx.ASGITransport(app=app)
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                assert (await client.get("/health")).status_code == 200
+                live = time.perf_counter()
+                while (await client.get("/ready")).status_code != 200:
+                    await asyncio.sleep(0.01)
+                return live, time.perf_counter()
+
+    live, ready = asyncio.run(run())
+    print(json.dumps({
+        "import_s": round(imported - started, 3),
+        "live_s": round(live - started, 3),
+        "ready_s": round(ready - started, 3)
+    }))
+
+def save_model(path: str) -> None:
+    import torch
+    from app.services.deepfashion import STYLES
+    model = torch.nn.Sequential(
+        torch.nn.Conv2d(3, 8, kernel_size=3, stride=2),
+        torch.nn.ReLU(),
+        torch.nn.AdaptiveAvgPool2d(1),
+        torch.nn.Flatten(),
+        torch.nn.Linear(8, len(STYLES))
+    ).eval()
+    torch.jit.save(torch.jit.trace(model, torch.zeros(1, 3, 224, 224)), path)
+
+def measure(mode: str, model_path: str) -> dict:
+    env = {**os.environ, "STARTUP_MODE": mode, "MODEL_PATH": model_path, "LOG_LEVEL": "WARNING"}
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--probe"],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def import_profile(top: int) -> list:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env={**os.environ, "LOG_LEVEL": "WARNING"}, capture_output=True, text=True, check=True
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+    # Üçüncü parti paketlerin yalnızca kök modülü, uygulamanın ise tüm modülleri
+    top_level = [m for m in modules if "." not in m["module"] or m["module"].startswith("app.")]
+    return sorted(top_level, key=lambda m: m["cumulative_ms"], reverse=True)[:top]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Soğuk açılış benchmark'ı")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.probe:
+        probe()
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        model_path = os.path.join(directory, "style.pt")
+        save_model(model_path)
+        for mode in ("eager", "lazy"):
+            runs = [measure(mode, model_path) for _ in range(args.runs)]
+            results[mode] = {key: round(min(run[key] for run in runs), 3) for key in runs[0]}
+            print(
+                f"  {mode:<6} import {results[mode]['import_s']:>6.3f} sn"
+                f"  canlı {results[mode]['live_s']:>6.3f} sn  hazır {results[mode]['ready_s']:>6.3f} sn"
+            )
+
+    profile = import_profile(args.top)
+    print(f"En pahalı içe aktarımlar (kümülatif, ilk {args.top}):")
+    for module in profile:
+        print(f"  {module['module']:<40} {module['cumulative_ms']:>9.1f} ms  (kendi {module['self_ms']:.1f} ms)")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"runs": args.runs, "startup": results, "imports": profile}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Gömme dizini benchmark'ı: recall@k'ya karşı sorgu gecikmesi.
+
+Kümelenmiş sentetik gömmeler üzerinde tam aramayı ve farklı `nprobe`
+değerleriyle IVF aramasını karşılaştırır. Recall, tam aramanın ilk `k`
+sonucuna göre hesaplanır. Dizin diske yazılıp memory-mapped açılır;
+ölçümler bu açılmış dizin üzerinde yapılır.
+
+Kullanım:
+    python -m benchmarks.vector_index --count 100000 --dim 128 --output vector_index.json
+"""
+import argparse
+import json
+import tempfile
+import time
+import numpy as np
+from app.services.vector_index import VectorIndex
+
+def make_embeddings(count: int, dim: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    noise = rng.normal(scale=0.5, size=(count, dim)).astype(np.float32)
+    return centers[rng.integers(0, clusters, count)] + noise
+
+def measure(index: VectorIndex, queries: np.ndarray, k: int, nprobe: int, truth) -> dict:
+    timings, hits = [], 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        result = index.search(query, k, nprobe)
+        timings.append((time.perf_counter() - started) * 1000)
+        hits += len(expected & {product_id for product_id, _ in result})
+    return {
+        "recall": round(hits / (k * len(queries)), 4),
+        "ms_p50": round(float(np.percentile(timings, 50)), 3),
+        "ms_p99": round(float(np.percentile(timings, 99)), 3)
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gömme dizini benchmark'ı")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--lists", type=int, default=0, help="IVF liste sayısı (varsayılan: sqrt(count))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    vectors = make_embeddings(args.count, args.dim, args.clusters)
+    ids = [str(i) for i in range(args.count)]
+    queries = make_embeddings(args.queries, args.dim, args.clusters, seed=1)
+    n_lists = args.lists or int(np.sqrt(args.count))
+
+    exact = VectorIndex.build(ids, vectors)
+    started = time.perf_counter()
+    built = VectorIndex.build(ids, vectors, n_lists=n_lists)
+    build_s = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as path:
+        built.save(path)
+        started = time.perf_counter()
+        ivf = VectorIndex.load(path)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        truth = [{product_id for product_id, _ in exact.search(q, args.k)} for q in queries]
+        results = [{"index": "exact", **measure(exact, queries, args.k, 0, truth)}]
+        for nprobe in args.nprobe:
+            results.append({"index": "ivf", "nprobe": nprobe, **measure(ivf, queries, args.k, nprobe, truth)})
+
+    print(
+        f"{args.count} vektör x {args.dim} boyut, {n_lists} IVF listesi"
+        f" (kurulum {build_s:.1f} s, mmap açılış {load_ms:.1f} ms)"
+    )
+    for result in results:
+        name = result["index"] if result["index"] == "exact" else f"ivf/{result['nprobe']}"
+        print(
+            f"  {name:<8} recall@{args.k} {result['recall']:.3f}"
+            f"  p50 {result['ms_p50']:>7.3f} ms  p99 {result['ms_p99']:>7.3f} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "count": args.count,
+                "dim": args.dim,
+                "lists": n_lists,
+                "k": args.k,
+                "build_s": round(build_s, 2),
+                "load_ms": round(load_ms, 2),
+                "results": results
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
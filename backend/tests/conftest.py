@@ -0,0 +1,121 @@
+import asyncio
+import os
+import threading
+import pytest
+import fakeredis.aioredis
+from aiohttp import web
+from unittest.mock import patch
+
+# Uygulama modülleri ayarları içe aktarılırken okur
+os.environ.setdefault("QR_SIGNING_KEY", "test-qr-signing-key")
+
+from app.services.derivatives import create_derivative_service
+from app.services.tryon_cache import DiskLRUStore, TryOnResultCache
+from app.utils.redis_client import set_redis
+
+class StubServer:
+    """Ayrı bir thread'de çalışan yerel aiohttp upstream taklidi."""
+
+    def __init__(self, app: web.Application):
+        self.app = app
+        self.url = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    async def _start(self):
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+@pytest.fixture
+def fake_redis():
+    client = fakeredis.aioredis.FakeRedis()
+    set_redis(client)
+    yield client
+    set_redis(None)
+
+@pytest.fixture(autouse=True)
+def tryon_cache(tmp_path):
+    """Her test için boş, geçici dizinde bir sanal deneme önbelleği."""
+    cache = TryOnResultCache(DiskLRUStore(str(tmp_path / "tryon"), 1024 * 1024))
+    with patch('app.services.tryon_cache.tryon_result_cache', cache):
+        yield cache
+
+@pytest.fixture(autouse=True)
+def derivatives(tmp_path):
+    """Her test için boş, geçici dizinde bir sonuç görseli deposu."""
+    service = create_derivative_service(str(tmp_path / "derivatives"))
+    with patch('app.routers.virtual_try_on.derivative_service', service):
+        yield service
+    service.close()
+
+@pytest.fixture
+def kolors_stub():
+    """Gelen isteği kaydeden ve sabit bir sonuç döndüren Kolors taklidi."""
+    requests = []
+
+    async def try_on(request):
+        payload = await request.json()
+        requests.append(payload)
+        await asyncio.sleep(0.05)
+        if payload.get("user_image") == "fail":
+            return web.json_response({"message": "bad image"}, status=400)
+        return web.json_response({"result_image": "cmVzdWx0"})
+
+    app = web.Application()
+    app.router.add_post("/", try_on)
+    server = StubServer(app).start()
+    server.requests = requests
+    yield server
+    server.stop()
+
+@pytest.fixture
+def flaky_stub():
+    """
+    Hata enjekte edilebilen OpenWeather taklidi.
+
+    `faults` listesindeki (durum, gecikme) çiftleri sırayla gelen isteklere
+    uygulanır; liste bitince istekler 200 ile hemen yanıtlanır.
+    """
+    faults = []
+    requests = []
+
+    async def weather(request):
+        requests.append(dict(request.query))
+        status, delay = faults.pop(0) if faults else (200, 0)
+        if delay:
+            await asyncio.sleep(delay)
+        if status != 200:
+            return web.json_response({"message": "fault"}, status=status)
+        return web.json_response({
+            "main": {"temp": 21.0, "humidity": 50},
+            "wind": {"speed": 2.0},
+            "weather": [{"description": "açık", "icon": "01d"}]
+        })
+
+    app = web.Application()
+    app.router.add_get("/data/2.5/weather", weather)
+    server = StubServer(app).start()
+    server.faults = faults
+    server.requests = requests
+    yield server
+    server.stop()
+
+@pytest.fixture(autouse=True)
+def no_rate_limit():
+    """Rate limit yalnızca onu test eden testlerde açılır."""
+    with patch('app.services.rate_limiter.settings.RATE_LIMIT_ENABLED', False):
+        yield
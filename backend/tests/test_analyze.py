@@ -1,51 +1,43 @@
+import asyncio
+import time
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-from unittest.mock import patch, MagicMock
+from app.schemas import WeatherData
+from app.services.deepfashion import StyleAnalysis
+from app.utils.exceptions import ValidationError
+from unittest.mock import patch, AsyncMock
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from app.utils.uploads import UploadLimitMiddleware
 
 client = TestClient(app)
 
 def test_analyze_image_success():
-    # Mock image data
     test_image = "data:image/jpeg;base64,/9j/4AAQSkZJRg..."
-    
-    # Mock DeepFashionService
-    with patch('app.services.deepfashion.DeepFashionService') as MockDeepFashion:
-        mock_service = MagicMock()
-        mock_service.analyze_image.return_value = [
-            {
-                "id": "1",
-                "name": "Test Product",
-                "type": "shirt",
-                "color": "Blue",
-                "image_url": "https://example.com/test.jpg",
-                "price": 199.99,
-                "brand": "TestBrand",
-                "size": ["M", "L"],
-                "material": "Cotton",
-                "style": "Casual"
-            }
-        ]
-        MockDeepFashion.return_value = mock_service
-        
+
+    with patch('app.routers.analyze.deepfashion.analyze', new=AsyncMock(return_value=StyleAnalysis("casual"))):
         response = client.post(
             "/analyze",
             json={"image": test_image}
         )
-        
+
         assert response.status_code == 200
         data = response.json()
-        assert "suggestions" in data
-        assert len(data["suggestions"]) > 0
-        assert data["suggestions"][0]["name"] == "Test Product"
+        assert data["style"] == "casual"
+        assert len(data["recommendations"]) > 0
+        assert data["recommendations"][0]["name"] == "Casual T-Shirt"
+        assert data["weather_data"] is None
 
 def test_analyze_image_invalid_format():
-    response = client.post(
-        "/analyze",
-        json={"image": "invalid_base64"}
-    )
-    assert response.status_code == 400
-    assert "detail" in response.json()
+    with patch('app.routers.analyze.deepfashion.analyze', new=AsyncMock(side_effect=ValidationError("Geçersiz fotoğraf"))):
+        response = client.post(
+            "/analyze",
+            json={"image": "invalid_base64"}
+        )
+        assert response.status_code == 400
+        assert "detail" in response.json()
 
 def test_analyze_image_missing_data():
     response = client.post(
@@ -56,16 +48,99 @@ def test_analyze_image_missing_data():
 
 def test_analyze_image_service_error():
     test_image = "data:image/jpeg;base64,/9j/4AAQSkZJRg..."
-    
-    with patch('app.services.deepfashion.DeepFashionService') as MockDeepFashion:
-        mock_service = MagicMock()
-        mock_service.analyze_image.side_effect = Exception("Service error")
-        MockDeepFashion.return_value = mock_service
-        
+
+    with patch('app.routers.analyze.deepfashion.analyze', new=AsyncMock(side_effect=Exception("Service error"))):
         response = client.post(
             "/analyze",
             json={"image": test_image}
         )
-        
+
         assert response.status_code == 500
         assert "detail" in response.json()
+
+def test_analyze_upload_multipart():
+    response = client.post(
+        "/analyze/upload",
+        files={"image": ("selfie.jpg", b"\xff\xd8\xff\xe0fake-jpeg", "image/jpeg")}
+    )
+    assert response.status_code == 200
+    assert response.json()["style"]
+
+def test_analyze_upload_too_large():
+    with patch('app.main.settings.UPLOAD_MAX_BYTES', 10):
+        big = b"\xff\xd8\xff" + b"0" * (200 * 1024)
+        response = client.post(
+            "/analyze/upload",
+            files={"image": ("selfie.jpg", big, "image/jpeg")}
+        )
+    assert response.status_code == 413
+
+def test_upload_limit_rejects_before_parsing():
+    parsed = []
+
+    async def endpoint(request):
+        parsed.append(await request.body())
+        return PlainTextResponse("ok")
+
+    limited = UploadLimitMiddleware(
+        Starlette(routes=[Route("/upload", endpoint, methods=["POST"])]),
+        limits={"/upload": 10}
+    )
+    limited_client = TestClient(limited)
+
+    assert limited_client.post("/upload", content=b"0" * 100).status_code == 413
+    # Content-Length olmadan (chunked) gelen gövde de kesilir
+    assert limited_client.post("/upload", content=iter([b"0" * 8, b"0" * 8])).status_code == 413
+    assert limited_client.post("/upload", content=b"0" * 5, headers={"Content-Length": "abc"}).status_code == 400
+    assert parsed == []
+    assert limited_client.post("/upload", content=b"0" * 5).status_code == 200
+
+def _slow(result, delay):
+    async def stage(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return result
+    return stage
+
+def test_weather_runs_concurrently_with_style_analysis():
+    weather = WeatherData(temperature=20.0, description="clear", humidity=40, wind_speed=3.0, icon="01d")
+    with patch('app.routers.analyze.deepfashion.analyze', _slow(StyleAnalysis("casual"), 0.3)), \
+         patch('app.routers.analyze.get_weather', _slow(weather, 0.3)), \
+         patch('app.routers.analyze.settings.SERVER_TIMING_ENABLED', True):
+        started = time.perf_counter()
+        response = client.post("/analyze", json={"image": "x", "location": "Istanbul"})
+        elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert response.json()["weather_data"]["temperature"] == 20.0
+    assert elapsed < 0.55
+    timing = response.headers["Server-Timing"]
+    assert "style;dur=" in timing and "weather;dur=" in timing and "total;dur=" in timing
+
+def test_slow_weather_degrades_to_none():
+    with patch('app.routers.analyze.deepfashion.analyze', _slow(StyleAnalysis("casual"), 0)), \
+         patch('app.routers.analyze.get_weather', _slow(None, 5)), \
+         patch('app.routers.analyze.settings.ANALYZE_WEATHER_TIMEOUT', 0.1), \
+         patch('app.routers.analyze.settings.SERVER_TIMING_ENABLED', True):
+        started = time.perf_counter()
+        response = client.post("/analyze", json={"image": "x", "location": "Istanbul"})
+        elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    assert response.json()["weather_data"] is None
+    assert elapsed < 1
+    assert 'weather;dur=' in response.headers["Server-Timing"]
+    assert 'desc="timeout"' in response.headers["Server-Timing"]
+
+def test_server_timing_is_off_by_default():
+    with patch('app.routers.analyze.deepfashion.analyze', _slow(StyleAnalysis("casual"), 0)):
+        response = client.post("/analyze", json={"image": "x"})
+
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+
+def test_style_deadline_returns_504():
+    with patch('app.routers.analyze.deepfashion.analyze', _slow(StyleAnalysis("casual"), 5)), \
+         patch('app.routers.analyze.settings.ANALYZE_STYLE_TIMEOUT', 0.1):
+        response = client.post("/analyze", json={"image": "x"})
+
+    assert response.status_code == 504
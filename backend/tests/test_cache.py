@@ -0,0 +1,102 @@
+import asyncio
+from app.services.cache import TwoTierCache
+from app.utils.resilience import DeadlineExceeded, deadline, remaining
+
+def test_concurrent_misses_are_coalesced(fake_redis):
+    cache = TwoTierCache("test", ttl=60)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return [41.0, 29.0]
+
+    async def run():
+        return await asyncio.gather(*[
+            cache.get_or_load("istanbul", loader) for _ in range(500)
+        ])
+
+    results = asyncio.run(run())
+
+    assert calls == 1
+    assert all(r == [41.0, 29.0] for r in results)
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 499
+
+def test_redis_tier_shared_between_instances(fake_redis):
+    first = TwoTierCache("test", ttl=60)
+    second = TwoTierCache("test", ttl=60)
+
+    async def loader():
+        return {"temp": 20}
+
+    async def run():
+        await first.get_or_load("k", loader)
+        return await second.get_or_load("k", loader)
+
+    assert asyncio.run(run()) == {"temp": 20}
+    assert second.stats()["redis_hits"] == 1
+    assert second.stats()["misses"] == 0
+
+def test_local_tier_without_redis():
+    cache = TwoTierCache("test", ttl=60, use_redis=False)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return None
+
+    async def run():
+        await cache.get_or_load("nowhere", loader)
+        return await cache.get_or_load("nowhere", loader)
+
+    assert asyncio.run(run()) is None
+    assert calls == 1
+    assert cache.stats()["local_hits"] == 1
+
+def test_empty_results_use_negative_ttl(fake_redis):
+    cache = TwoTierCache("test", ttl=3600, negative_ttl=60)
+
+    async def missing():
+        return None
+
+    async def found():
+        return [39.9, 32.8]
+
+    async def run():
+        await cache.get_or_load("nowhere", missing)
+        await cache.get_or_load("ankara", found)
+        return await fake_redis.ttl("cache:test:nowhere"), await fake_redis.ttl("cache:test:ankara")
+
+    negative, positive = asyncio.run(run())
+
+    assert 0 < negative <= 60
+    assert positive > 60
+
+def test_coalesced_load_outlives_first_callers_deadline(fake_redis):
+    cache = TwoTierCache("test", ttl=60)
+    seen = []
+
+    async def loader():
+        # Paylaşılan yükleme ilk çağıranın son anını görmemeli
+        seen.append(remaining())
+        await asyncio.sleep(0.1)
+        return {"temp": 20}
+
+    async def impatient():
+        with deadline(0.02):
+            return await cache.get_or_load("ankara", loader)
+
+    async def run():
+        return await asyncio.gather(
+            impatient(), cache.get_or_load("ankara", loader), return_exceptions=True
+        )
+
+    short, patient = asyncio.run(run())
+
+    assert isinstance(short, DeadlineExceeded)
+    assert patient == {"temp": 20}
+    assert seen == [None]
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import pytest
+from app.services import deepfashion
+from app.services import catalog as catalog_module
+from app.services.catalog import ProductCatalog
+from app.services.qr_generator import build_payload, resolve_payload
+
+PRODUCTS = [
+    {"id": "a", "name": "Tee", "brand": "B", "category": "T-Shirts", "price": 20.0,
+     "image_url": "https://example.com/a.jpg", "sizes": ["S", "M"], "colors": ["White"],
+     "styles": ["casual"], "popularity": 1},
+    {"id": "b", "name": "Jeans", "brand": "B", "category": "Jeans", "price": 60.0,
+     "image_url": "https://example.com/b.jpg", "sizes": ["32"], "colors": ["Blue"],
+     "styles": ["casual"], "popularity": 5},
+    {"id": "c", "name": "Blazer", "brand": "B", "category": "Blazers", "price": 150.0,
+     "image_url": "https://example.com/c.jpg", "sizes": ["M", "L"], "colors": ["Navy"],
+     "styles": ["formal", "Casual"], "popularity": 3},
+]
+
+@pytest.fixture
+def catalog():
+    return ProductCatalog(PRODUCTS)
+
+def ids(products):
+    return [product.id for product in products]
+
+def test_style_index_is_ranked_by_popularity(catalog):
+    assert ids(catalog.recommend("casual")) == ["b", "c", "a"]
+    assert ids(catalog.recommend("FORMAL")) == ["c"]
+
+def test_filters(catalog):
+    assert ids(catalog.recommend("casual", size="m")) == ["c", "a"]
+    assert ids(catalog.recommend("casual", color="blue")) == ["b"]
+    assert ids(catalog.recommend("casual", category="t-shirts")) == ["a"]
+    assert ids(catalog.recommend("casual", min_price=50, max_price=100)) == ["b"]
+    assert ids(catalog.recommend("casual", size="M", max_price=100)) == ["a"]
+    assert catalog.recommend("casual", category="Hats") == ()
+    assert catalog.recommend("casual", color="Purple") == ()
+
+def test_limit_and_unknown_style(catalog):
+    assert ids(catalog.recommend("casual", limit=1)) == ["b"]
+    # Bilinmeyen stil genel popülerlik sırasına düşer
+    assert ids(catalog.recommend("vintage")) == ["b", "c", "a"]
+
+def test_hot_queries_are_cached(catalog):
+    first = catalog.recommend("casual", size="M")
+    second = catalog.recommend("casual", size="M")
+
+    assert first is second
+    assert catalog.recommend.cache_info().hits == 1
+
+def test_filter_scan_stops_at_limit(monkeypatch):
+    monkeypatch.setattr(ProductCatalog, "SCAN_CHUNK", 2)
+    products = [
+        dict(PRODUCTS[0], id=str(i), popularity=-i, sizes=["M"] if i % 3 == 0 else ["S"])
+        for i in range(20)
+    ]
+    catalog = ProductCatalog(products)
+
+    assert ids(catalog.recommend("casual", size="m", limit=4)) == ["0", "3", "6", "9"]
+
+def test_get_by_id(catalog):
+    product = catalog.get("c")
+
+    assert product.name == "Blazer"
+    assert product.category == "Blazers"
+    assert product.sizes == ["M", "L"]
+    assert catalog.get("missing") is None
+
+def test_invalid_product_is_rejected():
+    with pytest.raises(ValueError):
+        ProductCatalog([{"id": "x", "name": "No price"}])
+
+def test_load_jsonl_and_sqlite(tmp_path):
+    jsonl = tmp_path / "catalog.jsonl"
+    jsonl.write_text("\n".join(json.dumps(product) for product in PRODUCTS) + "\n")
+
+    db = tmp_path / "catalog.db"
+    connection = sqlite3.connect(db)
+    connection.execute(
+        "CREATE TABLE products (id TEXT, name TEXT, brand TEXT, category TEXT, price REAL,"
+        " image_url TEXT, description TEXT, sizes TEXT, colors TEXT, styles TEXT, popularity REAL)"
+    )
+    for p in PRODUCTS:
+        connection.execute(
+            "INSERT INTO products VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (p["id"], p["name"], p["brand"], p["category"], p["price"], p["image_url"], None,
+             json.dumps(p["sizes"]), json.dumps(p["colors"]), json.dumps(p["styles"]), p["popularity"])
+        )
+    connection.commit()
+    connection.close()
+
+    for path in (jsonl, db):
+        loaded = ProductCatalog.from_path(str(path))
+        assert loaded.size == 3
+        assert ids(loaded.recommend("casual", color="White")) == ["a"]
+
+def test_missing_file_falls_back_to_samples(tmp_path):
+    loaded = ProductCatalog.from_path(str(tmp_path / "missing.jsonl"))
+
+    assert loaded.size == len(catalog_module.SAMPLE_PRODUCTS)
+
+def test_get_recommendations_uses_shared_catalog(monkeypatch, catalog):
+    monkeypatch.setattr(catalog_module, "_catalog", catalog)
+
+    recommendations = deepfashion.get_recommendations("casual", size="M", limit=5)
+
+    assert ids(recommendations) == ["c", "a"]
+
+def test_qr_resolve_does_not_cache_missing_products(monkeypatch, catalog):
+    token = build_payload("d")
+    monkeypatch.setattr(catalog_module, "_catalog", catalog)
+    _, missing = asyncio.run(resolve_payload(token))
+
+    added = {**PRODUCTS[0], "id": "d", "name": "Hoodie"}
+    monkeypatch.setattr(catalog_module, "_catalog", ProductCatalog([*PRODUCTS, added]))
+    _, found = asyncio.run(resolve_payload(token))
+
+    assert missing is None
+    assert found.name == "Hoodie"
+
+def test_async_recommend_loads_catalog_off_loop(monkeypatch, catalog):
+    monkeypatch.setattr(catalog_module, "_catalog", None)
+    monkeypatch.setattr(catalog_module.ProductCatalog, "from_path", classmethod(lambda cls, path: catalog))
+
+    async def run():
+        loop_thread = threading.get_ident()
+        loaded_in = []
+        real = catalog_module.get_catalog
+
+        def tracked():
+            loaded_in.append(threading.get_ident())
+            return real()
+
+        monkeypatch.setattr(catalog_module, "get_catalog", tracked)
+        recommendations = await deepfashion.recommend("casual", size="M", limit=5)
+        return recommendations, loaded_in, loop_thread
+
+    recommendations, loaded_in, loop_thread = asyncio.run(run())
+
+    assert ids(recommendations) == ["c", "a"]
+    assert loaded_in and loaded_in[0] != loop_thread
+
+def test_async_recommend_searches_off_loop(monkeypatch, catalog):
+    monkeypatch.setattr(catalog_module, "_catalog", catalog)
+    searched_in = []
+    real = deepfashion.get_recommendations
+
+    def tracked(*args, **kwargs):
+        searched_in.append(threading.get_ident())
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(deepfashion, "get_recommendations", tracked)
+
+    async def run():
+        return await deepfashion.recommend("casual", size="M", limit=5), threading.get_ident()
+
+    recommendations, loop_thread = asyncio.run(run())
+
+    assert ids(recommendations) == ["c", "a"]
+    assert searched_in and searched_in[0] != loop_thread
@@ -0,0 +1,82 @@
+import asyncio
+import io
+import pytest
+from PIL import Image
+from app.services.deepfashion import DeepFashionService, STYLES
+from app.utils.exceptions import ValidationError
+
+torch = pytest.importorskip("torch")
+
+def make_jpeg(color, size=(64, 96)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+def tiny_model():
+    torch.manual_seed(0)
+    return torch.nn.Sequential(
+        torch.nn.Conv2d(3, 4, kernel_size=3, stride=4),
+        torch.nn.AdaptiveAvgPool2d(1),
+        torch.nn.Flatten(),
+        torch.nn.Linear(4, len(STYLES))
+    )
+
+def test_concurrent_requests_are_micro_batched():
+    service = DeepFashionService(model=tiny_model(), input_size=32, max_batch_size=8, max_wait_ms=50)
+    images = [make_jpeg((i * 30, 100, 200)) for i in range(8)]
+
+    async def run():
+        return await asyncio.gather(*[service.analyze_style(image) for image in images])
+
+    styles = asyncio.run(run())
+
+    assert all(style in STYLES for style in styles)
+    stats = service.stats()
+    assert stats["items"] == 8
+    assert stats["batches"] < 8
+    assert stats["last_batch_ms"] > 0
+
+def test_batched_results_match_sequential_inference():
+    service = DeepFashionService(model=tiny_model(), input_size=32, max_batch_size=8, max_wait_ms=50)
+    images = [make_jpeg((i * 60, 255 - i * 40, 30)) for i in range(5)]
+
+    async def batched():
+        return await asyncio.gather(*[service.analyze_style(image) for image in images])
+
+    async def sequential():
+        return [await service.analyze_style(image) for image in images]
+
+    assert asyncio.run(batched()) == asyncio.run(sequential())
+
+def test_invalid_image_raises_validation_error():
+    service = DeepFashionService(model=tiny_model(), input_size=32)
+    with pytest.raises(ValidationError):
+        asyncio.run(service.analyze_style("invalid_base64"))
+
+def test_without_model_returns_default_style(tmp_path):
+    service = DeepFashionService(model_path=str(tmp_path / "missing.pt"))
+    service.load()
+    assert not service.ready
+    assert asyncio.run(service.analyze_style(make_jpeg((0, 0, 0)))) == "casual"
+
+def test_analyze_returns_normalized_embedding():
+    service = DeepFashionService(model=tiny_model(), input_size=32)
+
+    result = asyncio.run(service.analyze(make_jpeg((200, 10, 10))))
+
+    assert result.style in STYLES
+    assert result.embedding.shape == (len(STYLES),)
+    assert abs(float((result.embedding ** 2).sum()) - 1.0) < 1e-5
+
+def test_preloaded_weights_are_warmed_separately(tmp_path):
+    path = tmp_path / "style.pt"
+    torch.save(tiny_model(), path)
+    service = DeepFashionService(model_path=str(path), input_size=32)
+
+    # Fork'tan önce: yalnızca ağırlıklar (mmap), forward pass yok
+    service.load(warm=False)
+    assert service.ready and not service._warm
+
+    service.load()
+    assert service._warm
+    assert asyncio.run(service.analyze_style(make_jpeg((10, 200, 10)))) in STYLES
@@ -0,0 +1,94 @@
+import asyncio
+import base64
+from email.utils import formatdate
+from io import BytesIO
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from unittest.mock import patch, AsyncMock
+from app.main import app
+from app.services.derivatives import derivative_service
+from app.utils.exceptions import ValidationError
+
+client = TestClient(app)
+
+def result_image(size=(1600, 1200)) -> str:
+    buffer = BytesIO()
+    Image.new("RGB", size, (200, 40, 90)).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+@pytest.fixture
+def stored_result():
+    image = result_image()
+    with patch('app.routers.virtual_try_on.kolors_service.try_on', new=AsyncMock(return_value=image)):
+        response = client.post(
+            "/virtual-try-on",
+            json={"user_image": "dXNlcg==", "product_image": "cHJvZHVjdA==", "inline": False}
+        )
+    assert response.status_code == 200
+    return response.json()
+
+def test_try_on_returns_result_url_instead_of_inline_image(stored_result):
+    assert stored_result["success"]
+    assert stored_result["result_image"] == ""
+    assert stored_result["result_url"] == f"/virtual-try-on/results/{stored_result['result_id']}"
+
+def test_variant_is_resized_and_cached(stored_result, derivatives):
+    url = stored_result["result_url"]
+    first = client.get(url, params={"width": 320, "format": "webp"})
+    second = client.get(url, params={"width": 320, "format": "webp"})
+
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "image/webp"
+    assert first.content == second.content
+    assert Image.open(BytesIO(first.content)).size == (320, 240)
+    assert derivatives.stats()["misses"] == 1
+    assert derivatives.stats()["hits"] == 1
+
+def test_format_follows_accept_header(stored_result):
+    url = stored_result["result_url"]
+    webp = client.get(url, headers={"Accept": "image/webp,image/*"})
+    jpeg = client.get(url, headers={"Accept": "image/*"})
+
+    assert webp.headers["content-type"] == "image/webp"
+    assert jpeg.headers["content-type"] == "image/jpeg"
+    assert Image.open(BytesIO(jpeg.content)).width == 640
+
+def test_conditional_requests_return_304(stored_result, derivatives):
+    url = stored_result["result_url"]
+    response = client.get(url, params={"width": 640, "format": "jpeg"})
+    etag = response.headers["etag"]
+    assert "last-modified" in response.headers
+
+    by_etag = client.get(url, params={"width": 640, "format": "jpeg"}, headers={"If-None-Match": f"W/{etag}"})
+    by_date = client.get(
+        url,
+        params={"width": 640, "format": "jpeg"},
+        headers={"If-Modified-Since": formatdate(usegmt=True)}
+    )
+    other_size = client.get(url, params={"width": 320, "format": "jpeg"}, headers={"If-None-Match": etag})
+    wildcard = client.get(url, params={"width": 640, "format": "jpeg"}, headers={"If-None-Match": "*"})
+
+    assert by_etag.status_code == 304 and by_etag.content == b""
+    assert by_etag.headers["etag"] == etag
+    assert by_date.status_code == 304
+    assert wildcard.status_code == 304
+    assert other_size.status_code == 200
+    # 304'ler türevi okumaz ya da üretmez
+    assert derivatives.stats()["misses"] == 2
+
+def test_invalid_requests():
+    missing = client.get(f"/virtual-try-on/results/{'0' * 32}")
+    bad_width = client.get(f"/virtual-try-on/results/{'0' * 32}", params={"width": 333})
+    bad_id = client.get("/virtual-try-on/results/..%2F..%2Fetc")
+
+    wildcard = client.get(f"/virtual-try-on/results/{'0' * 32}", headers={"If-None-Match": "*"})
+
+    assert missing.status_code == 404
+    assert wildcard.status_code == 404
+    assert bad_width.status_code == 400
+    assert bad_id.status_code in (400, 404)
+
+def test_undecodable_result_is_a_validation_error():
+    with pytest.raises(ValidationError):
+        asyncio.run(derivative_service.save("not base64!"))
@@ -0,0 +1,168 @@
+import asyncio
+import httpx
+import redis
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from unittest.mock import patch, AsyncMock
+from app.main import app as main_app
+from app.services.idempotency import IdempotencyMiddleware, IdempotencyStore, idempotency_store
+
+def middleware(inner):
+    # Her test kendi deposuyla başlar (önceki testlerin Redis hataları taşınmaz)
+    return IdempotencyMiddleware(inner, ["/analyze"], IdempotencyStore())
+
+def counting_app(delay: float = 0.0, statuses=()):
+    calls = []
+    statuses = list(statuses)
+
+    async def endpoint(request):
+        body = await request.body()
+        calls.append(body)
+        await asyncio.sleep(delay)
+        status = statuses.pop(0) if statuses else 200
+        return JSONResponse(
+            {"call": len(calls), "accept": request.headers.get("accept")},
+            status_code=status,
+            headers={"Server-Timing": f"total;dur={len(calls)}"}
+        )
+
+    inner = Starlette(routes=[Route("/analyze", endpoint, methods=["POST"])])
+    return inner, calls
+
+def run(app, *requests):
+    """İstekleri aynı event loop'ta eşzamanlı gönderir."""
+    async def send_all():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            results = []
+            for batch in requests:
+                results.extend(await asyncio.gather(*[client.post("/analyze", **kwargs) for kwargs in batch]))
+            return results
+
+    return asyncio.run(send_all())
+
+def test_completed_response_is_replayed(fake_redis):
+    inner, calls = counting_app()
+    request = {"json": {"image": "abc"}, "headers": {"Idempotency-Key": "k-1"}}
+    first, second = run(middleware(inner), [request], [request])
+
+    assert len(calls) == 1
+    assert first.json() == second.json()
+    assert "idempotent-replayed" not in first.headers
+    assert second.headers["idempotent-replayed"] == "true"
+    assert "server-timing" not in second.headers
+
+def test_requests_without_key_are_deduplicated_by_payload(fake_redis):
+    inner, calls = counting_app()
+    request = {"json": {"image": "abc"}}
+    first, second = run(middleware(inner), [request], [request])
+
+    assert len(calls) == 1
+    assert second.headers["idempotent-replayed"] == "true"
+
+def test_large_bodies_without_key_are_streamed(fake_redis):
+    inner, calls = counting_app()
+    small_store = IdempotencyMiddleware(inner, ["/analyze"], IdempotencyStore(max_bytes=16))
+    large = {"json": {"image": "x" * 64}}
+    async def chunks():
+        yield b"x" * 12
+        yield b"x" * 12
+
+    chunked = {"content": chunks()}
+    first, second, streamed = run(small_store, [large], [large], [chunked])
+
+    assert len(calls) == 3
+    assert calls[2] == b"x" * 24
+    assert "idempotent-replayed" not in second.headers
+
+def test_key_is_scoped_by_accept(fake_redis):
+    inner, calls = counting_app()
+    headers = {"Idempotency-Key": "k-3"}
+    as_json, as_image = run(
+        middleware(inner),
+        [{"json": {"image": "abc"}, "headers": {**headers, "Accept": "application/json"}}],
+        [{"json": {"image": "abc"}, "headers": {**headers, "Accept": "image/png"}}]
+    )
+
+    assert len(calls) == 2
+    assert as_image.json()["accept"] == "image/png"
+
+def test_payload_digest_ignores_multipart_boundary(fake_redis):
+    inner, calls = counting_app()
+    files = {"image": ("photo.jpg", b"\xff\xd8jpeg", "image/jpeg")}
+    headers = {"Idempotency-Key": "k-4"}
+    # httpx her istekte yeni bir sınır üretir
+    first, second, other = run(
+        middleware(inner),
+        [{"files": files, "headers": headers}], [{"files": files, "headers": headers}],
+        [{"files": {"image": ("photo.jpg", b"other", "image/jpeg")}, "headers": headers}]
+    )
+
+    assert second.headers["idempotent-replayed"] == "true"
+    assert other.status_code == 422
+    assert len(calls) == 1
+
+def test_in_flight_duplicates_attach(fake_redis):
+    inner, calls = counting_app(delay=0.2)
+    request = {"json": {"image": "abc"}, "headers": {"Idempotency-Key": "k-5"}}
+    responses = run(middleware(inner), [request] * 3)
+
+    assert len(calls) == 1
+    assert [response.json()["call"] for response in responses] == [1] * 3
+
+def test_duplicates_on_another_worker_wait_for_result(fake_redis):
+    inner, calls = counting_app(delay=0.3)
+    workers = [middleware(inner) for _ in range(2)]
+
+    async def main():
+        async def post(worker):
+            transport = httpx.ASGITransport(app=worker)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/analyze", json={"image": "abc"}, headers={"Idempotency-Key": "k-6"})
+        return await asyncio.gather(*[post(worker) for worker in workers])
+
+    first, second = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert first.json() == second.json()
+
+def test_reused_key_with_different_payload_is_rejected(fake_redis):
+    inner, calls = counting_app()
+    _, reused = run(
+        middleware(inner),
+        [{"json": {"image": "a"}, "headers": {"Idempotency-Key": "k-2"}}],
+        [{"json": {"image": "b"}, "headers": {"Idempotency-Key": "k-2"}}]
+    )
+
+    assert reused.status_code == 422
+    assert len(calls) == 1
+
+def test_server_errors_are_not_stored(fake_redis):
+    inner, calls = counting_app(statuses=[503])
+    request = {"json": {"image": "abc"}, "headers": {"Idempotency-Key": "k-7"}}
+    failed, retried = run(middleware(inner), [request], [request])
+
+    assert failed.status_code == 503 and retried.status_code == 200
+    assert len(calls) == 2
+
+def test_fails_open_when_redis_is_down(fake_redis):
+    inner, calls = counting_app()
+    request = {"json": {"image": "abc"}, "headers": {"Idempotency-Key": "k-8"}}
+    with patch.object(fake_redis, "hgetall", side_effect=redis.ConnectionError("down")):
+        responses = run(middleware(inner), [request], [request])
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert len(calls) == 2
+
+def test_analyze_retry_does_not_rerun_analysis(fake_redis):
+    analyze = AsyncMock(return_value=("casual", None))
+    with patch('app.routers.analyze.deepfashion.analyze', new=analyze), \
+            patch('app.services.rate_limiter.settings.RATE_LIMIT_ENABLED', False), \
+            patch.object(idempotency_store, "_disabled_until", 0.0):
+        request = {"json": {"image": "aW1hZ2U="}, "headers": {"Idempotency-Key": "k-9"}}
+        first, second = run(main_app, [request], [request])
+
+    assert analyze.await_count == 1
+    assert first.json() == second.json()
+    assert second.headers["idempotent-replayed"] == "true"
@@ -0,0 +1,39 @@
+import json
+import logging
+import queue
+from app.utils.logger import JsonFormatter, NonBlockingQueueHandler, SamplingFilter
+
+def make_record(level=logging.INFO, msg="istek %s", args=("ok",), **extra):
+    record = logging.LogRecord("app.test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_includes_extra_fields():
+    line = JsonFormatter().format(make_record(route="/analyze", sample_rate=0.5))
+    entry = json.loads(line)
+
+    assert entry["message"] == "istek ok"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "app.test"
+    assert entry["route"] == "/analyze"
+    assert "sample_rate" not in entry
+
+def test_sampling_keeps_warnings():
+    sampler = SamplingFilter(0.0)
+    assert not sampler.filter(make_record(logging.INFO))
+    assert sampler.filter(make_record(logging.WARNING))
+    # Kayıt bazında oran filtrenin varsayılanını ezer
+    assert sampler.filter(make_record(logging.INFO, sample_rate=1.0))
+
+def test_queue_handler_defers_formatting_and_drops_when_full():
+    log_queue = queue.Queue(1)
+    handler = NonBlockingQueueHandler(log_queue)
+
+    handler.handle(make_record())
+    handler.handle(make_record())
+
+    record = log_queue.get_nowait()
+    # Mesaj dinleyici thread'inde biçimlendirilir
+    assert record.msg == "istek %s"
+    assert record.args == ("ok",)
+    assert handler.dropped == 1
@@ -0,0 +1,64 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from unittest.mock import patch, AsyncMock
+from app.main import app
+from app.services.cache import TwoTierCache
+from app.utils.metrics import observe_upstream
+
+client = TestClient(app)
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def test_requests_are_labelled_by_route_template():
+    before = sample("http_requests_total", method="GET", route="/virtual-try-on/{job_id}", status="404")
+    with patch('app.routers.virtual_try_on.job_queue.store.get', new=AsyncMock(return_value=None)):
+        client.get("/virtual-try-on/abc123")
+        client.get("/virtual-try-on/def456")
+
+    after = sample("http_requests_total", method="GET", route="/virtual-try-on/{job_id}", status="404")
+    assert after - before == 2
+    assert sample("http_requests_in_flight", method="GET", route="/virtual-try-on/{job_id}") == 0
+
+def test_unknown_paths_share_one_label():
+    before = sample("http_requests_total", method="GET", route="<unmatched>", status="404")
+    client.get("/does-not-exist/1")
+    client.get("/does-not-exist/2")
+    assert sample("http_requests_total", method="GET", route="<unmatched>", status="404") - before == 2
+
+def test_metrics_endpoint_exposes_histograms():
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/health"}' in response.text
+    # /metrics kendi isteklerini saymaz
+    assert 'route="/metrics"' not in response.text
+
+def test_observe_upstream_records_outcome():
+    before_ok = sample("upstream_request_duration_seconds_count", upstream="test", outcome="ok")
+    before_error = sample("upstream_request_duration_seconds_count", upstream="test", outcome="error")
+
+    with observe_upstream("test"):
+        pass
+    with pytest.raises(RuntimeError):
+        with observe_upstream("test"):
+            raise RuntimeError("boom")
+
+    assert sample("upstream_request_duration_seconds_count", upstream="test", outcome="ok") - before_ok == 1
+    assert sample("upstream_request_duration_seconds_count", upstream="test", outcome="error") - before_error == 1
+
+def test_cache_lookups_are_counted(fake_redis):
+    cache = TwoTierCache("metrics-test", ttl=60)
+
+    async def run():
+        loader = AsyncMock(return_value=1)
+        await cache.get_or_load("k", loader)
+        await cache.get_or_load("k", loader)
+
+    asyncio.run(run())
+    assert sample("cache_lookups_total", cache="metrics-test", result="miss") == 1
+    assert sample("cache_lookups_total", cache="metrics-test", result="local_hit") == 1
@@ -0,0 +1,59 @@
+import base64
+import io
+import numpy as np
+import pytest
+from PIL import Image
+from app.services.preprocessing import MEAN, STD, load_image, normalize_batch
+from app.utils.exceptions import ValidationError
+
+def encode(img: Image.Image, fmt: str = "JPEG", **kwargs) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, **kwargs)
+    return buffer.getvalue()
+
+def test_large_jpeg_is_decoded_at_target_size():
+    photo = encode(Image.new("RGB", (4000, 3000), (200, 50, 50)))
+
+    pixels = load_image(photo, 224)
+
+    assert pixels.shape == (224, 224, 3)
+    assert pixels.dtype == np.uint8
+    assert abs(int(pixels[112, 112, 0]) - 200) <= 3
+
+def test_exif_orientation_is_applied():
+    # Sol yarısı kırmızı yatay fotoğraf, EXIF ile 90° döndürülmüş olarak işaretli
+    img = Image.new("RGB", (400, 200), (0, 0, 255))
+    img.paste((255, 0, 0), (0, 0, 200, 200))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    photo = encode(img, exif=exif.tobytes())
+
+    pixels = load_image(photo, 32)
+
+    # 90° saat yönünde döndürülünce kırmızı yarı üste gelir ve kırpmadan sonra kare dolar
+    assert pixels[4, 16, 0] > 200
+    assert pixels[4, 16, 2] < 50
+
+def test_png_and_data_url_inputs():
+    png = encode(Image.new("RGBA", (1000, 800), (0, 255, 0, 255)), fmt="PNG")
+    data_url = "data:image/png;base64," + base64.b64encode(png).decode()
+
+    pixels = load_image(data_url, 64)
+
+    assert pixels.shape == (64, 64, 3)
+    assert pixels[0, 0, 1] == 255
+
+def test_normalize_batch_matches_reference():
+    images = [np.random.randint(0, 256, (8, 8, 3), dtype=np.uint8) for _ in range(3)]
+
+    batch = normalize_batch(images)
+
+    reference = (np.stack(images).astype(np.float32) / 255.0 - MEAN) / STD
+    np.testing.assert_allclose(batch, reference.transpose(0, 3, 1, 2), rtol=1e-5, atol=1e-5)
+    assert batch.dtype == np.float32
+
+def test_invalid_input_raises_validation_error():
+    with pytest.raises(ValidationError):
+        load_image("invalid_base64", 32)
+    with pytest.raises(ValidationError):
+        load_image(b"not an image", 32)
@@ -0,0 +1,144 @@
+import asyncio
+import base64
+import io
+import subprocess
+import sys
+from unittest.mock import patch
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from app.main import app
+from app.services.qr_generator import QREngine, build_payload, parse_payload, require_signing_key
+from app.services.qr_render import qr_matrix
+from app.utils.exceptions import APIError, ValidationError
+
+client = TestClient(app)
+
+@pytest.fixture
+def engine():
+    engine = QREngine(cache_size=64, box_size=4, workers=2)
+    with patch('app.services.qr_generator.qr_engine', engine):
+        yield engine
+    engine.close()
+
+def decode_data_url(data_url: str) -> bytes:
+    return base64.b64decode(data_url.split(",", 1)[1])
+
+def test_png_pixels_match_matrix(engine):
+    token = engine.render("payload", "png")
+    matrix = qr_matrix("payload")
+
+    img = Image.open(io.BytesIO(decode_data_url(token)))
+
+    assert token.startswith("data:image/png;base64,")
+    assert img.size == (len(matrix) * 4, len(matrix) * 4)
+    pixels = np.asarray(img.convert("L"))[::4, ::4]
+    np.testing.assert_array_equal(pixels == 0, matrix)
+
+def test_svg_and_matrix_outputs(engine):
+    svg = decode_data_url(engine.render("payload", "svg")).decode()
+    rows = engine.render("payload", "matrix")
+    matrix = qr_matrix("payload")
+
+    assert svg.startswith("<svg") and "<path d=\"M" in svg
+    assert rows == ["".join("1" if cell else "0" for cell in row) for row in matrix]
+    # Her koyu modül dizisi bir path parçası
+    runs = sum(len([r for r in row.split("0") if r]) for row in rows)
+    assert svg.count("z") == runs
+
+def test_repeated_payloads_are_cached(engine):
+    first = engine.render("payload")
+    second = engine.render("payload")
+
+    assert first is second
+    assert engine.stats()["hits"] == 1
+
+def test_qrcode_endpoint_formats(engine):
+    png = client.post("/qrcode", json={"product_id": "1", "size": "M"})
+    matrix = client.post("/qrcode", json={"product_id": "1", "size": "M", "format": "matrix"})
+    invalid = client.post("/qrcode", json={"product_id": "1", "format": "gif"})
+
+    assert png.json()["qr_token"].startswith("data:image/png;base64,")
+    assert set(matrix.json()["matrix"][0]) <= {"0", "1"}
+    assert invalid.status_code == 422
+
+def test_batch_endpoint_keeps_order_and_deduplicates(engine):
+    items = [{"product_id": str(i % 3), "color": "Black"} for i in range(6)]
+
+    response = client.post("/qrcode/batch", json={"items": items, "format": "svg"})
+
+    codes = response.json()["codes"]
+    assert [c["product_id"] for c in codes] == [str(i % 3) for i in range(6)]
+    assert codes[0]["qr_token"] == codes[3]["qr_token"]
+    assert codes[0]["qr_token"] != codes[1]["qr_token"]
+    assert engine.stats()["misses"] == 3
+
+def test_batch_uses_process_pool_for_many_misses(engine):
+    engine.CHUNK_SIZE = 8
+    payloads = [f"product-{i}" for i in range(40)]
+
+    outputs = asyncio.run(engine.render_many(payloads, "matrix"))
+
+    assert engine._pool is not None
+    assert outputs[17] == engine.render("product-17", "matrix")
+    assert len(engine.cache) == 40
+
+def test_batch_size_limit():
+    with patch('app.routers.qrcode.settings.QR_BATCH_MAX_ITEMS', 2):
+        response = client.post("/qrcode/batch", json={"items": [{"product_id": "1"}] * 3})
+    assert response.status_code == 400
+
+def test_oversized_fields_are_client_errors():
+    long_id = "x" * 256
+    single = client.post("/qrcode", json={"product_id": long_id})
+    batch = client.post("/qrcode/batch", json={"items": [{"product_id": "1"}, {"product_id": long_id}]})
+
+    assert single.status_code == 400
+    assert batch.status_code == 400
+
+def test_signed_payload_roundtrip_and_is_compact():
+    token = build_payload("SKU-000001", "M", "Black")
+    legacy = str({"product_id": "SKU-000001", "size": "M", "color": "Black"})
+
+    assert parse_payload(token) == ("SKU-000001", "M", "Black")
+    assert parse_payload(token.lower()) == ("SKU-000001", "M", "Black")
+    assert parse_payload(build_payload("1")) == ("1", None, None)
+    assert len(qr_matrix(token)) < len(qr_matrix(legacy))
+
+def test_tampered_payload_is_rejected():
+    token = build_payload("1", "M")
+    tampered = token[:4] + ("A" if token[4] != "A" else "B") + token[5:]
+
+    for bad in (tampered, token[:-2], "not base32!", ""):
+        with pytest.raises(ValidationError):
+            parse_payload(bad)
+
+def test_resolve_endpoint():
+    token = build_payload("1", "M", "White")
+
+    response = client.get("/qrcode/resolve", params={"token": token})
+    missing = client.get("/qrcode/resolve", params={"token": build_payload("no-such-product")})
+    # Son karakter dolgu bitleri taşıyabilir; imzanın ortasından bir karakter değiştirilir
+    forged = token[:-5] + ("A" if token[-5] != "A" else "B") + token[-4:]
+    invalid = client.get("/qrcode/resolve", params={"token": forged})
+
+    assert response.status_code == 200
+    assert response.json()["product"]["id"] == "1"
+    assert response.json()["size"] == "M"
+    assert missing.status_code == 404
+    assert invalid.status_code == 400
+
+def test_missing_signing_key_refuses_to_sign():
+    with patch('app.services.qr_generator._KEY', None):
+        with pytest.raises(RuntimeError):
+            require_signing_key()
+        with pytest.raises(APIError) as exc:
+            build_payload("p1")
+    assert exc.value.status_code == 503
+
+def test_pool_target_module_does_not_import_the_app():
+    # Havuz süreçleri yalnızca bu modülü yükler; ayarlar/log dosyası açılmamalı
+    code = "import sys, app.services.qr_render; print(sorted(m for m in sys.modules if m.startswith('app.')))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "['app.services', 'app.services.qr_render']"
@@ -0,0 +1,203 @@
+import asyncio
+from unittest.mock import patch
+import pytest
+import redis
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from app.services.rate_limiter import (
+    GCRA, SLIDING_WINDOW, SYNC_SCRIPT, HybridRateLimiter, RateLimiter,
+    RateLimitMiddleware, RateLimitPolicy, RateLimitResult, create_rate_limiter
+)
+
+def hits(limiter, key, count, cost=1):
+    async def run():
+        return [await limiter.check_rate_limit(key, cost=cost) for _ in range(count)]
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("algorithm", [GCRA, SLIDING_WINDOW])
+def test_limit_and_remaining(fake_redis, algorithm):
+    limiter = RateLimiter(algorithm, limit=5, period=60)
+
+    results = hits(limiter, "client", 7)
+
+    assert [r.allowed for r in results] == [True] * 5 + [False] * 2
+    assert [r.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+    rejected = results[-1]
+    assert rejected.remaining == 0
+    # Bir hak 60 / 5 = 12 sn'de (GCRA) ya da ilk kayıt düştüğünde (~60 sn) açılır
+    assert 0 < rejected.retry_after <= 60
+
+@pytest.mark.parametrize("algorithm", [GCRA, SLIDING_WINDOW])
+def test_same_millisecond_requests_are_counted_separately(fake_redis, algorithm):
+    limiter = RateLimiter(algorithm, limit=3, period=60)
+
+    with patch("app.services.rate_limiter.time.time", return_value=1_700_000_000.0):
+        results = hits(limiter, "burst", 4)
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+
+@pytest.mark.parametrize("algorithm", [GCRA, SLIDING_WINDOW])
+def test_capacity_recovers_after_retry_after(fake_redis, algorithm):
+    limiter = RateLimiter(algorithm, limit=2, period=0.2)
+
+    async def run():
+        first = [await limiter.check_rate_limit("k") for _ in range(2)]
+        rejected = await limiter.check_rate_limit("k")
+        await asyncio.sleep(rejected.retry_after + 0.01)
+        return first, rejected, await limiter.check_rate_limit("k")
+
+    first, rejected, retried = asyncio.run(run())
+
+    assert all(r.allowed for r in first)
+    assert not rejected.allowed
+    assert retried.allowed
+
+def test_cost_consumes_multiple_tokens(fake_redis):
+    limiter = RateLimiter(GCRA, limit=10, period=60)
+
+    first, second = hits(limiter, "tryon", 2, cost=6)
+
+    assert first.allowed and first.remaining == 4
+    assert not second.allowed
+
+def test_fails_open_when_redis_is_down(fake_redis):
+    limiter = RateLimiter(GCRA, limit=1, period=60)
+
+    with patch.object(fake_redis, "evalsha", side_effect=redis.ConnectionError("down")):
+        results = hits(limiter, "k", 3)
+
+    assert all(r.allowed for r in results)
+
+def test_hybrid_admits_locally_and_flushes_in_batches(fake_redis):
+    limiter = HybridRateLimiter(limit=60, period=60, slack=5, flush_interval=60)
+
+    async def run():
+        await fake_redis.script_load(SYNC_SCRIPT)
+        with patch.object(fake_redis, "evalsha", wraps=fake_redis.evalsha) as evalsha:
+            results = [await limiter.check_rate_limit(f"client-{i % 2}") for i in range(8)]
+            local_calls = evalsha.call_count
+            await limiter.flush()
+            flush_calls = evalsha.call_count - local_calls
+        await limiter.stop()
+        synced = await fake_redis.exists("rate_limit:client-0", "rate_limit:client-1")
+        return results, local_calls, flush_calls, synced
+
+    results, local_calls, flush_calls, synced = asyncio.run(run())
+
+    assert all(r.allowed for r in results)
+    assert local_calls == 0
+    # İki anahtar tek çağrıda senkronize edilir
+    assert flush_calls == 1
+    assert synced == 2
+
+def test_hybrid_over_admission_is_bounded_by_slack(fake_redis):
+    workers = [HybridRateLimiter(limit=20, period=60, slack=3, flush_interval=60) for _ in range(3)]
+
+    async def run():
+        admitted = 0
+        for _ in range(20):
+            for worker in workers:
+                for _ in range(2):
+                    admitted += (await worker.check_rate_limit("hot")).allowed
+            for worker in workers:
+                await worker.flush()
+        rejected = await workers[0].check_rate_limit("hot")
+        for worker in workers:
+            await worker.stop()
+        return admitted, rejected
+
+    admitted, rejected = asyncio.run(run())
+
+    assert 20 <= admitted <= 20 + 3 * len(workers)
+    assert not rejected.allowed
+    assert rejected.retry_after > 0
+
+def test_hybrid_fails_open_when_redis_is_down(fake_redis):
+    limiter = HybridRateLimiter(limit=2, period=60, slack=1, flush_interval=60)
+
+    async def run():
+        with patch.object(fake_redis, "evalsha", side_effect=redis.ConnectionError("down")):
+            results = [await limiter.check_rate_limit("k") for _ in range(5)]
+            await limiter.flush()
+        await limiter.stop()
+        return results
+
+    assert all(r.allowed for r in asyncio.run(run()))
+    assert limiter.stats()["redis_errors"] == 1
+
+def test_hybrid_mode_keeps_sliding_window_semantics():
+    with patch('app.services.rate_limiter.settings.RATE_LIMIT_MODE', "hybrid"), \
+            patch('app.services.rate_limiter.settings.RATE_LIMIT_ALGORITHM', SLIDING_WINDOW):
+        limiter = create_rate_limiter()
+
+    assert isinstance(limiter, RateLimiter)
+    assert limiter.algorithm == SLIDING_WINDOW
+
+def limited_app(limiter):
+    async def endpoint(request):
+        body = await request.body()
+        return PlainTextResponse(f"ok {len(body)}")
+
+    app = Starlette(routes=[
+        Route("/virtual-try-on", endpoint, methods=["POST"]),
+        Route("/virtual-try-on/{job_id}", endpoint, methods=["GET", "POST"]),
+        Route("/qrcode", endpoint, methods=["POST"]),
+        Route("/health", endpoint, methods=["GET"]),
+    ])
+    app.add_middleware(
+        RateLimitMiddleware,
+        policies={
+            "/virtual-try-on": RateLimitPolicy(cost=10),
+            "/qrcode": RateLimitPolicy(cost=1),
+        },
+        limiter=limiter
+    )
+    return TestClient(app)
+
+def test_middleware_applies_route_costs(fake_redis):
+    # Tek event loop: fakeredis bağlantısı istekler arasında paylaşılır
+    with limited_app(RateLimiter(GCRA, limit=20, period=60)) as client, \
+         patch('app.services.rate_limiter.settings.RATE_LIMIT_ENABLED', True):
+        first = client.post("/virtual-try-on", content=b"x")
+        # Aynı önek altındaki rotalar aynı kovayı paylaşır
+        second = client.post("/virtual-try-on/abc", content=b"x")
+        rejected = client.post("/virtual-try-on", content=b"x")
+        qrcode = client.post("/qrcode")
+        polls = [client.get("/virtual-try-on/abc") for _ in range(30)]
+
+    assert first.status_code == 200
+    assert first.headers["X-RateLimit-Remaining"] == "10"
+    assert second.headers["X-RateLimit-Remaining"] == "0"
+    assert rejected.status_code == 429
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert rejected.json()["detail"]["message"] == "Rate limit exceeded"
+    assert qrcode.status_code == 200
+    # Politikası olmayan metodlar sınırlanmaz
+    assert all(r.status_code == 200 for r in polls)
+    assert "X-RateLimit-Remaining" not in polls[0].headers
+
+def test_middleware_rejects_before_reading_body(fake_redis):
+    received = []
+
+    class Limiter:
+        async def check_rate_limit(self, key, limit=None, cost=1):
+            return RateLimitResult(False, 1, 0, 30.0)
+
+    client = limited_app(Limiter())
+    app = client.app
+
+    async def counting(scope, receive, send):
+        async def tracked_receive():
+            message = await receive()
+            received.append(message)
+            return message
+        await app(scope, tracked_receive, send)
+
+    with patch('app.services.rate_limiter.settings.RATE_LIMIT_ENABLED', True):
+        response = TestClient(counting).post("/virtual-try-on", content=b"0" * 100000)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+    assert received == []
@@ -0,0 +1,154 @@
+import asyncio
+import time
+import aiohttp
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from fastapi.testclient import TestClient
+from app.services.openweather import OpenWeatherClient
+from app.utils.resilience import (
+    CLOSED, OPEN, CircuitBreaker, CircuitOpenError, DeadlineExceeded, DeadlineMiddleware,
+    RetryBudget, Upstream, UpstreamStatusError, deadline, remaining
+)
+
+def weather_client(stub, **upstream) -> OpenWeatherClient:
+    client = OpenWeatherClient()
+    client.base_url = stub.url
+    client.hedge_delay = upstream.pop("hedge_delay", 0.0)
+    client.upstream = Upstream("test", timeout=2.0, base_delay=0.01, max_delay=0.02, **upstream)
+    return client
+
+def fetch_weather(client, *, rounds=1, delay_between=0.0, within=None):
+    async def run():
+        results = []
+        try:
+            for _ in range(rounds):
+                with deadline(within):
+                    try:
+                        results.append(await client._get_json("/data/2.5/weather", {"lat": 41, "lon": 29}))
+                    except Exception as e:
+                        results.append(e)
+                await asyncio.sleep(delay_between)
+        finally:
+            await client.close()
+        return results
+
+    return asyncio.run(run())
+
+def test_transient_errors_are_retried(flaky_stub):
+    flaky_stub.faults.extend([(503, 0), (502, 0)])
+    [result] = fetch_weather(weather_client(flaky_stub, max_attempts=3))
+
+    assert result["main"]["temp"] == 21.0
+    assert len(flaky_stub.requests) == 3
+
+def test_client_errors_are_not_retried_and_keep_circuit_closed(flaky_stub):
+    flaky_stub.faults.append((401, 0))
+    client = weather_client(flaky_stub, max_attempts=3)
+    [result] = fetch_weather(client)
+
+    assert isinstance(result, aiohttp.ClientResponseError) and result.status == 401
+    assert len(flaky_stub.requests) == 1
+    assert client.upstream.breaker.state == CLOSED
+
+def test_circuit_opens_and_half_open_probe_closes_it(flaky_stub):
+    flaky_stub.faults.extend([(500, 0), (500, 0)])
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.2)
+    client = weather_client(flaky_stub, max_attempts=1, breaker=breaker)
+
+    async def run():
+        try:
+            for _ in range(2):
+                with pytest.raises(aiohttp.ClientResponseError):
+                    await client._get_json("/data/2.5/weather", {})
+            assert breaker.state == OPEN
+            # Açık devre upstream'e gitmeden reddeder
+            with pytest.raises(CircuitOpenError):
+                await client._get_json("/data/2.5/weather", {})
+            assert len(flaky_stub.requests) == 2
+
+            await asyncio.sleep(0.25)
+            await client._get_json("/data/2.5/weather", {})
+            assert breaker.state == CLOSED
+        finally:
+            await client.close()
+
+    asyncio.run(run())
+
+def test_only_the_probe_resolves_half_open_state():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.0)
+    stale = breaker.acquire()
+    breaker.release(False, breaker.acquire())
+    assert breaker.state == OPEN
+
+    probe = breaker.acquire()
+    # Devre açılmadan önce başlamış çağrı ne kapatır ne ikinci denemeye yol açar
+    breaker.release(True, stale)
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    breaker.release(True, probe)
+    assert breaker.state == CLOSED
+
+def test_retry_budget_limits_retries(flaky_stub):
+    flaky_stub.faults.extend([(503, 0)] * 4)
+    budget = RetryBudget(ratio=0.0, min_per_second=0.0, max_tokens=1.0)
+    client = weather_client(flaky_stub, max_attempts=3, budget=budget)
+    first, second = fetch_weather(client, rounds=2)
+
+    assert isinstance(first, aiohttp.ClientResponseError)
+    assert isinstance(second, aiohttp.ClientResponseError)
+    # İlk çağrı tek jetonla bir kez yeniden denendi, ikincisi hiç denenmedi
+    assert len(flaky_stub.requests) == 3
+
+def test_hedged_request_beats_slow_response(flaky_stub):
+    flaky_stub.faults.append((200, 1.0))
+    client = weather_client(flaky_stub, hedge_delay=0.1)
+
+    started = time.perf_counter()
+    [result] = fetch_weather(client)
+
+    assert result["main"]["temp"] == 21.0
+    assert time.perf_counter() - started < 0.8
+    assert len(flaky_stub.requests) == 2
+
+def test_deadline_bounds_upstream_call(flaky_stub):
+    flaky_stub.faults.append((200, 1.0))
+    client = weather_client(flaky_stub, max_attempts=3)
+
+    started = time.perf_counter()
+    [result] = fetch_weather(client, within=0.2)
+
+    assert isinstance(result, DeadlineExceeded)
+    assert time.perf_counter() - started < 0.8
+    # Kendi süre sınırımız upstream hatası sayılmaz
+    assert client.upstream.breaker.failures == 0
+
+def test_non_idempotent_calls_are_not_resubmitted_after_timeout():
+    attempts = []
+
+    async def generate(timeout):
+        attempts.append(timeout)
+        if len(attempts) == 1:
+            raise UpstreamStatusError(503, "busy")
+        await asyncio.sleep(1.0)
+
+    upstream = Upstream("test", timeout=0.1, max_attempts=3, base_delay=0.0, idempotent=False)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(upstream.call(generate))
+
+    # 503 yeniden gönderildi, zaman aşımı gönderilmedi
+    assert len(attempts) == 2
+
+def test_deadline_middleware_reads_request_timeout_header():
+    async def endpoint(request):
+        return JSONResponse({"remaining": remaining()})
+
+    app = Starlette(routes=[Route("/", endpoint)])
+    app.add_middleware(DeadlineMiddleware, max_timeout=30.0)
+    client = TestClient(app)
+
+    assert 0 < client.get("/", headers={"X-Request-Timeout": "2"}).json()["remaining"] <= 2
+    assert 2 < client.get("/", headers={"X-Request-Timeout": "60"}).json()["remaining"] <= 30
+    assert 2 < client.get("/").json()["remaining"] <= 30
@@ -0,0 +1,60 @@
+import json
+from fastapi.testclient import TestClient
+from unittest.mock import patch, AsyncMock
+from app.main import app
+from app.schemas import AnalyzeResponse, ProductData, VirtualTryOnResponse
+from app.utils.responses import ModelResponse, model_response, render_model
+
+client = TestClient(app)
+
+def test_render_matches_default_serialization():
+    model = AnalyzeResponse(
+        style="casual",
+        recommendations=[ProductData(
+            id="1", name="Keten Gömlek", brand="Test", category="tops", price=10.5, image_url="x.jpg"
+        )]
+    )
+    assert json.loads(b"".join(render_model(model))) == json.loads(model.model_dump_json())
+
+def test_large_field_is_sent_as_separate_chunk():
+    image = "iVBORw0KGgo" * 1000 + "=="
+    model = VirtualTryOnResponse(result_image=image, success=True, result_id="abc")
+    chunks = render_model(model, raw_fields=("result_image",))
+
+    assert len(chunks) == 3 and chunks[1] == image.encode()
+    assert json.loads(b"".join(chunks)) == model.model_dump()
+    assert ModelResponse(model, raw_fields=("result_image",)).headers["content-length"] == str(
+        sum(map(len, chunks))
+    )
+
+def test_strings_needing_escapes_fall_back_to_serializer():
+    for value in ('a"b', "a\\b", "a\nb", "ğüş", None):
+        model = VirtualTryOnResponse(result_image=value or "", success=False, message=value)
+        chunks = render_model(model, raw_fields=("message",))
+        assert len(chunks) == 1
+        assert json.loads(chunks[0]) == model.model_dump()
+
+def test_try_on_endpoint_streams_raw_result():
+    with patch('app.routers.virtual_try_on.kolors_service.try_on', new=AsyncMock(return_value="cmVzdWx0")), \
+            patch('app.utils.responses.settings.FAST_RESPONSES', True):
+        response = client.post("/virtual-try-on", json={"user_image": "dXNlcg==", "product_image": "cHJvZHVjdA=="})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json()["result_image"] == "cmVzdWx0"
+    assert int(response.headers["content-length"]) == len(response.content)
+
+def test_injected_response_headers_are_kept():
+    with patch('app.routers.analyze.deepfashion.analyze', new=AsyncMock(return_value=("casual", None))), \
+            patch('app.routers.analyze.settings.SERVER_TIMING_ENABLED', True):
+        response = client.post("/analyze", json={"image": "aW1hZ2U="})
+
+    assert response.status_code == 200
+    assert "style;dur=" in response.headers["server-timing"]
+    assert response.json()["style"] == "casual"
+
+def test_fast_path_is_opt_in():
+    model = VirtualTryOnResponse(result_image="", success=True)
+    assert model_response(model) is model
+    with patch('app.utils.responses.settings.FAST_RESPONSES', True):
+        assert isinstance(model_response(model), ModelResponse)
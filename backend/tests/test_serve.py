@@ -0,0 +1,75 @@
+import os
+from unittest.mock import patch
+import pytest
+from app import serve
+from app.utils import logger as app_logger
+
+@pytest.fixture
+def environment():
+    with patch.dict(os.environ), \
+            patch.object(serve.settings, "MODEL_THREADS", 0), \
+            patch.object(serve.settings, "QR_WORKERS", 0), \
+            patch.object(serve.settings, "LOG_FILE", "app.log"), \
+            patch('app.serve.multiprocessing.cpu_count', return_value=8):
+        os.environ.pop("OMP_NUM_THREADS", None)
+        os.environ.pop("PROMETHEUS_MULTIPROC_DIR", None)
+        yield
+
+def test_threads_are_partitioned_across_workers(environment):
+    threads = serve.configure_environment(4)
+
+    assert threads == 2
+    assert os.environ["OMP_NUM_THREADS"] == "2"
+    assert os.environ["MODEL_THREADS"] == "2"
+    assert serve.settings.MODEL_THREADS == 2 and serve.settings.QR_WORKERS == 2
+    assert os.path.isdir(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    os.rmdir(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+def test_single_worker_keeps_single_process_metrics(environment):
+    assert serve.configure_environment(1) == 8
+    assert "PROMETHEUS_MULTIPROC_DIR" not in os.environ
+    assert serve.settings.LOG_FILE == "app.log"
+
+def test_multiple_workers_log_to_stdout_only(environment):
+    serve.configure_environment(2)
+
+    assert serve.settings.LOG_FILE == ""
+    assert os.environ["LOG_FILE"] == ""
+    os.rmdir(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+def test_stale_multiprocess_metrics_are_removed(environment, tmp_path):
+    directory = tmp_path / "prometheus"
+    directory.mkdir()
+    (directory / "counter_123.db").write_bytes(b"x")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(directory)
+
+    serve.configure_environment(2)
+
+    assert list(directory.iterdir()) == []
+
+def test_gunicorn_preloads_app_with_fork_hooks():
+    options = serve.gunicorn_options(3)
+
+    assert options["workers"] == 3
+    assert options["preload_app"] is True
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert options["child_exit"] is serve.child_exit
+    assert options["timeout"] > serve.settings.TRYON_TIMEOUT
+
+@pytest.mark.skipif(not app_logger.settings.LOG_ASYNC, reason="kuyruklu loglama kapalı")
+def test_log_listener_is_restarted_in_forked_child():
+    app_logger.get_logger("test.fork")
+    parent_queue = app_logger._handlers[0].queue
+
+    pid = os.fork()
+    if pid == 0:
+        listener = app_logger._listener
+        ok = (
+            app_logger._handlers[0].queue is not parent_queue
+            and listener.queue is app_logger._handlers[0].queue
+            and listener._thread.is_alive()
+        )
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
@@ -0,0 +1,63 @@
+import asyncio
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from app.main import app
+from app.utils.startup import FAILED, READY, Readiness
+
+def test_readiness_waits_for_warmup_steps():
+    readiness = Readiness()
+    release = asyncio.Event()
+
+    async def slow_step():
+        await release.wait()
+
+    async def run():
+        task = readiness.start([("fast", lambda: asyncio.sleep(0)), ("slow", slow_step)])
+        await asyncio.sleep(0.01)
+        assert not readiness.ready and "fast" in readiness.steps
+        release.set()
+        await task
+
+    asyncio.run(run())
+    assert readiness.state == READY
+    assert set(readiness.report()["steps"]) == {"fast", "slow"}
+
+def test_failed_warmup_is_reported():
+    readiness = Readiness()
+
+    async def broken():
+        raise RuntimeError("model bozuk")
+
+    async def run():
+        readiness.start([("model", broken)])
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert readiness.state == FAILED
+    assert readiness.report()["error"] == "model: model bozuk"
+
+def test_lazy_startup_is_live_before_ready():
+    release = asyncio.Event()
+
+    async def blocked():
+        await release.wait()
+
+    with patch('app.main.settings.STARTUP_MODE', "lazy"), \
+            patch('app.main.WARMUP_STEPS', (("model", blocked),)):
+        with TestClient(app) as client:
+            assert client.get("/health").status_code == 200
+            response = client.get("/ready")
+            assert response.status_code == 503
+            assert response.json()["status"] == "warming"
+
+    with TestClient(app) as client:
+        assert client.get("/ready").status_code == 200
+
+def test_importing_app_does_not_import_torch():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print('torch' in sys.modules)"],
+        capture_output=True, text=True, check=True
+    )
+    assert result.stdout.splitlines()[-1] == "False"
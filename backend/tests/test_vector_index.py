@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from app.services import catalog as catalog_module
+from app.services import deepfashion
+from app.services import vector_index as vector_index_module
+from app.services.catalog import ProductCatalog
+from app.services.vector_index import VectorIndex, normalize
+
+def clustered(n=2000, dim=16, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(0, clusters, n)] + rng.normal(scale=0.3, size=(n, dim))
+    return [str(i) for i in range(n)], vectors.astype(np.float32)
+
+def brute_force(vectors, query, k):
+    scores = normalize(vectors) @ normalize(query)
+    return [str(i) for i in np.argsort(-scores)[:k]]
+
+def test_exact_search_matches_brute_force():
+    ids, vectors = clustered()
+    index = VectorIndex.build(ids, vectors)
+
+    for query in vectors[:10]:
+        result = index.search(query, 5)
+        assert [product_id for product_id, _ in result] == brute_force(vectors, query, 5)
+        scores = [score for _, score in result]
+        assert scores == sorted(scores, reverse=True)
+
+def test_ivf_recall_grows_with_nprobe():
+    ids, vectors = clustered()
+    index = VectorIndex.build(ids, vectors, n_lists=32)
+    queries = vectors[::100]
+
+    def recall(nprobe):
+        hits = 0
+        for query in queries:
+            expected = set(brute_force(vectors, query, 10))
+            hits += len(expected & {product_id for product_id, _ in index.search(query, 10, nprobe)})
+        return hits / (10 * len(queries))
+
+    assert recall(32) == 1.0
+    assert recall(8) >= 0.9
+    assert recall(1) <= recall(8)
+
+@pytest.mark.parametrize("n_lists", [0, 8])
+def test_save_and_memory_mapped_load(tmp_path, n_lists):
+    ids, vectors = clustered(n=500)
+    index = VectorIndex.build(ids, vectors, n_lists=n_lists)
+    index.save(str(tmp_path))
+
+    loaded = VectorIndex.load(str(tmp_path))
+
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.n_lists == n_lists
+    assert loaded.search(vectors[3], 5, nprobe=8) == index.search(vectors[3], 5, nprobe=8)
+
+def test_dimension_mismatch_raises():
+    ids, vectors = clustered(n=100)
+    with pytest.raises(ValueError):
+        VectorIndex.build(ids, vectors).search(np.ones(3), 5)
+
+def test_recommendations_follow_embedding(monkeypatch):
+    products = [
+        {"id": str(i), "name": f"P{i}", "brand": "B", "category": "Shirts", "price": 10.0 * (i + 1),
+         "image_url": f"https://example.com/{i}.jpg", "sizes": ["M"] if i % 2 else ["S"],
+         "styles": ["casual"], "popularity": -i}
+        for i in range(6)
+    ]
+    vectors = np.eye(6, dtype=np.float32)
+    monkeypatch.setattr(catalog_module, "_catalog", ProductCatalog(products))
+    monkeypatch.setattr(vector_index_module, "_index", VectorIndex.build([p["id"] for p in products], vectors))
+
+    query = vectors[5] + 0.5 * vectors[3]
+    by_embedding = deepfashion.get_recommendations("casual", limit=3, embedding=query)
+    # Filtre sonrası eksik kalan yer stil önerileriyle dolar
+    filtered = deepfashion.get_recommendations("casual", size="M", limit=3, embedding=query)
+    without = deepfashion.get_recommendations("casual", limit=3)
+
+    assert [p.id for p in by_embedding][:2] == ["5", "3"]
+    assert [p.id for p in filtered] == ["5", "3", "1"]
+    assert [p.id for p in without] == ["0", "1", "2"]
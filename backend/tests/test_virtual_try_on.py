@@ -0,0 +1,153 @@
+import asyncio
+import base64
+import time
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch, AsyncMock
+from jose import jwt
+from app.main import app
+from app.services.kling_ai import KolorsTokenCache
+from app.services.kolors import KolorsService
+from app.services.tryon_cache import DiskLRUStore
+from app.services.tryon_jobs import QueueFullError, TryOnJobQueue
+
+def test_token_is_cached_until_refresh_margin():
+    cache = KolorsTokenCache("access", "secret", refresh_margin=60)
+
+    with patch('app.services.kling_ai.time.time', return_value=1_000_000):
+        first = cache.get_token()
+        assert cache.get_token() == first
+
+    claims = jwt.decode(first, "secret", algorithms=["HS256"], options={"verify_exp": False, "verify_nbf": False})
+    assert claims["iss"] == "access"
+    assert claims["exp"] == 1_000_000 + 1800
+
+    # Süresinin dolmasına 60 saniyeden az kaldığında yenilenir
+    with patch('app.services.kling_ai.time.time', return_value=1_000_000 + 1745):
+        assert cache.get_token() != first
+
+def wait_for_job(client, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = client.get(f"/virtual-try-on/{job_id}").json()
+        if data["status"] in ("succeeded", "failed"):
+            return data
+        time.sleep(0.02)
+    raise AssertionError("iş zamanında bitmedi")
+
+def test_job_submit_and_poll(fake_redis, kolors_stub):
+    with patch('app.routers.virtual_try_on.kolors_service.api_url', kolors_stub.url + "/"):
+        with TestClient(app) as client:
+            response = client.post(
+                "/virtual-try-on/jobs",
+                json={"user_image": "dXNlcg==", "product_image": "cHJvZHVjdA=="}
+            )
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+
+            data = wait_for_job(client, job_id)
+            assert data["status"] == "succeeded"
+            assert data["result_image"] == "cmVzdWx0"
+            assert kolors_stub.requests[0]["user_image"] == "dXNlcg=="
+
+def test_job_failure_is_reported(fake_redis, kolors_stub):
+    with patch('app.routers.virtual_try_on.kolors_service.api_url', kolors_stub.url + "/"):
+        with TestClient(app) as client:
+            job_id = client.post(
+                "/virtual-try-on/jobs",
+                json={"user_image": "fail", "product_image": "cHJvZHVjdA=="}
+            ).json()["job_id"]
+
+            data = wait_for_job(client, job_id)
+            assert data["status"] == "failed"
+            assert data["message"]
+
+def test_job_stream(fake_redis, kolors_stub):
+    with patch('app.routers.virtual_try_on.kolors_service.api_url', kolors_stub.url + "/"):
+        with TestClient(app) as client:
+            job_id = client.post(
+                "/virtual-try-on/jobs",
+                json={"user_image": "dXNlcg==", "product_image": "cHJvZHVjdA=="}
+            ).json()["job_id"]
+
+            with client.stream("GET", f"/virtual-try-on/{job_id}/stream") as response:
+                assert response.headers["content-type"].startswith("text/event-stream")
+                body = "".join(response.iter_text())
+
+            assert "event: succeeded" in body
+
+def test_concurrent_submits_past_capacity_fail_cleanly(fake_redis):
+    release = asyncio.Event()
+
+    async def backend(user_image, product_image):
+        await release.wait()
+        return "cmVzdWx0"
+
+    async def run():
+        queue = TryOnJobQueue(backend, concurrency=1, max_queue=1)
+        # Hepsi doluluk kontrolünü geçer, sonra kayıt sırasında yarışır
+        results = await asyncio.gather(*[queue.submit("u", "p") for _ in range(4)], return_exceptions=True)
+        keys = [key async for key in fake_redis.scan_iter("tryon:job:*") if not key.endswith(b":events")]
+        statuses = [(await fake_redis.hget(key, "status")).decode() for key in keys]
+        release.set()
+        await queue.stop()
+        return results, statuses
+
+    results, statuses = asyncio.run(run())
+
+    rejected = [r for r in results if isinstance(r, QueueFullError)]
+    assert rejected and all(isinstance(r, (str, QueueFullError)) for r in results)
+    # Reddedilen işler sonsuza dek "pending" kalmaz
+    assert statuses.count("failed") == len(rejected)
+
+def test_unknown_job_returns_404(fake_redis):
+    with TestClient(app) as client:
+        assert client.get("/virtual-try-on/missing").status_code == 404
+
+def test_identical_requests_hit_result_cache(tryon_cache, kolors_stub):
+    service = KolorsService()
+    service.api_url = kolors_stub.url + "/"
+
+    async def run():
+        # Aynı fotoğraf, data URL önekiyle ya da öneksiz
+        concurrent = await asyncio.gather(*[
+            service.try_on("dXNlcg==", "cHJvZHVjdA==") for _ in range(20)
+        ])
+        repeated = await service.try_on("data:image/jpeg;base64,dXNlcg==", "cHJvZHVjdA==")
+        return concurrent, repeated
+
+    concurrent, repeated = asyncio.run(run())
+
+    assert set(concurrent) == {"cmVzdWx0"}
+    assert repeated == "cmVzdWx0"
+    assert len(kolors_stub.requests) == 1
+    assert tryon_cache.stats()["hits"] == 1
+
+def test_disk_store_evicts_least_recently_used(tmp_path):
+    store = DiskLRUStore(str(tmp_path / "store"), max_bytes=10)
+    store.put("a", b"12345")
+    store.put("b", b"12345")
+    assert store.get("a") == b"12345"
+
+    store.put("c", b"12345")
+
+    assert store.get("b") is None
+    assert store.get("a") == b"12345"
+    assert store.total_bytes == 10
+
+def test_upload_returns_image_bytes(kolors_stub):
+    png = b"\x89PNG\r\n\x1a\n" + b"0" * 16
+    with patch('app.routers.virtual_try_on.kolors_service.try_on', new=AsyncMock(return_value=base64.b64encode(png).decode())) as mock_try_on:
+        response = TestClient(app).post(
+            "/virtual-try-on/upload",
+            files={
+                "user_image": ("user.jpg", b"user-bytes", "image/jpeg"),
+                "product_image": ("product.jpg", b"product-bytes", "image/jpeg")
+            },
+            headers={"Accept": "image/png"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content == png
+    assert mock_try_on.await_args.kwargs["user_image"] == b"user-bytes"
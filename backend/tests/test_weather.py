@@ -1,49 +1,68 @@
+import aiohttp
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock, MagicMock
 
 client = TestClient(app)
 
 def test_get_weather_success():
-    # Mock weather API response
-    mock_weather_data = {
-        "main": {
-            "temp": 20.5,
-            "humidity": 65
-        },
-        "wind": {
-            "speed": 5.2
+    # OpenWeather yanıtları _get_json seviyesinde taklit edilir
+    mock_responses = {
+        "/geo/1.0/direct": [{"lat": 41.0082, "lon": 28.9784}],
+        "/data/2.5/weather": {
+            "main": {"temp": 20.5, "humidity": 65},
+            "wind": {"speed": 5.2},
+            "weather": [{"description": "parçalı bulutlu", "icon": "02d"}]
         }
     }
 
-    with patch('requests.get') as mock_get:
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.json.return_value = mock_weather_data
-        
-        response = client.get("/weather?lat=41.0082&lon=28.9784")
-        
+    async def get_json(path, params):
+        return mock_responses[path]
+
+    with patch('app.routers.weather.openweather_client._get_json', new=AsyncMock(side_effect=get_json)):
+        response = client.get("/weather?location=Fatih")
+
         assert response.status_code == 200
         data = response.json()
-        assert "temperature" in data
-        assert "humidity" in data
-        assert "wind_speed" in data
         assert data["temperature"] == 20.5
         assert data["humidity"] == 65
         assert data["wind_speed"] == 5.2
+        assert data["description"] == "parçalı bulutlu"
+        assert data["icon"] == "02d"
 
-def test_get_weather_invalid_coordinates():
-    response = client.get("/weather?lat=invalid&lon=28.9784")
-    assert response.status_code == 422  # Validation Error
+def test_get_weather_empty_location():
+    with patch('app.routers.weather.openweather_client._get_json', new=AsyncMock(return_value=[])):
+        response = client.get("/weather?location=")
+        assert response.status_code == 404
 
 def test_get_weather_missing_parameters():
     response = client.get("/weather")
     assert response.status_code == 422  # Missing Required Parameters
 
 def test_get_weather_api_error():
-    with patch('requests.get') as mock_get:
-        mock_get.return_value.status_code = 500
-        
-        response = client.get("/weather?lat=41.0082&lon=28.9784")
-        assert response.status_code == 400
+    error = aiohttp.ClientResponseError(MagicMock(), (), status=500)
+    with patch('app.routers.weather.openweather_client._get_json', new=AsyncMock(side_effect=error)):
+        response = client.get("/weather?location=Kadikoy")
+        assert response.status_code == 500
         assert "detail" in response.json()
+
+def test_get_weather_by_location():
+    mock_weather_data = {
+        "main": {"temp": 18.0, "humidity": 70},
+        "wind": {"speed": 3.1},
+        "weather": [{"description": "açık", "icon": "01d"}]
+    }
+
+    with patch('app.routers.weather.openweather_client.geocode', new=AsyncMock(return_value=(41.0, 29.0))), \
+         patch('app.routers.weather.openweather_client.current_weather', new=AsyncMock(return_value=mock_weather_data)) as mock_current:
+        response = client.get("/weather?location=Istanbul")
+
+        assert response.status_code == 200
+        assert response.json()["temperature"] == 18.0
+        mock_current.assert_awaited_once_with(41.0, 29.0)
+
+def test_get_weather_location_not_found():
+    with patch('app.routers.weather.openweather_client.geocode', new=AsyncMock(return_value=None)):
+        response = client.get("/weather?location=Nowhere")
+        assert response.status_code == 404